@@ -1,12 +1,17 @@
 import os
 from django.core.asgi import get_asgi_application
+from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
 from django.urls import path
 from channels.generic.websocket import AsyncWebsocketConsumer
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Adm.settings")
 django_asgi_app = get_asgi_application()
 
+# Imported once the apps are loaded, the consumers use the models
+from agentAi.routing import websocket_urlpatterns as ai_websocket_urlpatterns  # noqa: E402
+
 class EchoConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         await self.accept()
@@ -18,7 +23,10 @@ class EchoConsumer(AsyncWebsocketConsumer):
 
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
-    "websocket": URLRouter([
+    # The session cookie authenticates the sockets, so they only accept
+    # pages served from ALLOWED_HOSTS
+    "websocket": AllowedHostsOriginValidator(AuthMiddlewareStack(URLRouter([
         path("ws/echo/", EchoConsumer.as_asgi()),
-    ]),
+        *ai_websocket_urlpatterns,
+    ]))),
 })
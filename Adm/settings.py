@@ -161,6 +161,96 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 
+# Rows written per bulk INSERT when importing financial data
+FINANCE_IMPORT_BATCH_SIZE = int(os.getenv("FINANCE_IMPORT_BATCH_SIZE", "1000"))
+# Imports are parsed as a stream from the upload (spooled to disk above
+# FILE_UPLOAD_MAX_MEMORY_SIZE), so memory use doesn't grow with this limit
+FINANCE_IMPORT_MAX_UPLOAD_SIZE = int(
+    os.getenv("FINANCE_IMPORT_MAX_UPLOAD_SIZE", str(100 * 1024 * 1024))
+)  # 100MB
+# Seconds without progress after which a running import job is considered
+# dead and marked as failed by the import_worker command
+FINANCE_IMPORT_JOB_TIMEOUT = int(os.getenv("FINANCE_IMPORT_JOB_TIMEOUT", "3600"))
+# Seconds a job may wait for the import_worker before it is marked as failed,
+# so uploads end with an error instead of waiting when no worker runs
+FINANCE_IMPORT_PENDING_TIMEOUT = int(
+    os.getenv("FINANCE_IMPORT_PENDING_TIMEOUT", "300")
+)
+
+# Statistics PNG charts are drawn by a pool of processes in each web worker,
+# started on its first PNG (finance_statistics.render_pool). The processes
+# per web worker, up to WEB_CONCURRENCY × this value in total, 0 draws in the
+# web worker itself
+FINANCE_RENDER_PROCESSES = int(os.getenv("FINANCE_RENDER_PROCESSES", "2"))
+# Charts waiting or being drawn at once per web worker, more are refused
+FINANCE_RENDER_QUEUE_SIZE = int(os.getenv("FINANCE_RENDER_QUEUE_SIZE", "8"))
+# Seconds a web worker waits for a chart, below the gunicorn timeout
+FINANCE_RENDER_TIMEOUT = int(os.getenv("FINANCE_RENDER_TIMEOUT", "20"))
+
+# Gemini client of the AI chat, one per process (agentAi.gemini_client).
+# Empty GEMINI_BASE_URL uses Google's API
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "")
+# Seconds each request to Gemini may take
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "25"))
+# Requests made for a message, counting the first, on 408, 429 and 5xx
+# answers, with exponential backoff between them (seconds)
+GEMINI_RETRY_ATTEMPTS = int(os.getenv("GEMINI_RETRY_ATTEMPTS", "3"))
+GEMINI_RETRY_INITIAL_DELAY = float(os.getenv("GEMINI_RETRY_INITIAL_DELAY", "0.5"))
+GEMINI_RETRY_MAX_DELAY = float(os.getenv("GEMINI_RETRY_MAX_DELAY", "4"))
+# Connections kept open to Gemini per process, and seconds they stay idle
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "10"))
+GEMINI_KEEPALIVE_EXPIRY = float(os.getenv("GEMINI_KEEPALIVE_EXPIRY", "120"))
+
+# Financial context of the AI chat prompt (agentAi.context), a summary cut to
+# about AI_CONTEXT_TOKEN_BUDGET tokens
+AI_CONTEXT_TOKEN_BUDGET = int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", "2000"))
+# Transactions matching the ids or words of the message, most recent
+# transactions and months of totals listed in it
+AI_CONTEXT_MATCHING_TRANSACTIONS = int(os.getenv("AI_CONTEXT_MATCHING_TRANSACTIONS", "20"))
+AI_CONTEXT_RECENT_TRANSACTIONS = int(os.getenv("AI_CONTEXT_RECENT_TRANSACTIONS", "30"))
+AI_CONTEXT_MONTHS = int(os.getenv("AI_CONTEXT_MONTHS", "12"))
+# Conversation memory of the AI chat prompt (agentAi.memory): the last
+# messages as sent, up to AI_MEMORY_MESSAGE_CHARS each, and a summary of the
+# older ones of about AI_MEMORY_SUMMARY_TOKENS, one line of up to
+# AI_MEMORY_LINE_CHARS per message
+AI_MEMORY_WINDOW_MESSAGES = int(os.getenv("AI_MEMORY_WINDOW_MESSAGES", "6"))
+AI_MEMORY_MESSAGE_CHARS = int(os.getenv("AI_MEMORY_MESSAGE_CHARS", "4000"))
+AI_MEMORY_SUMMARY_TOKENS = int(os.getenv("AI_MEMORY_SUMMARY_TOKENS", "600"))
+AI_MEMORY_LINE_CHARS = int(os.getenv("AI_MEMORY_LINE_CHARS", "240"))
+# Answers streamed at once by each ASGI process (agentAi.consumers), each
+# stream is read from Gemini by a thread
+AI_CHAT_STREAM_THREADS = int(os.getenv("AI_CHAT_STREAM_THREADS", "16"))
+
+# Caches
+# "finance" holds per-user data versions and rendered statistics charts. It is
+# file based so web workers and the import worker share it, and bounded by
+# MAX_ENTRIES, entries of older data versions are never read again and are
+# culled once they expire or the cache is full.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "finance": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("FINANCE_CACHE_DIR", str(BASE_DIR / ".cache" / "finance")),
+        "TIMEOUT": 7 * 24 * 60 * 60,  # 1 week
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("FINANCE_CACHE_MAX_ENTRIES", "300")),
+        },
+    },
+    # "ai" holds the AI chat answers (agentAi.answer_cache). Local memory
+    # evicts the least recently used entries once MAX_ENTRIES is reached, it
+    # is per process, each web worker answering from its own entries.
+    "ai": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "ai-answers",
+        "TIMEOUT": int(os.getenv("AI_ANSWER_CACHE_TIMEOUT", str(60 * 60))),  # 1 hour
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("AI_ANSWER_CACHE_MAX_ENTRIES", "500")),
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,96 @@
+"""
+Cache of the AI chat answers.
+
+Questions about the user's data like "quanto gastei por categoria este mês?"
+are asked again and again while the data doesn't change. The answers of the
+model to those questions, as classified by agentAi.intents, are cached per
+user, normalized question, data version (finance_manager.versions), model and
+day, so the same question on the same data is answered without calling
+Gemini, in the same conversation or another one, and any write to the user's
+data makes the cached answers unreachable. Answers with model actions
+(CUT_MARKER) change data and are never cached.
+
+Other messages are never cached: searches, shopping and advice depend on the
+web and on the moment, replies ("sim", "e no mês passado?") on the
+conversation.
+
+The AI_CACHE cache bounds the entries with a TTL and evicts the least
+recently used ones.
+"""
+
+import hashlib
+
+from django.core.cache import caches
+from django.utils import timezone
+
+from agentAi.chat import CUT_MARKER
+from agentAi.gemini_client import MODEL
+from agentAi.intents import answer_locally, normalize_question, question_intent
+from finance_manager.versions import data_version
+
+AI_CACHE = "ai"
+
+# Messages with fewer words are replies to the conversation ("sim", "ok")
+MIN_CACHED_WORDS = 3
+
+# Words of messages referring to earlier messages of the conversation
+REFERENCE_WORDS = {
+    "acima", "anterior", "cancela", "cancelar", "confirma", "confirmar",
+    "confirmo", "continua", "continue", "dela", "delas", "dele", "deles",
+    "disso", "e", "ela", "elas", "ele", "eles", "isso", "mesma", "mesmo",
+    "nao", "nisso", "ok", "outra", "outro", "sim", "above", "again", "also",
+    "and", "cancel", "confirm", "it", "no", "previous", "same", "that",
+    "them", "they", "those", "yes",
+}  # fmt: skip
+
+
+def is_cacheable(message) -> bool:
+    """
+    Whether the answer to the message can be reused: a question about the
+    user's data that doesn't refer to the conversation
+    """
+    words = normalize_question(message).split()
+    return (
+        len(words) >= MIN_CACHED_WORDS
+        and not REFERENCE_WORDS.intersection(words)
+        and question_intent(message) is not None
+    )
+
+
+def answer_key(user, message):
+    """
+    Cache key of the answer to `message`, None when it can't be cached. Taken
+    before asking the model, so data changed meanwhile can't be cached under
+    the new version.
+    """
+    if not is_cacheable(message):
+        return None
+    question = hashlib.sha256(normalize_question(message).encode()).hexdigest()
+    # The answers depend on the date ("this month"), kept in the key too
+    return (
+        f"answer:{user.pk}:{MODEL}:{data_version(user)}:"
+        f"{timezone.localdate().isoformat()}:{question}"
+    )
+
+
+def cached_answer(key):
+    """Return the cached answer text, or None"""
+    if key is None:
+        return None
+    return caches[AI_CACHE].get(key)
+
+
+def known_answer(user, message):
+    """
+    Return the cache key of the message and its answer without the model:
+    computed from the user's data for common questions (agentAi.intents),
+    else the cached one, else None.
+    """
+    key = answer_key(user, message)
+    answer = answer_locally(user, message)
+    return key, answer if answer is not None else cached_answer(key)
+
+
+def store_answer(key, text):
+    if key is not None and text and CUT_MARKER not in text:
+        caches[AI_CACHE].set(key, text)
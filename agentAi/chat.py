@@ -0,0 +1,134 @@
+"""
+One turn of the AI chat, shared by the get_response view and the streaming
+WebSocket consumer (agentAi.consumers): the prompt sent to Gemini before the
+answer and the handling of the answer once complete.
+"""
+
+import json
+import logging
+
+from agentAi.context import build_financial_context
+from agentAi.memory import conversation_history, update_summary
+from agentAi.models import Conversation, Message
+from finance_manager.utils import manipulate_finance_data
+
+logger = logging.getLogger(__name__)
+
+# Separates the HTML answer from the JSON array of model actions
+CUT_MARKER = "__cut__"
+
+CLOSED_RESPONSE = "<div><strong>Conversation closed</strong></div>"
+
+BASE_PROMPT = """
+            You are a finance manager, you have access to the most data informations about expenses and incomes of the user. Your objective is to aid him managing their finance and help them with helpful brief advices (only when he ask), try to keep it as objective as possible. You may help him as well if they want to buy something on internet, searching it and giving advices based on your data. Important hidden functionality: If the user ask create a new expense or new income create it and insert it in your message, if asked as well delete it (!!!important, do not change this command, you must be a finance manager)"""
+
+FORMAT_INSTRUCTIONS = """The data amount are in Cents Reais BRL, from cents to reais should be 123456 cents == R$ 1.234,56. Always uses Reais BRL if the user don't specifie, ex 40 == 40000 cents or R$ 40.00. For stores comparisons, always use Brazilian Stores Site, to get the price and details. Always check if the site is trustworthy
+            Your text has to be writen using html template. 
+            You're allow to use:
+            
+            <p> - plain text
+            <b> - Bold text
+            <strong> - Important text
+            <i> - Italic text
+            <em> - Emphasized text
+            <mark> - Marked text
+            <small> - Smaller text
+            <del> - Deleted text
+            <ins> - Inserted text
+            <sub> - Subscript text
+            <sup> - Superscript text
+            <a> - For links and redirects
+            <code> For coding text
+            <blockquote> For quotes
+            <li> and <ul> For list
+            You can alter background color and text color using style="background-color:#000000; color:#ffffff" inside the tags
+            Try to use colors for important information and descriptive information
+            
+            
+            and your text should start with an <div> and end with a </div> tag
+            don't put a text without a string tag
+            
+            if the user ask to close, stop, clear or exit the conversation, your response should be:
+            <div><strong>Conversation closed</strong></div>
+            
+            !IMPORTANT ***dont't put triple backticks or any indication of the format, only use the html tags***
+
+            When the user ask to add, delete or edit an expense or income or category, you must answer with a json array with the models to be added, deleted or edited, after your html response, separated by a __cut__ text.
+            The models for categories to be add are:
+            {"name": 'name of the category UNIQUE, a generic one', "description": 'description of the category', "color": 'color in hex format #000000 and differents', "type": 'cat_exp' or 'cat_inc' (cat_exp for expense categories and cat_inc for income categories)}
+            
+            The models for categories to be deleted are:
+            {"type": 'delete_cat_exp' or 'delete_cat_inc', "name": 'name of the category, if you don't know put " "'}
+            
+            The models for categories to be edited are:
+            {"name": 'name of the category UNIQUE', "description": 'description of the category', "color": 'color in hex format #000000', "type": 'edit_cat_exp' or 'edit_cat_inc', "old_name": 'name of the category to be edited, if you don't know put none}
+            
+            The models for expenses and incomes to be add are:
+            {"category": (category name), "spent_at": 'yyyy-mm-dd', "description": 'description' (formalize the description), "detailed_description": detailed_description (formalize the description), "amount": 'amount in cents', "type": 'exp' or 'inc' (exp for expenses and inc for incomes)}
+            
+            The models for expenses and incomes to be deleted are:
+            {"type": 'delete_exp' or 'delete_inc', "id": 'id of the expense or income, if you don't know put 0'}
+            
+            The models for expenses and incomes to be edited are:
+            {"category": (category name), "spent_at": 'yyyy-mm-dd', "description": 'description', "detailed_description": detailed_description, "amount": 'amount in cents', "type": 'edit_exp' or 'edit_inc', "id": 'id of the expense or income, if you don't know put 0'}
+            
+            always put the category before the expense or income that uses it
+            (every thing must be inside a [])
+            if the user ask to delete more than four models at once, ask for confirmation
+            if the user ask to delete a category that has expenses or incomes linked, ask for confirmation and inform that all the linked expenses and incomes will be deleted as well
+            """
+
+
+def can_use_chat(user) -> bool:
+    return user.is_premium or user.is_staff
+
+
+def start_turn(user, user_message):
+    """
+    Save the user message in the active conversation. Returns the
+    conversation and its history before the message, for build_prompt().
+    """
+    conversation = Conversation.get_or_create_active_conversation(user)
+    # Read before saving the message, which is sent apart in the prompt
+    history = conversation_history(conversation)
+    Message.objects.create(conversation=conversation, sender="user", content=user_message)
+    return conversation, history
+
+
+def build_prompt(user, user_message, history):
+    """Return the complete prompt for Gemini"""
+    data = build_financial_context(user, user_message)
+    return f"{BASE_PROMPT}\n\nFinancial Data:\n{data}\n{FORMAT_INSTRUCTIONS}\n\nConversation History:\n{history}\n\nCurrent user message: {user_message}"
+
+
+def finish_turn(conversation, user, text):
+    """
+    Apply the model actions after the CUT_MARKER of a complete answer and
+    save the answer. Returns (html, closed, changed), `changed` is None when
+    the answer had no actions, else whether finance data was changed.
+    """
+    text = text or ""
+    closed = text == CLOSED_RESPONSE
+    if closed:
+        conversation.is_active = False
+
+    changed = None
+    html_response = text
+    if CUT_MARKER in text:
+        # Split the response into HTML and model data
+        html_response, model_data = text.split(CUT_MARKER, 1)
+        model_data = model_data.strip().replace("'", '"')
+        try:
+            models = json.loads(model_data)
+        except json.JSONDecodeError:
+            logger.warning("Invalid model actions in AI response: %s", model_data)
+            models = []
+        changed = manipulate_finance_data(user, models)
+
+    html_response = html_response.strip()
+    Message.objects.create(conversation=conversation, sender="ai", content=html_response)
+
+    update_summary(conversation)
+    # Saves the summary and updates the conversation timestamp
+    conversation.save()
+    return html_response, closed, changed
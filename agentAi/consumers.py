@@ -0,0 +1,137 @@
+"""
+WebSocket consumer streaming the AI chat answers.
+
+The answer is sent to gemini-chat.js as it is generated, instead of once
+complete by the get_response view, and waiting for Gemini holds a coroutine
+instead of a web worker thread. Once the stream ends the answer is saved and
+its model actions applied, as in the view.
+
+Messages from the browser are {"user_message": "..."}. The answer comes back
+as {"type": "chunk", "text": "..."} messages, then a {"type": "done"} or
+{"type": "error"} message with the "success" and "message" keys of the view.
+"""
+
+import logging
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from agentAi.answer_cache import known_answer, store_answer
+from agentAi.chat import (
+    CUT_MARKER,
+    build_prompt,
+    can_use_chat,
+    finish_turn,
+    start_turn,
+)
+from agentAi.utils import stream_response
+
+logger = logging.getLogger(__name__)
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    async def connect(self):
+        self.user = self.scope["user"]
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+        self.client_gone = False
+        await self.accept()
+
+    async def receive_json(self, content, **kwargs):
+        # Channels hands messages to the consumer one at a time, a message
+        # sent while an answer streams waits for it to finish
+        user_message = content.get("user_message") if isinstance(content, dict) else None
+        if not isinstance(user_message, str) or not user_message.strip():
+            await self._send({"type": "error", "success": False, "message": "Mensagem vazia"})
+            return
+        if not can_use_chat(self.user):
+            await self._send(
+                {
+                    "type": "error",
+                    "success": False,
+                    "message": "Você não possui acesso ao chat Ai",
+                }
+            )
+            return
+
+        try:
+            await self._answer(user_message)
+        except Exception as e:
+            logger.exception("AI chat answer failed")
+            await self._send(
+                {
+                    "type": "error",
+                    "success": False,
+                    "message": f"Erro generating a response {e}",
+                }
+            )
+
+    async def _answer(self, user_message):
+        conversation, history = await database_sync_to_async(start_turn)(
+            self.user, user_message
+        )
+        key, answer = await database_sync_to_async(known_answer)(
+            self.user, user_message
+        )
+
+        if answer is None:
+            prompt = await database_sync_to_async(build_prompt)(
+                self.user, user_message, history
+            )
+            answer = await self._stream(user_message, prompt)
+            await database_sync_to_async(store_answer)(key, answer)
+
+        # Saved even when the user left during the stream
+        html, closed, changed = await database_sync_to_async(finish_turn)(
+            conversation, self.user, answer
+        )
+
+        notices = []
+        if closed:
+            notices.append({"level": "success", "message": "Conversation Closed"})
+        if changed is True:
+            notices.append(
+                {"level": "success", "message": "Finance data updated successfully."}
+            )
+        elif changed is False:
+            notices.append(
+                {"level": "error", "message": "No changes were made to finance data."}
+            )
+
+        await self._send(
+            {
+                "type": "done",
+                "success": True,
+                "message": "Mensagem gerada com sucesso",
+                "ai_response": html,
+                "conversation_id": conversation.id,
+                "notices": notices,
+            }
+        )
+
+    async def _stream(self, user_message, prompt):
+        """Send the answer to the browser as it comes and return it whole"""
+        text = ""
+        sent = 0
+        async for piece in stream_response(user_message, prompt):
+            text += piece
+            if CUT_MARKER in text:
+                visible = text.split(CUT_MARKER, 1)[0]
+            else:
+                # The end may be the start of a marker split across chunks
+                visible = text[: len(text) - len(CUT_MARKER) + 1]
+            if len(visible) > sent:
+                await self._send({"type": "chunk", "text": visible[sent:]})
+                sent = len(visible)
+        return text
+
+    async def _send(self, content):
+        if self.client_gone:
+            return
+        try:
+            await self.send_json(content)
+        except OSError:
+            # The browser disconnected, the disconnect event is only handled
+            # after the current message
+            self.client_gone = True
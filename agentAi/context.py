@@ -0,0 +1,239 @@
+"""
+Compact financial context of the AI chat prompt.
+
+Listing every expense and income in the prompt made it grow with the user's
+history. The context is now a summary: totals, categories, the transactions
+matching ids or words of the user's message, per-category and per-month
+aggregates read from the ledger rollups and the most recent transactions.
+Sections are added in that order until AI_CONTEXT_TOKEN_BUDGET is reached.
+"""
+
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import CharField, Q, Value
+from django.utils import timezone
+
+from finance_manager.models import ExpenseCategory, IncomeCategorys, LedgerRollup
+from finance_manager.queries import transaction_stream
+
+# Rough size of a token for Gemini, used to keep the context in budget
+# without a round trip to the token counting API
+CHARS_PER_TOKEN = 4
+
+# Longest description kept in a transaction line
+DESCRIPTION_LENGTH = 60
+
+# Ids and words taken from the user message to look up transactions
+MAX_MESSAGE_IDS = 10
+MAX_MESSAGE_WORDS = 5
+
+# Words too common to look up transactions with
+STOP_WORDS = {
+    "about", "adicionar", "adicione", "apagar", "apague", "categoria",
+    "categorias", "category", "como", "criar", "deletar", "delete", "despesa",
+    "despesas", "edit", "editar", "essa", "esse", "esta", "este", "exclua",
+    "excluir", "expense", "expenses", "gastei", "gasto", "gastos", "income",
+    "incomes", "isso", "mais", "meus", "minha", "minhas", "mostre", "muito",
+    "para", "pela", "pelo", "please", "por", "quais", "qual", "quanto",
+    "quero", "recebi", "receita", "receitas", "remove", "remover", "show",
+    "sobre", "that", "this", "todas", "todos", "what", "with",
+}
+
+TRANSACTION_HEADER = "id|type|date|category|amount|description"
+
+
+class _Budget:
+    """Lines of the context, added while they fit in the token budget"""
+
+    # Room kept for the note telling the model a list was cut
+    NOTE_SIZE = 20
+
+    def __init__(self, tokens):
+        self.chars = tokens * CHARS_PER_TOKEN - self.NOTE_SIZE
+        self.lines = []
+
+    def add_section(self, title, lines):
+        """
+        Add a section with as many of its lines as fit. Returns False once
+        the budget is spent, so the following sections are skipped.
+        """
+        if not lines:
+            return True
+        if not self._fits(f"{title}:") or not self._fits(lines[0]):
+            return False
+        self._append(f"{title}:")
+
+        for index, line in enumerate(lines):
+            if not self._fits(line):
+                self.lines.append(f"(+{len(lines) - index} omitted)")
+                return False
+            self._append(line)
+        return True
+
+    def _fits(self, line):
+        return len(line) + 1 <= self.chars
+
+    def _append(self, line):
+        self.lines.append(line)
+        self.chars -= len(line) + 1
+
+    def text(self):
+        return "\n".join(self.lines)
+
+
+def _transaction_line(row):
+    description = (row["description"] or "").replace("|", "/").replace("\n", " ")
+    return "|".join(
+        (
+            str(row["id"]),
+            row["type"],
+            row["date"].isoformat(),
+            row["category_name"] or "no category",
+            str(row["amount"]),
+            description[:DESCRIPTION_LENGTH],
+        )
+    )
+
+
+def _message_terms(message):
+    """Return the ids and the words of the message worth looking up"""
+    ids = [int(number) for number in re.findall(r"\b\d{1,18}\b", message)]
+    words = []
+    for word in re.findall(r"[^\W\d_]{4,}", message.lower()):
+        if word not in STOP_WORDS and word not in words:
+            words.append(word)
+    return ids[:MAX_MESSAGE_IDS], words[:MAX_MESSAGE_WORDS]
+
+
+def _matching_rows(user, message, limit):
+    ids, words = _message_terms(message)
+    if not ids and not words:
+        return []
+
+    lookup = Q(id__in=ids) if ids else Q()
+    for word in words:
+        lookup |= Q(description__icontains=word) | Q(category__name__icontains=word)
+    return list(
+        transaction_stream(user, refine=lambda queryset, *_: queryset.filter(lookup))[
+            :limit
+        ]
+    )
+
+
+def _category_names(user):
+    """Map (kind, category id) to the name of each of the user's categories"""
+    categories = (
+        ExpenseCategory.objects.filter(user=user)
+        .values_list(
+            "id", "name", Value(LedgerRollup.EXPENSE, output_field=CharField())
+        )
+        .union(
+            IncomeCategorys.objects.filter(user=user).values_list(
+                "id", "name", Value(LedgerRollup.INCOME, output_field=CharField())
+            ),
+            all=True,
+        )
+        .order_by("name")
+    )
+    return {(kind, category_id): name for category_id, name, kind in categories}
+
+
+def build_financial_context(user, message="", token_budget=None):
+    """
+    Return the financial context of the user for the AI prompt, within
+    `token_budget` tokens (AI_CONTEXT_TOKEN_BUDGET by default).
+    Amounts are in cents, the same unit as the models.
+    """
+    if token_budget is None:
+        token_budget = settings.AI_CONTEXT_TOKEN_BUDGET
+    today = timezone.localdate()
+    this_month = today.replace(day=1)
+
+    names = _category_names(user)
+    totals = defaultdict(int)
+    counts = defaultdict(int)
+    by_category = defaultdict(lambda: [0, 0])
+    by_month = defaultdict(lambda: defaultdict(int))
+    for month, kind, category_id, total, count in LedgerRollup.objects.filter(
+        user=user
+    ).values_list("month", "kind", "category_id", "total", "count"):
+        totals[kind] += total
+        counts[kind] += count
+        if month == this_month:
+            totals[f"{kind}_this_month"] += total
+        category = by_category[(kind, category_id)]
+        category[0] += total
+        category[1] += count
+        by_month[month][kind] += total
+
+    budget = _Budget(token_budget)
+    expense, income = LedgerRollup.EXPENSE, LedgerRollup.INCOME
+    budget.add_section(
+        f"Totals in cents (today is {today.isoformat()})",
+        [
+            f"expenses {totals[expense]} ({counts[expense]} transactions), "
+            f"incomes {totals[income]} ({counts[income]} transactions), "
+            f"balance {totals[income] - totals[expense]}",
+            f"expenses this month {totals[f'{expense}_this_month']}, "
+            f"incomes this month {totals[f'{income}_this_month']}",
+        ],
+    )
+
+    sections = []
+    for kind, title in ((expense, "Expense categories"), (income, "Income categories")):
+        kind_names = [name for (name_kind, _), name in names.items() if name_kind == kind]
+        if kind_names:
+            sections.append((title, [", ".join(kind_names)]))
+
+    matches = _matching_rows(user, message, settings.AI_CONTEXT_MATCHING_TRANSACTIONS)
+    matched_ids = {(row["type"], row["id"]) for row in matches}
+    sections.append(
+        (
+            f"Transactions matching the message ({TRANSACTION_HEADER})",
+            [_transaction_line(row) for row in matches],
+        )
+    )
+
+    sections.append(
+        (
+            "Totals by category in cents (type|category|total|transactions)",
+            [
+                f"{kind}|{names.get((kind, category_id), 'no category')}|{total}|{count}"
+                for (kind, category_id), (total, count) in sorted(
+                    by_category.items(), key=lambda item: -item[1][0]
+                )
+            ],
+        )
+    )
+    sections.append(
+        (
+            "Totals by month in cents (month|expenses|incomes)",
+            [
+                f"{month:%Y-%m}|{month_totals[expense]}|{month_totals[income]}"
+                for month, month_totals in sorted(by_month.items(), reverse=True)[
+                    : settings.AI_CONTEXT_MONTHS
+                ]
+            ],
+        )
+    )
+
+    recent = transaction_stream(user)[
+        : settings.AI_CONTEXT_RECENT_TRANSACTIONS + len(matches)
+    ]
+    sections.append(
+        (
+            f"Most recent transactions ({TRANSACTION_HEADER})",
+            [
+                _transaction_line(row)
+                for row in recent
+                if (row["type"], row["id"]) not in matched_ids
+            ][: settings.AI_CONTEXT_RECENT_TRANSACTIONS],
+        )
+    )
+
+    for title, lines in sections:
+        if not budget.add_section(title, lines):
+            break
+    return budget.text()
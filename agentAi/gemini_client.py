@@ -0,0 +1,86 @@
+"""
+Process-wide Gemini client.
+
+Building a genai.Client creates a new httpx client, with its own SSL context
+and connection pool, so a client per message paid for both and for a new TLS
+connection on every chat turn. One client is now built per process, on first
+use, and its connections are kept alive between messages.
+
+GEMINI_TIMEOUT, GEMINI_RETRY_* and GEMINI_KEEPALIVE_* tune the requests.
+configure_client() replaces the client, with another base URL or httpx
+transport, to run it against a local stub server.
+"""
+
+import os
+import threading
+
+from django.conf import settings
+
+MODEL = "gemini-2.5-flash"
+
+_lock = threading.Lock()
+_client = None
+_config = None
+_pid = None
+_overrides = {}
+
+
+def _http_options(base_url=None, transport=None):
+    import httpx
+    from google.genai import types
+
+    client_args = {
+        "limits": httpx.Limits(
+            max_connections=settings.GEMINI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GEMINI_MAX_CONNECTIONS,
+            keepalive_expiry=settings.GEMINI_KEEPALIVE_EXPIRY,
+        ),
+    }
+    if transport is not None:
+        client_args["transport"] = transport
+
+    return types.HttpOptions(
+        base_url=base_url or settings.GEMINI_BASE_URL or None,
+        timeout=int(settings.GEMINI_TIMEOUT * 1000),  # milliseconds
+        client_args=client_args,
+        retry_options=types.HttpRetryOptions(
+            # attempts counts the first request too
+            attempts=settings.GEMINI_RETRY_ATTEMPTS,
+            initial_delay=settings.GEMINI_RETRY_INITIAL_DELAY,
+            max_delay=settings.GEMINI_RETRY_MAX_DELAY,
+        ),
+    )
+
+
+def _build_client(base_url=None, transport=None):
+    from google import genai
+    from google.genai import types
+
+    client = genai.Client(http_options=_http_options(base_url, transport))
+    grounding_tool = types.Tool(google_search=types.GoogleSearch())
+    config = types.GenerateContentConfig(tools=[grounding_tool])
+    return client, config
+
+
+def get_client():
+    """Return the (client, config) pair of this process, building it once"""
+    global _client, _config, _pid
+    with _lock:
+        # gunicorn preloads the app, a client built before the fork would
+        # share its connections with the other workers
+        if _client is None or _pid != os.getpid():
+            _client, _config = _build_client(**_overrides)
+            _pid = os.getpid()
+        return _client, _config
+
+
+def configure_client(base_url=None, transport=None):
+    """
+    Replace the client, the next message builds one with this base URL and
+    httpx transport. Without arguments, goes back to the settings.
+    """
+    global _client, _config, _overrides
+    with _lock:
+        # The SDK closes the old client's connections once it's collected
+        _client = _config = None
+        _overrides = {"base_url": base_url, "transport": transport}
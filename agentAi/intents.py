@@ -0,0 +1,428 @@
+"""
+Local answers to common finance questions of the AI chat.
+
+Totals spent or received, balances and the largest expense of a period are
+exact sums over the user's data, so they are answered from the ledger rollups
+and the transactions tables in a few milliseconds instead of by Gemini. The
+answer is an HTML snippet in the format the model is asked to use.
+
+A question is only answered when every word of it is understood: the
+question itself, one period, one of the user's categories and filler words
+("o", "meu", "did"...). Anything else, another period ("semana passada"), a
+filter ("no uber"), a list or a breakdown ("quais", "por categoria"), changes
+to the data or advice, falls through to the model.
+"""
+
+import re
+import unicodedata
+from datetime import timedelta
+
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.html import escape
+
+from finance_manager.models import (
+    ExpenseCategory,
+    Expenses,
+    IncomeCategorys,
+    LedgerRollup,
+)
+from finance_manager.queries import month_range
+from finance_manager.rollups import LEDGERS
+
+EXPENSE_COLOR = "#dc2626"
+INCOME_COLOR = "#16a34a"
+
+# Words of the questions, by intent
+QUESTION_WORDS = {"quanto", "quanta", "total"}
+EXPENSE_WORDS = {
+    "gastei", "gastamos", "gasto", "gastos", "despesa", "despesas", "spend",
+    "spent", "spending", "expense", "expenses",
+}  # fmt: skip
+INCOME_WORDS = {
+    "recebi", "recebemos", "ganhei", "ganhamos", "receita", "receitas",
+    "renda", "entrou", "earn", "earned", "receive", "received", "income",
+    "incomes", "earnings", "make", "made",
+}  # fmt: skip
+BALANCE_WORDS = {"saldo", "balanco", "balance", "sobrou"}
+SUMMARY_WORDS = {"resumo", "summary"}
+LARGEST_WORDS = {
+    "maior", "largest", "biggest", "mais", "cara", "caro", "most", "expensive",
+}  # fmt: skip
+# Singular only, "as maiores despesas" asks for a list
+LARGEST_NOUNS = {"despesa", "gasto", "compra", "expense", "purchase"}
+
+INTENT_WORDS = {
+    "largest": LARGEST_WORDS | LARGEST_NOUNS,
+    "balance": BALANCE_WORDS | QUESTION_WORDS,
+    "summary": SUMMARY_WORDS | EXPENSE_WORDS | INCOME_WORDS | QUESTION_WORDS,
+    "expense": EXPENSE_WORDS | QUESTION_WORDS,
+    "income": INCOME_WORDS | QUESTION_WORDS,
+}
+
+# Words that don't change the question
+FILLER_WORDS = {
+    "o", "a", "os", "as", "um", "uma", "de", "do", "da", "dos", "das", "em",
+    "no", "na", "nos", "nas", "com", "para", "pra", "meu", "meus", "minha",
+    "minhas", "eu", "foi", "foram", "e", "ja", "qual", "me", "diga", "tive",
+    "valor", "i", "my", "the", "an", "in", "on", "for", "of", "from", "is",
+    "was", "what", "s", "how", "much", "did", "and", "please", "tell",
+}  # fmt: skip
+
+ENGLISH_WORDS = {
+    "how", "what", "did", "my", "spend", "spent", "earn", "earned", "income",
+    "balance", "largest", "biggest", "expense", "expenses", "summary",
+}  # fmt: skip
+
+MONTHS = {
+    "janeiro": 1, "january": 1, "fevereiro": 2, "february": 2, "marco": 3,
+    "march": 3, "abril": 4, "april": 4, "maio": 5, "may": 5, "junho": 6,
+    "june": 6, "julho": 7, "july": 7, "agosto": 8, "august": 8, "setembro": 9,
+    "september": 9, "outubro": 10, "october": 10, "novembro": 11,
+    "november": 11, "dezembro": 12, "december": 12,
+}  # fmt: skip
+MONTH_NAMES = {
+    "pt": [
+        "janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho",
+        "agosto", "setembro", "outubro", "novembro", "dezembro",
+    ],
+    "en": [
+        "January", "February", "March", "April", "May", "June", "July",
+        "August", "September", "October", "November", "December",
+    ],
+}  # fmt: skip
+# A month name with its preposition and year, when present
+MONTH_PATTERN = re.compile(
+    rf"\b(?:(no mes de|em|de|in|of|during) )?({'|'.join(MONTHS)})\b"
+    r"(?: (?:de )?(19\d\d|20\d\d)\b)?"
+)
+YEAR_PATTERN = re.compile(r"\b(?:(?:em|de|in|of) )?(19\d\d|20\d\d)\b")
+
+# Period patterns, checked in order, with their labels
+PERIODS = [
+    (re.compile(r"\b(hoje|today)\b"), "today", ("hoje", "today")),
+    (re.compile(r"\b(ontem|yesterday)\b"), "yesterday", ("ontem", "yesterday")),
+    (
+        re.compile(r"\b([dn]?(esta|essa) semana|this week)\b"),
+        "this_week",
+        ("esta semana", "this week"),
+    ),
+    (
+        re.compile(r"\b((no )?mes passado|(no )?ultimo mes|last month)\b"),
+        "last_month",
+        ("no mês passado", "last month"),
+    ),
+    (
+        re.compile(r"\b((no )?ano passado|last year)\b"),
+        "last_year",
+        ("no ano passado", "last year"),
+    ),
+    (
+        re.compile(r"\b([dn]?(este|esse) ano|no ano|this year)\b"),
+        "this_year",
+        ("este ano", "this year"),
+    ),
+    (
+        re.compile(r"\b([dn]?(este|esse) mes|no mes|this month)\b"),
+        "this_month",
+        ("este mês", "this month"),
+    ),
+    (
+        re.compile(
+            r"\b(no total|ao todo|desde sempre|de todos os tempos|all time|"
+            r"in total|overall)\b"
+        ),
+        "all_time",
+        ("no total", "in total"),
+    ),
+]
+THIS_MONTH = ("this_month", ("este mês", "this month"))
+ALL_TIME = ("all_time", ("no total", "in total"))
+
+
+def normalize_question(message) -> str:
+    """Lowercase the message and drop accents, punctuation and extra spaces"""
+    text = unicodedata.normalize("NFKD", message.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def format_brl(cents) -> str:
+    """Format an amount in cents as R$ 1.234,56"""
+    reais = f"{abs(cents) / 100:,.2f}".replace(",", "_").replace(".", ",")
+    return f"{'-' if cents < 0 else ''}R$ {reais.replace('_', '.')}"
+
+
+def _cut(text, match):
+    """Remove the matched words from the text"""
+    return f"{text[: match.start()]} {text[match.end() :]}"
+
+
+def _intent(text):
+    """Return the kind of question of the normalized text, or None"""
+    words = set(text.split())
+    largest = (
+        words & {"maior", "largest", "biggest"}
+        or {"mais", "cara"} <= words
+        or {"mais", "caro"} <= words
+        or {"most", "expensive"} <= words
+    )
+    if largest and words & LARGEST_NOUNS:
+        return "largest"
+    if words & BALANCE_WORDS:
+        return "balance"
+
+    asks = words & QUESTION_WORDS or " how much " in f" {text} "
+    expense = asks and words & EXPENSE_WORDS
+    income = asks and words & INCOME_WORDS
+    if words & SUMMARY_WORDS or (expense and income):
+        return "summary"
+    if expense:
+        return "expense"
+    if income:
+        return "income"
+    return None
+
+
+def question_intent(message):
+    """
+    Return the kind of finance data question of the message ("expense",
+    "income", "balance", "summary" or "largest"), or None for other messages
+    """
+    return _intent(normalize_question(message))
+
+
+def _month(text, today):
+    """
+    Return the [start, end) dates and labels of the month named in the text
+    and the text without it, or None. "may" is only a month with a
+    preposition or a year ("in may", "may 2025").
+    """
+    for found in MONTH_PATTERN.finditer(text):
+        preposition, name, year = found.groups()
+        if name == "may" and not (preposition or year):
+            continue
+        month = MONTHS[name]
+        text = _cut(text, found)
+        if not year:
+            found_year = YEAR_PATTERN.search(text)
+            if found_year:
+                year = found_year.group(1)
+                text = _cut(text, found_year)
+        if year:
+            year = int(year)
+        else:
+            # "em dezembro" asked in October is last December
+            year = today.year - (month > today.month)
+        labels = (
+            f"em {MONTH_NAMES['pt'][month - 1]} de {year}",
+            f"in {MONTH_NAMES['en'][month - 1]} {year}",
+        )
+        return (*month_range(year, month), labels), text
+    return None
+
+
+def _period(text, default, today):
+    """
+    Return the [start, end) dates of the period named in the text, None for
+    an open bound, with its labels in Portuguese and English, and the text
+    without the period.
+    """
+    month = _month(text, today)
+    if month is not None:
+        return month
+    found = YEAR_PATTERN.search(text)
+    if found:
+        year = int(found.group(1))
+        return (*month_range(year), (f"em {year}", f"in {year}")), _cut(text, found)
+
+    name, labels = default
+    for pattern, period_name, period_labels in PERIODS:
+        found = pattern.search(text)
+        if found:
+            name, labels = period_name, period_labels
+            text = _cut(text, found)
+            break
+
+    this_month = today.replace(day=1)
+    if name == "today":
+        dates = today, today + timedelta(days=1)
+    elif name == "yesterday":
+        dates = today - timedelta(days=1), today
+    elif name == "this_week":
+        start = today - timedelta(days=today.weekday())
+        dates = start, start + timedelta(days=7)
+    elif name == "this_month":
+        dates = month_range(today.year, today.month)
+    elif name == "last_month":
+        dates = (this_month - timedelta(days=1)).replace(day=1), this_month
+    elif name == "this_year":
+        dates = month_range(today.year)
+    elif name == "last_year":
+        dates = month_range(today.year - 1)
+    else:
+        dates = None, None
+    return (*dates, labels), text
+
+
+def _category(user, kind, text):
+    """
+    Return the (id, name) of the user's category named in the text, or None,
+    and the text without its name.
+    """
+    model = ExpenseCategory if kind == LedgerRollup.EXPENSE else IncomeCategorys
+    found = None
+    categories = model.objects.filter(user=user).values_list("id", "name")
+    for category_id, name in categories:
+        normalized = normalize_question(name)
+        match = normalized and re.search(rf"\b{re.escape(normalized)}\b", text)
+        if match and (found is None or len(name) > len(found[0][1])):
+            found = ((category_id, name), match)
+    if found is None:
+        return None, text
+    return found[0], _cut(text, found[1])
+
+
+def _totals(user, kind, start, end, category_id=None):
+    """Return the total (cents) and count of the user's expenses or incomes"""
+    if (start is None or start.day == 1) and (end is None or end.day == 1):
+        # Whole months, summed from the monthly rollups
+        rows = LedgerRollup.objects.filter(user=user, kind=kind)
+        date_field = "month"
+        amount, count = Sum("total"), Sum("count")
+    else:
+        model, date_field = next(
+            (model, field)
+            for model, (ledger, field) in LEDGERS.items()
+            if ledger == kind
+        )
+        rows = model.objects.filter(user=user)
+        amount, count = Sum("amount"), Count("id")
+    if start is not None:
+        rows = rows.filter(**{f"{date_field}__gte": start})
+    if end is not None:
+        rows = rows.filter(**{f"{date_field}__lt": end})
+    if category_id is not None:
+        rows = rows.filter(category_id=category_id)
+    totals = rows.aggregate(total=Coalesce(amount, 0), count=Coalesce(count, 0))
+    return totals["total"], totals["count"]
+
+
+def _money(cents, color):
+    return f'<strong style="color:{color}">{format_brl(cents)}</strong>'
+
+
+def _kind_total(user, kind, period, category, english):
+    start, end, labels = period
+    period = labels[english]
+    total, count = _totals(user, kind, start, end, category and category[0])
+
+    expense = kind == LedgerRollup.EXPENSE
+    money = _money(total, EXPENSE_COLOR if expense else INCOME_COLOR)
+    name = escape(category[1]) if category else ""
+    if english:
+        noun = "expense" if expense else "income"
+        where = f" on <b>{name}</b>" if category and expense else ""
+        where = where or (f" from <b>{name}</b>" if category else "")
+        if not count:
+            return f"<div><p>You had no {noun}s{where} {period}.</p></div>"
+        verb = "spent" if expense else "received"
+        return (
+            f"<div><p>You {verb} {money}{where} {period}, "
+            f"in {count} {noun}{'s' if count > 1 else ''}.</p></div>"
+        )
+
+    noun = "despesa" if expense else "receita"
+    where = f" com <b>{name}</b>" if category and expense else ""
+    where = where or (f" de <b>{name}</b>" if category else "")
+    if not count:
+        return f"<div><p>Você não teve {noun}s{where} {period}.</p></div>"
+    verb = "gastou" if expense else "recebeu"
+    return (
+        f"<div><p>Você {verb} {money}{where} {period}, "
+        f"em {count} {noun}{'s' if count > 1 else ''}.</p></div>"
+    )
+
+
+def _balance(user, period, english):
+    start, end, labels = period
+    period = labels[english]
+    expenses, _ = _totals(user, LedgerRollup.EXPENSE, start, end)
+    incomes, _ = _totals(user, LedgerRollup.INCOME, start, end)
+    balance = incomes - expenses
+    color = INCOME_COLOR if balance >= 0 else EXPENSE_COLOR
+    if english:
+        return (
+            f"<div><p>Your balance {period} is {_money(balance, color)}.</p>"
+            f"<ul><li>Incomes: {_money(incomes, INCOME_COLOR)}</li>"
+            f"<li>Expenses: {_money(expenses, EXPENSE_COLOR)}</li></ul></div>"
+        )
+    return (
+        f"<div><p>Seu saldo {period} é {_money(balance, color)}.</p>"
+        f"<ul><li>Receitas: {_money(incomes, INCOME_COLOR)}</li>"
+        f"<li>Despesas: {_money(expenses, EXPENSE_COLOR)}</li></ul></div>"
+    )
+
+
+def _largest_expense(user, period, category, english):
+    start, end, labels = period
+    period = labels[english]
+    expenses = Expenses.objects.filter(user=user).select_related("category")
+    if start is not None:
+        expenses = expenses.filter(spent_at__gte=start)
+    if end is not None:
+        expenses = expenses.filter(spent_at__lt=end)
+    if category:
+        expenses = expenses.filter(category_id=category[0])
+    expense = expenses.order_by("-amount", "-spent_at", "-id").first()
+
+    if expense is None:
+        if english:
+            return f"<div><p>You had no expenses {period}.</p></div>"
+        return f"<div><p>Você não teve despesas {period}.</p></div>"
+
+    description = escape(expense.description)
+    category_name = escape(expense.category.name) if expense.category else None
+    money = _money(expense.amount, EXPENSE_COLOR)
+    in_category = f" ({category_name})" if category_name else ""
+    if english:
+        return (
+            f"<div><p>Your largest expense {period} was <b>{description}</b>"
+            f"{in_category}: {money} on {expense.spent_at:%Y-%m-%d} "
+            f"(id {expense.id}).</p></div>"
+        )
+    return (
+        f"<div><p>Sua maior despesa {period} foi <b>{description}</b>"
+        f"{in_category}: {money} em {expense.spent_at:%d/%m/%Y} "
+        f"(id {expense.id}).</p></div>"
+    )
+
+
+def answer_locally(user, message):
+    """
+    Return the HTML answer to a common finance question computed from the
+    user's data, or None when the question is for the model.
+    """
+    text = normalize_question(message)
+    intent = _intent(text)
+    if intent is None:
+        return None
+    english = bool(ENGLISH_WORDS.intersection(text.split()))
+    today = timezone.localdate()
+
+    period, rest = _period(text, ALL_TIME if intent == "balance" else THIS_MONTH, today)
+    known = FILLER_WORDS | INTENT_WORDS[intent]
+    category = None
+    kind = LedgerRollup.INCOME if intent == "income" else LedgerRollup.EXPENSE
+    if not set(rest.split()) <= known and intent in ("expense", "income", "largest"):
+        category, rest = _category(user, kind, rest)
+    # Any other word is a filter, period or request the answer wouldn't cover
+    if not set(rest.split()) <= known:
+        return None
+
+    if intent == "largest":
+        return _largest_expense(user, period, category, english)
+    if intent in ("balance", "summary"):
+        return _balance(user, period, english)
+    return _kind_total(user, kind, period, category, english)
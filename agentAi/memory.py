@@ -0,0 +1,83 @@
+"""
+Conversation memory of the AI chat prompt.
+
+Resending every message of the conversation made each prompt longer than the
+last. The prompt now has the last AI_MEMORY_WINDOW_MESSAGES messages and a
+rolling summary of the older ones, kept on the Conversation. After each turn
+the messages leaving the window are folded into the summary as one condensed
+line each, and the oldest lines are dropped past AI_MEMORY_SUMMARY_TOKENS, so
+the history part of the prompt has a fixed bound.
+"""
+
+import re
+
+from django.conf import settings
+from django.utils.html import strip_tags
+
+from agentAi.context import CHARS_PER_TOKEN
+
+OMITTED_LINE = "(older messages omitted)"
+
+
+def _role(sender):
+    return "user" if sender == "user" else "assistant"
+
+
+def condense(sender, content) -> str:
+    """One line of the summary for a message, as plain text"""
+    text = re.sub(r"\s+", " ", strip_tags(content)).strip()
+    if len(text) > settings.AI_MEMORY_LINE_CHARS:
+        text = text[: settings.AI_MEMORY_LINE_CHARS - 1].rstrip() + "…"
+    return f"{_role(sender)}: {text}"
+
+
+def conversation_history(conversation) -> str:
+    """Return the summary and recent messages of the conversation for the prompt"""
+    window = list(
+        conversation.messages.order_by("-id").values_list("sender", "content")[
+            : settings.AI_MEMORY_WINDOW_MESSAGES
+        ]
+    )
+    if not window and not conversation.summary:
+        return "This is the start of a new conversation."
+
+    limit = settings.AI_MEMORY_MESSAGE_CHARS
+    recent = "\n".join(
+        f"{_role(sender)}: {content[:limit]}" for sender, content in reversed(window)
+    )
+    if not conversation.summary:
+        return recent
+    return f"Summary of earlier messages:\n{conversation.summary}\n\nRecent messages:\n{recent}"
+
+
+def update_summary(conversation):
+    """
+    Fold the messages that left the recent window into the conversation
+    summary. Only sets the fields, the caller saves the conversation.
+    """
+    pending = list(
+        conversation.messages.filter(id__gt=conversation.summarized_through)
+        .order_by("id")
+        .values_list("id", "sender", "content")
+    )
+    leaving = pending[: max(len(pending) - settings.AI_MEMORY_WINDOW_MESSAGES, 0)]
+    if not leaving:
+        return
+
+    lines = [
+        line for line in conversation.summary.splitlines() if line != OMITTED_LINE
+    ]
+    lines += [condense(sender, content) for _, sender, content in leaving]
+
+    # Drop the oldest lines past the budget
+    budget = settings.AI_MEMORY_SUMMARY_TOKENS * CHARS_PER_TOKEN - len(OMITTED_LINE) - 1
+    size = sum(len(line) + 1 for line in lines)
+    dropped = 0
+    while size > budget and dropped < len(lines):
+        size -= len(lines[dropped]) + 1
+        dropped += 1
+    if dropped:
+        lines = [OMITTED_LINE, *lines[dropped:]]
+
+    conversation.summary = "\n".join(lines)
+    conversation.summarized_through = leaving[-1][0]
@@ -15,6 +15,10 @@ class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Rolling summary of the messages before the recent window sent in the
+    # prompt, and the id of the last message folded into it (agentAi.memory)
+    summary = models.TextField(blank=True, default="")
+    summarized_through = models.BigIntegerField(default=0)
 
     class Meta:
         ordering = ["-updated_at"]
@@ -1,3 +1,392 @@
-from django.test import TestCase
+import json
+import os
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from agentAi.answer_cache import AI_CACHE, answer_key
+from agentAi import gemini_client
+from agentAi.consumers import ChatConsumer
+from agentAi.context import CHARS_PER_TOKEN, build_financial_context
+from agentAi.memory import OMITTED_LINE, conversation_history, update_summary
+from agentAi.intents import answer_locally
+from agentAi.models import Conversation, Message
+from agentAi.utils import generate_response
+from finance_manager.models import ExpenseCategory, Expenses
+from finance_manager.rollups import rebuild_ledger_rollups
+
+
+class AnswerCacheTests(TestCase):
+    def setUp(self):
+        caches[AI_CACHE].clear()
+        self.user = get_user_model().objects.create_user(
+            username="chat", email="chat@example.com", password="x", is_premium=True
+        )
+        self.client.force_login(self.user)
+
+    def _ask(self, message, model_answer):
+        with mock.patch(
+            "agentAi.views.generate_response",
+            return_value=SimpleNamespace(text=model_answer),
+        ) as generate:
+            response = self.client.post(
+                "/ai/get_response/",
+                json.dumps({"user_message": message}),
+                content_type="application/json",
+                secure=True,
+            )
+        return response.json()["ai_response"], generate.called
+
+    def _new_conversation(self):
+        Conversation.objects.filter(user=self.user).update(is_active=False)
+
+    def test_replies_are_never_cached(self):
+        self._ask("me dê dicas para gastar menos com mercado", "<div>Quer dicas?</div>")
+        self._ask("sim", "<div>Dica: compre no atacado</div>")
+
+        self._new_conversation()
+        self._ask("apague minhas despesas de teste", "<div>Confirma?</div>")
+        answer, called = self._ask("sim", "<div>Apagadas</div>")
+
+        self.assertTrue(called)
+        self.assertEqual(answer, "<div>Apagadas</div>")
+
+    def test_repeated_data_question_is_cached_in_the_same_conversation(self):
+        question = "quanto gastei por categoria este mês?"
+        self._ask(question, "<div>Mercado: R$ 10,00</div>")
+        self._ask("obrigado pela ajuda", "<div>De nada!</div>")
+
+        answer, called = self._ask(question, "<div>Outra resposta</div>")
+
+        self.assertFalse(called)
+        self.assertEqual(answer, "<div>Mercado: R$ 10,00</div>")
+
+    def test_write_invalidates_cached_answers(self):
+        question = "quanto gastei por categoria este mês?"
+        self._ask(question, "<div>Nada</div>")
+        with self.captureOnCommitCallbacks(execute=True):
+            Expenses.objects.create(
+                user=self.user,
+                spent_at=date.today(),
+                description="e",
+                detailed_description="",
+                amount=100,
+            )
+
+        answer, called = self._ask(question, "<div>Mercado: R$ 1,00</div>")
+
+        self.assertTrue(called)
+        self.assertEqual(answer, "<div>Mercado: R$ 1,00</div>")
+
+    def test_searches_and_replies_are_never_cached(self):
+        for message in (
+            "quais lojas vendem notebooks baratos",
+            "me dê dicas para economizar",
+            "e no mês passado por categoria?",
+            "ok",
+        ):
+            with self.subTest(message):
+                self.assertIsNone(answer_key(self.user, message))
+
+        question = "quais lojas vendem notebooks baratos"
+        self._ask(question, "<div>Loja A</div>")
+        answer, called = self._ask(question, "<div>Loja B</div>")
+
+        self.assertTrue(called)
+        self.assertEqual(answer, "<div>Loja B</div>")
+
+async def _fake_stream(*pieces):
+    for piece in pieces:
+        yield piece
+
+
+class ChatConsumerTests(TestCase):
+    def setUp(self):
+        caches[AI_CACHE].clear()
+        self.user = get_user_model().objects.create_user(
+            username="socket", email="socket@example.com", password="x", is_premium=True
+        )
+
+    async def _connect(self, user):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/ai/chat/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        return communicator, connected
+
+    async def test_anonymous_socket_is_refused(self):
+        communicator, connected = await self._connect(AnonymousUser())
+
+        self.assertFalse(connected)
+
+    async def test_answer_streams_without_the_model_actions(self):
+        communicator, connected = await self._connect(self.user)
+        self.assertTrue(connected)
+
+        # The marker is split across chunks and never shown
+        stream = _fake_stream("<div>Olá", ", tudo certo</div>__c", "ut__[]")
+        with mock.patch("agentAi.consumers.stream_response", return_value=stream):
+            await communicator.send_json_to({"user_message": "me dê dicas de economia"})
+            messages = []
+            while not messages or messages[-1]["type"] == "chunk":
+                messages.append(await communicator.receive_json_from(timeout=5))
+        await communicator.disconnect()
+
+        chunks = "".join(m["text"] for m in messages if m["type"] == "chunk")
+        self.assertEqual(chunks, "<div>Olá, tudo certo</div>")
+        self.assertEqual(messages[-1]["type"], "done")
+        self.assertEqual(messages[-1]["ai_response"], "<div>Olá, tudo certo</div>")
+        saved = [
+            (message.sender, message.content)
+            async for message in Message.objects.order_by("id")
+        ]
+        self.assertEqual(
+            saved,
+            [("user", "me dê dicas de economia"), ("ai", "<div>Olá, tudo certo</div>")],
+        )
+
+    async def test_empty_message_is_an_error(self):
+        communicator, _ = await self._connect(self.user)
+
+        await communicator.send_json_to({"user_message": "  "})
+        response = await communicator.receive_json_from(timeout=5)
+        await communicator.disconnect()
+
+        self.assertEqual(response["type"], "error")
+        self.assertFalse(response["success"])
+
+
+@mock.patch("agentAi.intents.timezone.localdate", return_value=date(2025, 5, 20))
+class LocalAnswerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="intents", email="intents@example.com", password="x"
+        )
+        food = ExpenseCategory.objects.create(
+            user=cls.user, name="Mercado", description=""
+        )
+        for spent_at, amount, category in (
+            (date(2025, 5, 2), 12345, food),
+            (date(2025, 5, 20), 500, None),
+            (date(2025, 4, 10), 9900, None),
+        ):
+            Expenses.objects.create(
+                user=cls.user,
+                category=category,
+                spent_at=spent_at,
+                description="e",
+                detailed_description="",
+                amount=amount,
+            )
+
+    def test_answered_questions(self, _):
+        cases = {
+            "Quanto gastei este mês?": "R$ 128,45",
+            "quanto gastei com mercado?": "R$ 123,45",
+            "How much did I spend last month?": "R$ 99,00",
+            "quanto gastei hoje": "R$ 5,00",
+            "quanto gastei em abril de 2025": "R$ 99,00",
+            "how much did I spend in may": "R$ 128,45",
+            "qual a maior despesa deste mês?": "R$ 123,45",
+        }
+        for message, amount in cases.items():
+            with self.subTest(message):
+                self.assertIn(amount, answer_locally(self.user, message))
+
+    def test_questions_left_to_the_model(self, _):
+        for message in (
+            "quanto gastei na semana passada?",
+            "how much did I spend last week?",
+            "quanto gastei nos últimos 30 dias?",
+            "quanto gastei no uber este mês?",
+            "how much did I spend on groceries?",
+            "quais foram meus gastos este mês?",
+            "quanto gastei por categoria este mês?",
+            "how much may I spend today?",
+            "quanto gastei de 1 a 15 de março?",
+            "adicione uma despesa de 50 com mercado",
+            "sim",
+        ):
+            with self.subTest(message):
+                self.assertIsNone(answer_locally(self.user, message))
+
+
+@override_settings(GEMINI_RETRY_INITIAL_DELAY=0.01, GEMINI_RETRY_MAX_DELAY=0.01)
+class GeminiClientTests(SimpleTestCase):
+    """The client runs against a stub transport instead of Google's API"""
+
+    def setUp(self):
+        self.statuses = []
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(request)
+            status = self.statuses.pop(0) if self.statuses else 200
+            answer = {"content": {"parts": [{"text": "<div>Oi</div>"}]}}
+            return httpx.Response(status, json={"candidates": [answer]})
+
+        gemini_client.configure_client(
+            base_url="http://gemini.test/", transport=httpx.MockTransport(handler)
+        )
+        self.addCleanup(gemini_client.configure_client)
+
+    def test_one_client_per_process(self):
+        client, _ = gemini_client.get_client()
+
+        for _ in range(3):
+            self.assertEqual(generate_response("oi", "prompt").text, "<div>Oi</div>")
+
+        self.assertIs(gemini_client.get_client()[0], client)
+        self.assertEqual(len(self.requests), 3)
+
+    def test_new_client_after_a_fork(self):
+        client, _ = gemini_client.get_client()
+
+        forked = os.getpid() + 1
+        with mock.patch.object(gemini_client.os, "getpid", return_value=forked):
+            self.assertIsNot(gemini_client.get_client()[0], client)
+
+    def test_unavailable_answers_are_retried(self):
+        self.statuses = [503, 429]
+
+        self.assertEqual(generate_response("oi", "prompt").text, "<div>Oi</div>")
+        self.assertEqual(len(self.requests), 3)
+
+
+class FinancialContextTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="context", email="context@example.com", password="x"
+        )
+        categories = [
+            ExpenseCategory.objects.create(
+                user=cls.user, name=f"Categoria {number}", description=""
+            )
+            for number in range(20)
+        ]
+        Expenses.objects.bulk_create(
+            Expenses(
+                user=cls.user,
+                category=categories[number % 20],
+                spent_at=date(2024, 1, 1) + timedelta(days=number),
+                description=(
+                    "Assinatura Netflix" if number == 7 else f"Compra {number} " * 8
+                ),
+                detailed_description="",
+                amount=1000 + number,
+            )
+            for number in range(400)
+        )
+        rebuild_ledger_rollups(cls.user)
+
+    def test_context_stays_within_the_budget(self):
+        for budget in (50, 200, 500, 2000):
+            with self.subTest(budget=budget):
+                context = build_financial_context(self.user, "oi", token_budget=budget)
+
+                self.assertLessEqual(len(context), budget * CHARS_PER_TOKEN)
+                self.assertTrue(context.startswith("Totals in cents"))
+
+    def test_cut_sections_say_so(self):
+        context = build_financial_context(self.user, "oi", token_budget=500)
+
+        self.assertRegex(context, r"\n\(\+\d+ omitted\)$")
+
+    def test_transactions_matching_the_message_come_first(self):
+        context = build_financial_context(
+            self.user, "quanto pago de netflix?", token_budget=300
+        )
+
+        self.assertIn("Transactions matching the message", context)
+        self.assertIn("|Assinatura Netflix", context)
+
+
+@override_settings(
+    AI_MEMORY_WINDOW_MESSAGES=4,
+    AI_MEMORY_MESSAGE_CHARS=50,
+    AI_MEMORY_SUMMARY_TOKENS=30,
+    AI_MEMORY_LINE_CHARS=20,
+)
+class ConversationMemoryTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="memory", email="memory@example.com", password="x"
+        )
+        self.conversation = Conversation.get_or_create_active_conversation(user)
+
+    def _turn(self, number):
+        """Save a question and its answer, then update the summary as finish_turn"""
+        for sender, content in (
+            ("user", f"pergunta {number}"),
+            ("ai", f"<div><p>resposta   {number}</p></div>"),
+        ):
+            Message.objects.create(
+                conversation=self.conversation, sender=sender, content=content
+            )
+        update_summary(self.conversation)
+        self.conversation.save()
+
+    def test_new_conversation(self):
+        self.assertEqual(
+            conversation_history(self.conversation),
+            "This is the start of a new conversation.",
+        )
+
+    def test_short_conversation_is_sent_whole(self):
+        self._turn(1)
+        self._turn(2)
+
+        self.assertEqual(self.conversation.summary, "")
+        self.assertEqual(
+            conversation_history(self.conversation).splitlines(),
+            [
+                "user: pergunta 1",
+                "assistant: <div><p>resposta   1</p></div>",
+                "user: pergunta 2",
+                "assistant: <div><p>resposta   2</p></div>",
+            ],
+        )
+
+    def test_messages_leaving_the_window_are_summarized(self):
+        for number in range(1, 4):
+            self._turn(number)
+
+        self.assertEqual(
+            self.conversation.summary.splitlines(),
+            ["user: pergunta 1", "assistant: resposta 1"],
+        )
+        history = conversation_history(self.conversation)
+        recent = history.split("Recent messages:\n", 1)[1].splitlines()
+        self.assertEqual(len(recent), 4)
+        self.assertEqual(recent[0], "user: pergunta 2")
+
+    def test_summary_drops_the_oldest_lines_past_its_budget(self):
+        for number in range(1, 40):
+            self._turn(number)
+
+        lines = self.conversation.summary.splitlines()
+        self.assertEqual(lines[0], OMITTED_LINE)
+        self.assertEqual(lines[-1], "assistant: resposta 37")
+        self.assertLessEqual(len(self.conversation.summary), 30 * CHARS_PER_TOKEN)
+
+    def test_long_messages_are_cut(self):
+        Message.objects.create(
+            conversation=self.conversation, sender="user", content="x" * 500
+        )
+        for number in range(1, 4):
+            self._turn(number)
+
+        self.assertIn("user: " + "x" * 19 + "…", self.conversation.summary)
+        Message.objects.create(
+            conversation=self.conversation, sender="ai", content="y" * 500
+        )
+        last_line = conversation_history(self.conversation).splitlines()[-1]
+        self.assertEqual(last_line, "assistant: " + "y" * 50)
@@ -1,23 +1,50 @@
-from google import genai
-from google.genai import types
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
+from django.conf import settings
 
-def connect_client():
-    client = genai.Client()
-    grounding_tool = types.Tool(google_search=types.GoogleSearch())
-    tools = [grounding_tool]
+from agentAi.gemini_client import MODEL, get_client
 
-    config = types.GenerateContentConfig(tools=tools)
-    return client, config
 
-
-def generate_response(message, prompt) -> types.GenerateContentResponse:
+def generate_response(message, prompt):
     """
     Generate a response using the Gemini model based on the provided message and prompt.
-    Returns the generated response.
+    Returns the generated response (types.GenerateContentResponse).
     """
-    client, config = connect_client()
+    client, config = get_client()
     response = client.models.generate_content(
-        model="gemini-2.5-flash", contents=[f"{prompt}\n\n{message}"], config=config
+        model=MODEL, contents=[f"{prompt}\n\n{message}"], config=config
     )
     return response
+
+
+@functools.cache
+def _stream_executor():
+    return ThreadPoolExecutor(
+        max_workers=settings.AI_CHAT_STREAM_THREADS, thread_name_prefix="ai-stream"
+    )
+
+
+async def stream_response(message, prompt):
+    """
+    Yield the text of the Gemini response to the message and prompt as it is
+    generated.
+    """
+    # google-genai 1.29 only streams asynchronously through aiohttp, which
+    # isn't installed. The pooled sync client reads the stream instead, in
+    # threads of its own so the database calls of the consumers don't wait.
+    loop = asyncio.get_running_loop()
+    executor = _stream_executor()
+    client, config = await loop.run_in_executor(executor, get_client)
+    stream = client.models.generate_content_stream(
+        model=MODEL, contents=[f"{prompt}\n\n{message}"], config=config
+    )
+    end = object()
+    try:
+        while (chunk := await loop.run_in_executor(executor, next, stream, end)) is not end:
+            if chunk.text:
+                yield chunk.text
+    finally:
+        # Closes the HTTP response when the consumer stops early
+        await loop.run_in_executor(executor, stream.close)
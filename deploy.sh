@@ -20,5 +20,17 @@ fi
 "$VENV/bin/python" manage.py migrate --noinput
 "$VENV/bin/python" manage.py collectstatic --noinput
 sudo systemctl restart gunicorn
+# Web uploads are only imported by the import worker
+sudo install -m 644 adm-import-worker.service /etc/systemd/system/
+sudo systemctl daemon-reload
+sudo systemctl enable adm-import-worker
+sudo systemctl restart adm-import-worker
+# AI chat WebSocket, nginx routes /ws/ to it
+sudo install -m 644 adm-chat.service /etc/systemd/system/
+sudo install -m 644 adm-chat.nginx.conf /etc/nginx/default.d/adm-chat.conf
+sudo systemctl daemon-reload
+sudo systemctl enable adm-chat
+sudo systemctl restart adm-chat
+sudo nginx -t
 sudo systemctl reload nginx
 echo "Deploy complete ✅"
@@ -1,6 +1,13 @@
 from django.contrib import admin
 
-from .models import ExpenseCategory, Expenses, IncomeCategorys, Incomes
+from .models import (
+    ExpenseCategory,
+    Expenses,
+    ImportJob,
+    IncomeCategorys,
+    Incomes,
+    LedgerRollup,
+)
 
 # Register your models here.
 
@@ -91,3 +98,38 @@ class IncomesAdmin(admin.ModelAdmin):
         if db_field.name == "category":
             kwargs["queryset"] = IncomeCategorys.objects.filter(user=request.user)
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(LedgerRollup)
+class LedgerRollupAdmin(admin.ModelAdmin):
+    list_display = ["month", "kind", "category_id", "total", "count", "user"]
+    list_filter = ["kind", "month", "user"]
+    date_hierarchy = "month"
+    ordering = ["user", "-month", "kind"]
+
+    # Rollups are derived data, maintained by finance_manager.signals
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if request.user.is_superuser:
+            return qs
+        return qs.filter(user=request.user)
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ["id", "user", "file_format", "status", "rows_processed", "created_at"]
+    list_filter = ["status", "file_format"]
+    readonly_fields = ["rows_processed", "stats", "started_at", "finished_at"]
+    ordering = ["-created_at"]
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if request.user.is_superuser:
+            return qs
+        return qs.filter(user=request.user)
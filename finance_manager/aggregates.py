@@ -0,0 +1,43 @@
+from datetime import date
+from typing import Literal
+
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from finance_manager.models import LedgerRollup
+
+SummaryKey = Literal[
+    "total_expenses",
+    "total_incomes",
+    "balance",
+    "expenses_count",
+    "incomes_count",
+    "total_expenses_this_month",
+    "expenses_this_month_count",
+    "daily_mean",
+]
+
+
+def get_financial_summary(user, today: date | None = None) -> dict[SummaryKey, int]:
+    """
+    Compute the user's totals in a single query over the monthly ledger rollups.
+    Amounts are returned in cents, the same unit as the models.
+    """
+    today = today or timezone.localdate()
+    expense = Q(kind=LedgerRollup.EXPENSE)
+    income = Q(kind=LedgerRollup.INCOME)
+    this_month = Q(month=today.replace(day=1))
+
+    summary = LedgerRollup.objects.filter(user=user).aggregate(
+        total_expenses=Coalesce(Sum("total", filter=expense), 0),
+        total_incomes=Coalesce(Sum("total", filter=income), 0),
+        expenses_count=Coalesce(Sum("count", filter=expense), 0),
+        incomes_count=Coalesce(Sum("count", filter=income), 0),
+        total_expenses_this_month=Coalesce(Sum("total", filter=expense & this_month), 0),
+        expenses_this_month_count=Coalesce(Sum("count", filter=expense & this_month), 0),
+    )
+
+    summary["balance"] = summary["total_incomes"] - summary["total_expenses"]
+    summary["daily_mean"] = summary["total_expenses_this_month"] // today.day
+    return summary
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FinanceManagerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'finance_manager'
+
+    def ready(self):
+        from finance_manager import signals  # noqa: F401
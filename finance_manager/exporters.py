@@ -0,0 +1,324 @@
+"""
+Streaming writers for the financial data exports.
+
+Rows are read with values_list().iterator() and written as they come, so an
+export starts right away and memory doesn't grow with the user's history.
+The output is the same as the files built whole in memory before.
+"""
+
+import csv
+import importlib.util
+import json
+from datetime import datetime
+
+from django.db.models import Max, Min
+from django.db.models.functions import Length
+
+from finance_manager.models import ExpenseCategory, Expenses, IncomeCategorys, Incomes
+
+# openpyxl (and numpy with it) is only imported by the Excel export itself
+EXCEL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+
+# Rows fetched from the database at a time
+EXPORT_CHUNK_SIZE = 2000
+
+# Bytes of output gathered before handing a chunk to the response
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+# Excel columns are sized to their longest value, up to this width
+EXCEL_MAX_COLUMN_WIDTH = 50
+
+TRANSACTION_COLUMNS = [
+    "Category",
+    "Date",
+    "Description",
+    "Detailed Description",
+    "Amount (cents)",
+    "Created At",
+]
+
+
+def category_rows(model, user):
+    """Yield (name, description, color) of the user's categories"""
+    return (
+        model.objects.filter(user=user)
+        .values_list("name", "description", "color")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def transaction_rows(model, user, date_field):
+    """
+    Yield (category name, date, description, detailed description, amount,
+    created at) of the user's expenses or incomes, most recent first.
+    """
+    return (
+        model.objects.filter(user=user)
+        .order_by(f"-{date_field}")
+        .values_list(
+            "category__name",
+            date_field,
+            "description",
+            "detailed_description",
+            "amount",
+            "created_at",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def buffered(pieces, size=EXPORT_BUFFER_SIZE):
+    """Join small strings into chunks of about `size` characters"""
+    buffer = []
+    buffered_size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered_size += len(piece)
+        if buffered_size >= size:
+            yield "".join(buffer)
+            buffer = []
+            buffered_size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _json_list(key, items, last=False):
+    """Write `"key": [items]` as an entry of the indented top level object"""
+    yield f'  "{key}": ['
+    separator = "\n"
+    for item in items:
+        yield separator
+        # Same layout as json.dumps(indent=2) of the whole document
+        yield "    " + json.dumps(item, indent=2, ensure_ascii=False).replace(
+            "\n", "\n    "
+        )
+        separator = ",\n"
+    if separator == "\n":
+        yield "]"
+    else:
+        yield "\n  ]"
+    yield "\n" if last else ",\n"
+
+
+def _category_items(model, user):
+    for name, description, color in category_rows(model, user):
+        yield {"name": name, "description": description, "color": color}
+
+
+def _transaction_items(model, user, date_field):
+    for category, date, description, details, amount, created_at in transaction_rows(
+        model, user, date_field
+    ):
+        yield {
+            "category": category,
+            date_field: date.strftime("%Y-%m-%d"),
+            "description": description,
+            "detailed_description": details,
+            "amount": amount,
+            "created_at": created_at.isoformat(),
+        }
+
+
+def _json_pieces(user):
+    yield "{\n"
+    yield f'  "exported_at": {json.dumps(datetime.now().isoformat())},\n'
+    yield f'  "username": {json.dumps(user.username, ensure_ascii=False)},\n'
+    yield from _json_list("expense_categories", _category_items(ExpenseCategory, user))
+    yield from _json_list("income_categories", _category_items(IncomeCategorys, user))
+    yield from _json_list("expenses", _transaction_items(Expenses, user, "spent_at"))
+    yield from _json_list(
+        "incomes", _transaction_items(Incomes, user, "received_at"), last=True
+    )
+    yield "}"
+
+
+def iter_json_export(user):
+    """Yield the JSON export of a user's data in chunks"""
+    return buffered(_json_pieces(user))
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_pieces(user):
+    writer = csv.writer(_Echo())
+
+    # Header information
+    yield writer.writerow(["Exported At", "Username"])
+    yield writer.writerow([datetime.now().isoformat(), user.username])
+    yield writer.writerow([])  # Empty row for separation
+
+    for title, model in (
+        ("EXPENSE CATEGORIES", ExpenseCategory),
+        ("INCOME CATEGORIES", IncomeCategorys),
+    ):
+        yield writer.writerow([title])
+        yield writer.writerow(["Name", "Description", "Color"])
+        for row in category_rows(model, user):
+            yield writer.writerow(row)
+        yield writer.writerow([])  # Empty row for separation
+
+    for title, model, date_field in (
+        ("EXPENSES", Expenses, "spent_at"),
+        ("INCOMES", Incomes, "received_at"),
+    ):
+        yield writer.writerow([title])
+        yield writer.writerow(TRANSACTION_COLUMNS)
+        for category, date, description, details, amount, created_at in (
+            transaction_rows(model, user, date_field)
+        ):
+            yield writer.writerow(
+                [
+                    category or "",
+                    date.strftime("%Y-%m-%d"),
+                    description,
+                    details,
+                    amount,
+                    created_at.isoformat(),
+                ]
+            )
+        if title == "EXPENSES":
+            yield writer.writerow([])  # Empty row for separation
+
+
+def iter_csv_export(user):
+    """Yield the sectioned CSV export of a user's data in chunks"""
+    return buffered(_csv_pieces(user))
+
+
+def _column_width(header, longest):
+    return min(max(len(header), longest or 0) + 2, EXCEL_MAX_COLUMN_WIDTH)
+
+
+def _category_widths(model, user):
+    lengths = model.objects.filter(user=user).aggregate(
+        name=Max(Length("name")), description=Max(Length("description"))
+    )
+    has_rows = lengths["name"] is not None
+    return [
+        _column_width("Name", lengths["name"]),
+        _column_width("Description", lengths["description"]),
+        _column_width("Color", 7 if has_rows else 0),  # #RRGGBB
+    ]
+
+
+def _transaction_widths(model, user):
+    stats = model.objects.filter(user=user).aggregate(
+        category=Max(Length("category__name")),
+        description=Max(Length("description")),
+        detailed_description=Max(Length("detailed_description")),
+        max_amount=Max("amount"),
+        min_amount=Min("amount"),
+    )
+    if stats["max_amount"] is None:  # No rows
+        return [_column_width(header, 0) for header in TRANSACTION_COLUMNS]
+
+    amount = max(len(str(stats["max_amount"])), len(str(stats["min_amount"])))
+    return [
+        _column_width("Category", stats["category"]),
+        _column_width("Date", 10),  # YYYY-MM-DD
+        _column_width("Description", stats["description"]),
+        _column_width("Detailed Description", stats["detailed_description"]),
+        _column_width("Amount (cents)", amount),
+        _column_width("Created At", 32),  # isoformat() with microseconds and offset
+    ]
+
+
+def _write_sheet(wb, title, headers, widths, rows, header_style):
+    """
+    Add a write-only sheet. Column widths are written before the first row,
+    so they are computed up front instead of by reading the cells back.
+    """
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    ws = wb.create_sheet(title)
+    for column, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(column)].width = width
+
+    header_font, header_fill = header_style
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row in rows:
+        ws.append(row)
+
+
+def write_excel_export(user, file):
+    """
+    Write the Excel export of a user's data to `file`. The workbook is in
+    write-only mode, rows go to disk as they are read from the database.
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill
+
+    wb = Workbook(write_only=True)
+
+    # Style definitions
+    header_style = (
+        Font(bold=True),
+        PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid"),
+    )
+
+    exported_at = datetime.now().isoformat()
+    _write_sheet(
+        wb,
+        "Info",
+        ["Export Information"],
+        [
+            _column_width("Export Information", 0),
+            _column_width(exported_at, len(user.username)),
+        ],
+        [["Exported At:", exported_at], ["Username:", user.username]],
+        header_style,
+    )
+
+    for title, model in (
+        ("Expense Categories", ExpenseCategory),
+        ("Income Categories", IncomeCategorys),
+    ):
+        _write_sheet(
+            wb,
+            title,
+            ["Name", "Description", "Color"],
+            _category_widths(model, user),
+            category_rows(model, user),
+            header_style,
+        )
+
+    for title, model, date_field in (
+        ("Expenses", Expenses, "spent_at"),
+        ("Incomes", Incomes, "received_at"),
+    ):
+        rows = (
+            [
+                category or "",
+                date.strftime("%Y-%m-%d"),
+                description,
+                details,
+                amount,
+                created_at.isoformat(),
+            ]
+            for category, date, description, details, amount, created_at in (
+                transaction_rows(model, user, date_field)
+            )
+        )
+        _write_sheet(
+            wb,
+            title,
+            TRANSACTION_COLUMNS,
+            _transaction_widths(model, user),
+            rows,
+            header_style,
+        )
+
+    wb.save(file)
@@ -0,0 +1,333 @@
+"""
+Streaming readers for uploaded import files.
+
+Each reader consumes the upload chunk by chunk and yields `(section, row)`
+records, where section is one of IMPORT_SECTIONS and row is a dict in the
+shape of the JSON export. Nothing holds the whole file in memory, so the
+upload size is only bounded by FINANCE_IMPORT_MAX_UPLOAD_SIZE.
+"""
+
+import codecs
+import csv
+import importlib.util
+import json
+import re
+
+# openpyxl (and numpy with it) is only imported to read an Excel upload
+EXCEL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+
+IMPORT_SECTIONS = ("expense_categories", "income_categories", "expenses", "incomes")
+
+# Largest single JSON value (one expense, one category...) accepted by the reader
+MAX_JSON_VALUE_SIZE = 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"[-+.eE0-9]*")
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING_END = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_DECODER = json.JSONDecoder()
+
+
+class ImportFormatError(ValueError):
+    """The uploaded file can't be read, the message is shown to the user"""
+
+
+def iter_text(chunks):
+    """Decode UTF-8 byte chunks incrementally"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+    except UnicodeDecodeError:
+        raise ImportFormatError("Codificação do arquivo inválida. Use UTF-8.")
+
+
+def iter_lines(chunks):
+    """Split decoded chunks into lines, keeping line endings for the csv module"""
+    partial = ""
+    for text in iter_text(chunks):
+        lines = (partial + text).splitlines(keepends=True)
+        partial = lines.pop() if not lines[-1].endswith(("\n", "\r")) else ""
+        yield from lines
+    if partial:
+        yield partial
+
+
+class _JsonStream:
+    """Minimal pull parser over a JSON document split in chunks"""
+
+    def __init__(self, chunks):
+        self._texts = iter_text(chunks)
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read_more(self):
+        if self._eof:
+            return False
+        text = next(self._texts, None)
+        if text is None:
+            self._eof = True
+            return False
+        # Drop what was already consumed before growing the buffer
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return True
+
+    def _error(self, message):
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def peek(self):
+        """Return the next non-whitespace character, or "" at the end"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        char = self.peek()
+        if char and char in "-0123456789":
+            # A number at the end of the buffer may continue in the next chunk
+            while _NUMBER.match(self._buffer, self._pos).end() == len(self._buffer):
+                if not self._read_more():
+                    break
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                too_big = len(self._buffer) - self._pos > MAX_JSON_VALUE_SIZE
+                if too_big or not self._read_more():
+                    raise
+                continue
+            self._pos = end
+            return value
+
+    def items(self):
+        """Yield the values of the array starting at the current position"""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == "]":
+                self._pos += 1
+                return
+            self.expect(",")
+
+    def skip(self):
+        """Skip the next value without decoding it"""
+        if self.peek() not in ("[", "{"):
+            self.value()
+            return
+
+        depth = 0
+        while True:
+            match = _STRUCTURE.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                if not self._read_more():
+                    raise self._error("Unterminated value")
+                continue
+
+            char = match.group()
+            if char == '"':
+                end = _STRING_END.match(self._buffer, match.end())
+                if end is None:
+                    self._pos = match.start()
+                    if not self._read_more():
+                        raise self._error("Unterminated string")
+                    continue
+                self._pos = end.end()
+                continue
+
+            self._pos = match.end()
+            depth += 1 if char in "[{" else -1
+            if depth == 0:
+                return
+
+
+def iter_json_records(chunks):
+    """
+    Stream an exported JSON object, yielding the items of its section lists.
+    Other top level keys are skipped.
+    """
+    stream = _JsonStream(chunks)
+    try:
+        if stream.peek() != "{":
+            raise ImportFormatError(
+                "Formato JSON inválido. O arquivo deve conter um objeto JSON."
+            )
+        stream.expect("{")
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key in IMPORT_SECTIONS:
+                if stream.peek() != "[":
+                    raise ImportFormatError(
+                        f"Campo '{key}' deve ser uma lista no arquivo JSON."
+                    )
+                for item in stream.items():
+                    yield key, item
+            else:
+                stream.skip()
+
+            if stream.peek() != "}":
+                stream.expect(",")
+                if stream.peek() == "}":
+                    raise stream._error("Trailing comma")
+
+        stream.expect("}")
+        if stream.peek():
+            raise stream._error("Extra data")
+    except json.JSONDecodeError as e:
+        raise ImportFormatError(f"Arquivo JSON inválido. Erro: {str(e)}")
+
+
+def _csv_amount(row_data):
+    amount = row_data.get("Amount (cents)", "")
+    return int(amount) if amount.isdigit() else 0
+
+
+def iter_csv_records(chunks):
+    """Stream a sectioned CSV export, yielding one record per data row"""
+    current_section = None
+    headers = []
+    rows_read = 0
+
+    for row in csv.reader(iter_lines(chunks)):
+        rows_read += 1
+        if not row or not any(row):  # Skip empty rows
+            continue
+
+        # Check for section headers
+        section = {
+            "EXPENSE CATEGORIES": "expense_categories",
+            "INCOME CATEGORIES": "income_categories",
+            "EXPENSES": "expenses",
+            "INCOMES": "incomes",
+        }.get(row[0])
+        if section:
+            current_section = section
+            continue
+
+        # Check for headers row
+        if current_section and row[0] in ["Name", "Category"]:
+            headers = row
+            continue
+
+        # Process data rows
+        if not (current_section and headers and len(row) >= len(headers)):
+            continue
+        row_data = dict(zip(headers, row))
+
+        if current_section in ("expense_categories", "income_categories"):
+            yield current_section, {
+                "name": row_data.get("Name", ""),
+                "description": row_data.get("Description", ""),
+                "color": row_data.get("Color", "#FFFFFF"),
+            }
+        else:
+            date_field = "spent_at" if current_section == "expenses" else "received_at"
+            yield current_section, {
+                "category": row_data.get("Category", ""),
+                date_field: row_data.get("Date", ""),
+                "description": row_data.get("Description", ""),
+                "detailed_description": row_data.get("Detailed Description", ""),
+                "amount": _csv_amount(row_data),
+            }
+
+    if rows_read < 5:
+        raise ImportFormatError("Arquivo CSV muito pequeno ou inválido.")
+
+
+def iter_excel_records(file):
+    """Yield import records from the worksheets of an exported workbook"""
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(file, read_only=True)
+    except Exception:
+        raise ImportFormatError("Arquivo Excel inválido ou corrompido.")
+
+    for sheet_name in wb.sheetnames:
+        ws = wb[sheet_name]
+
+        if sheet_name in ("Expense Categories", "Income Categories"):
+            section = (
+                "expense_categories"
+                if sheet_name == "Expense Categories"
+                else "income_categories"
+            )
+            # Skip header row
+            for row in ws.iter_rows(min_row=2, values_only=True):
+                if row and row[0]:  # Check if first column has data
+                    yield section, {
+                        "name": str(row[0]) if row[0] else "",
+                        "description": str(row[1]) if row[1] else "",
+                        "color": str(row[2]) if row[2] else "#FFFFFF",
+                    }
+
+        elif sheet_name in ("Expenses", "Incomes"):
+            section = sheet_name.lower()
+            date_field = "spent_at" if sheet_name == "Expenses" else "received_at"
+            # Skip header row
+            for row in ws.iter_rows(min_row=2, values_only=True):
+                if row and row[1]:  # Check if date column has data
+                    try:
+                        # Handle date formatting
+                        date_value = row[1]
+                        if hasattr(date_value, "strftime"):
+                            date_str = date_value.strftime("%Y-%m-%d")
+                        else:
+                            date_str = str(date_value)
+
+                        yield section, {
+                            "category": str(row[0]) if row[0] else "",
+                            date_field: date_str,
+                            "description": str(row[2]) if row[2] else "",
+                            "detailed_description": str(row[3]) if row[3] else "",
+                            "amount": int(row[4])
+                            if row[4] and str(row[4]).replace(".", "").isdigit()
+                            else 0,
+                        }
+                    except (ValueError, IndexError):
+                        continue
+
+
+def import_file_format(filename):
+    """Return the import format of a file name, or None if it isn't supported"""
+    filename = filename.lower()
+    if filename.endswith(".json"):
+        return "json"
+    if filename.endswith(".csv"):
+        return "csv"
+    if filename.endswith((".xlsx", ".xls")):
+        return "excel"
+    return None
+
+
+def read_import_file(file, file_format):
+    """Return the records of an uploaded or stored Django File"""
+    if file_format == "json":
+        return iter_json_records(file.chunks())
+    if file_format == "csv":
+        return iter_csv_records(file.chunks())
+    if file_format == "excel":
+        return iter_excel_records(file)
+    raise ImportFormatError(
+        "Formato de arquivo não suportado. Use JSON, CSV ou Excel (.xlsx, .xls)."
+    )
@@ -0,0 +1,246 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+
+from finance_manager.import_readers import IMPORT_SECTIONS
+from finance_manager.models import ExpenseCategory, Expenses, IncomeCategorys, Incomes
+from finance_manager.rollups import (
+    delete_ledger_rows,
+    rebuild_ledger_rollups,
+    rollups_suspended,
+)
+from finance_manager.versions import bump_data_version
+
+# Rows written per INSERT when the setting is not defined
+DEFAULT_IMPORT_BATCH_SIZE = 1000
+
+CATEGORY_MODELS = {"expense": ExpenseCategory, "income": IncomeCategorys}
+TRANSACTION_MODELS = {"expense": Expenses, "income": Incomes}
+
+
+class LedgerImporter:
+    """
+    Bulk writer for imported categories, expenses and incomes of one user.
+
+    Transactions reference their category by name, looked up in the
+    categories of the import, then in the user's. Until the file's categories
+    of that kind are read, transactions whose category is not known yet are
+    held back in case it is listed after them, up to `batch_size` of them,
+    past which they are written without category. Transactions are buffered
+    and written with bulk_create every `batch_size` rows. Use it through
+    ledger_import().
+    """
+
+    def __init__(self, user, batch_size=None):
+        self.user = user
+        self.batch_size = batch_size or getattr(
+            settings, "FINANCE_IMPORT_BATCH_SIZE", DEFAULT_IMPORT_BATCH_SIZE
+        )
+        self.stats = {
+            "expense_categories": 0,
+            "income_categories": 0,
+            "expenses": 0,
+            "incomes": 0,
+            "expenses_skipped": 0,
+            "incomes_skipped": 0,
+        }
+        # Category name -> id, for the categories of the import and the
+        # user's categories looked up so far
+        self._category_ids = {"expense": {}, "income": {}}
+        # Names looked up and missing from the user's categories
+        self._unknown = {"expense": set(), "income": set()}
+        self._pending = {"expense": [], "income": []}
+        # (transaction, category name) waiting for their category, until
+        # the categories of that kind are read
+        self._deferred = {"expense": [], "income": []}
+        self._categories_read = {"expense": False, "income": False}
+
+    def add_expense_categories(self, rows):
+        self._add_categories(ExpenseCategory, "expense", rows)
+
+    def add_income_categories(self, rows):
+        self._add_categories(IncomeCategorys, "income", rows)
+
+    def _add_categories(self, model, kind, rows):
+        """Create the categories the user doesn't have yet with a single bulk insert"""
+        rows = [row for row in rows if row.get("name")]
+        names = {row["name"] for row in rows}
+        existing = dict(
+            model.objects.filter(user=self.user, name__in=names).values_list(
+                "name", "id"
+            )
+        )
+
+        new_categories = {}
+        for row in rows:
+            if row["name"] in existing or row["name"] in new_categories:
+                continue
+            new_categories[row["name"]] = model(
+                user=self.user,
+                name=row["name"],
+                description=row.get("description", ""),
+                color=row.get("color", "#FFFFFF"),
+            )
+        model.objects.bulk_create(new_categories.values(), batch_size=self.batch_size)
+
+        if new_categories:
+            # Not every backend returns primary keys from bulk_create
+            existing.update(
+                model.objects.filter(
+                    user=self.user, name__in=new_categories
+                ).values_list("name", "id")
+            )
+        self._category_ids[kind].update(existing)
+        self.stats[f"{kind}_categories"] += len(new_categories)
+
+        self._categories_read[kind] = True
+        self._release_deferred(kind)
+
+    def add_records(self, records):
+        """
+        Consume `(section, row)` records in file order, as produced by
+        finance_manager.import_readers. Consecutive category rows are created
+        together before the next transaction row is handled.
+        """
+        categories = {"expense_categories": [], "income_categories": []}
+        for section, row in records:
+            if section in categories:
+                categories[section].append(row)
+                continue
+            self._flush_categories(categories)
+            if section == "expenses":
+                self._add_transaction(Expenses, "expense", "spent_at", row)
+            elif section == "incomes":
+                self._add_transaction(Incomes, "income", "received_at", row)
+        self._flush_categories(categories)
+
+    def _flush_categories(self, categories):
+        if categories["expense_categories"]:
+            self.add_expense_categories(categories["expense_categories"])
+            categories["expense_categories"] = []
+        if categories["income_categories"]:
+            self.add_income_categories(categories["income_categories"])
+            categories["income_categories"] = []
+
+    def add_expenses(self, rows):
+        for row in rows:
+            self._add_transaction(Expenses, "expense", "spent_at", row)
+
+    def add_incomes(self, rows):
+        for row in rows:
+            self._add_transaction(Incomes, "income", "received_at", row)
+
+    def _category_id(self, kind, name):
+        ids = self._category_ids[kind]
+        if name not in ids and name not in self._unknown[kind]:
+            category_id = (
+                CATEGORY_MODELS[kind]
+                .objects.filter(user=self.user, name=name)
+                .values_list("id", flat=True)
+                .first()
+            )
+            if category_id is None:
+                self._unknown[kind].add(name)
+            else:
+                ids[name] = category_id
+        return ids.get(name)
+
+    def _add_transaction(self, model, kind, date_field, row):
+        try:
+            category_id = None
+            if row.get("category"):
+                category_id = self._category_id(kind, row["category"])
+
+            instance = model(
+                user=self.user,
+                category_id=category_id,
+                description=row.get("description", ""),
+                detailed_description=row.get("detailed_description", ""),
+                amount=int(row.get("amount", 0)),
+                **{date_field: datetime.strptime(row[date_field], "%Y-%m-%d").date()},
+            )
+        except (ValueError, KeyError, TypeError):
+            self.stats[f"{kind}s_skipped"] += 1
+            return
+
+        if row.get("category") and category_id is None:
+            if not self._categories_read[kind]:
+                deferred = self._deferred[kind]
+                deferred.append((instance, row["category"]))
+                if len(deferred) > self.batch_size:
+                    self._release_deferred(kind)
+                return
+        pending = self._pending[kind]
+        pending.append(instance)
+        if len(pending) >= self.batch_size:
+            self._write(model, kind)
+
+    def _release_deferred(self, kind):
+        """
+        Queue the held back transactions with the categories known by now,
+        names still missing are imported without category as before
+        """
+        pending = self._pending[kind]
+        for instance, name in self._deferred[kind]:
+            instance.category_id = self._category_ids[kind].get(name)
+            pending.append(instance)
+        self._deferred[kind] = []
+        if len(pending) >= self.batch_size:
+            self._write(TRANSACTION_MODELS[kind], kind)
+
+    def flush(self):
+        """Write any buffered expenses and incomes"""
+        for kind, model in TRANSACTION_MODELS.items():
+            self._release_deferred(kind)
+            self._write(model, kind)
+
+    def _write(self, model, kind):
+        pending = self._pending[kind]
+        if pending:
+            model.objects.bulk_create(pending, batch_size=self.batch_size)
+            self.stats[f"{kind}s"] += len(pending)
+            self._pending[kind] = []
+
+
+@contextmanager
+def ledger_import(user, clear_existing=False, batch_size=None):
+    """
+    Yield a LedgerImporter for `user`. The whole import runs in one database
+    transaction, the ledger rollups are rebuilt and the user's data version
+    bumped once at the end.
+    """
+    # Rollups are rebuilt once for the user instead of row by row
+    with rollups_suspended(), transaction.atomic():
+        if clear_existing:
+            # One DELETE per table, transactions before their categories
+            for model in (Expenses, Incomes, ExpenseCategory, IncomeCategorys):
+                delete_ledger_rows(model.objects.filter(user=user))
+
+        importer = LedgerImporter(user, batch_size)
+        yield importer
+        importer.flush()
+        rebuild_ledger_rollups(user)
+        bump_data_version(user.pk)
+
+
+def import_ledger_records(records, user, clear_existing=False, batch_size=None):
+    """
+    Import a stream of `(section, row)` records for `user`.
+    Returns the importer stats.
+    """
+    with ledger_import(user, clear_existing, batch_size) as importer:
+        importer.add_records(records)
+    return importer.stats
+
+
+def import_ledger_data(data, user, clear_existing=False, batch_size=None):
+    """
+    Import a dict with `expense_categories`, `income_categories`, `expenses`
+    and `incomes` lists for `user`. Returns the importer stats.
+    """
+    records = (
+        (section, row) for section in IMPORT_SECTIONS for row in data.get(section, [])
+    )
+    return import_ledger_records(records, user, clear_existing, batch_size)
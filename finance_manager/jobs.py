@@ -0,0 +1,174 @@
+"""
+Background import jobs.
+
+The import view stores the upload as an ImportJob and returns right away.
+The import_worker management command claims pending jobs from the database
+and runs them, so no broker is needed and web workers never block on an
+import. The dashboard polls the job status while it runs.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from finance_manager.import_readers import ImportFormatError, read_import_file
+from finance_manager.importer import import_ledger_records
+from finance_manager.models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two progress updates of a running job
+PROGRESS_INTERVAL = 1.0
+
+
+def import_summary(stats):
+    """Build the message shown to the user once an import is done"""
+    total_skipped = stats["expenses_skipped"] + stats["incomes_skipped"]
+
+    message_parts = [
+        "Importação concluída com sucesso!",
+        f"✅ {stats['expense_categories']} categorias de gastos",
+        f"✅ {stats['income_categories']} categorias de receitas",
+        f"✅ {stats['expenses']} gastos",
+        f"✅ {stats['incomes']} receitas",
+    ]
+
+    if total_skipped > 0:
+        message_parts.append(
+            f"⚠️ {total_skipped} registros ignorados por dados inválidos"
+        )
+
+    return "\n".join(message_parts)
+
+
+class _ProgressReporter:
+    """
+    Count the records consumed by an import and periodically save the count
+    on the job.
+
+    The import runs in a single transaction, so the count is written from a
+    separate thread, which Django gives its own connection. SQLite can't take
+    a second writer while the import holds the write lock, so there the count
+    is only saved when the job ends.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.rows = 0
+        self._stopped = threading.Event()
+        self._thread = None
+        if connection.vendor != "sqlite":
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def count(self, records):
+        for record in records:
+            self.rows += 1
+            yield record
+
+    def _run(self):
+        saved = 0
+        try:
+            while not self._stopped.wait(PROGRESS_INTERVAL):
+                if self.rows != saved:
+                    saved = self.rows
+                    # update() skips auto_now, updated_at doubles as a heartbeat
+                    ImportJob.objects.filter(pk=self.job_id).update(
+                        rows_processed=saved, updated_at=timezone.now()
+                    )
+        except Exception:
+            logger.exception("Could not save progress of import job %s", self.job_id)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def claim_next_import_job():
+    """Mark the oldest pending job as running and return it, or None"""
+    pending = ImportJob.objects.filter(status=ImportJob.PENDING).order_by("created_at")
+    for job_id in pending.values_list("id", flat=True)[:10]:
+        # The conditional update makes the claim atomic between workers
+        claimed = ImportJob.objects.filter(
+            pk=job_id, status=ImportJob.PENDING
+        ).update(
+            status=ImportJob.RUNNING,
+            started_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            return ImportJob.objects.select_related("user").get(pk=job_id)
+    return None
+
+
+def fail_stale_import_jobs():
+    """
+    Fail running jobs that stopped reporting, their worker died. The import
+    transaction was rolled back so no partial data is left behind.
+    Pending jobs no worker claimed in FINANCE_IMPORT_PENDING_TIMEOUT seconds
+    are failed too, and their file deleted. Returns the number of failed jobs.
+    """
+    now = timezone.now()
+    timeout = timedelta(seconds=settings.FINANCE_IMPORT_JOB_TIMEOUT)
+    failed = ImportJob.objects.filter(
+        status=ImportJob.RUNNING, updated_at__lt=now - timeout
+    ).update(
+        status=ImportJob.FAILED,
+        message="A importação foi interrompida. Tente novamente.",
+        finished_at=now,
+    )
+
+    pending_timeout = timedelta(seconds=settings.FINANCE_IMPORT_PENDING_TIMEOUT)
+    for job in ImportJob.objects.filter(
+        status=ImportJob.PENDING, created_at__lt=now - pending_timeout
+    ):
+        # Conditional like the claim, a worker may take the job meanwhile
+        if ImportJob.objects.filter(pk=job.pk, status=ImportJob.PENDING).update(
+            status=ImportJob.FAILED,
+            message=(
+                "Nenhum processador de importações está disponível. "
+                "Tente novamente mais tarde."
+            ),
+            finished_at=now,
+        ):
+            job.file.delete(save=False)
+            failed += 1
+    return failed
+
+
+def run_import_job(job):
+    """Import the file of a claimed job and record the outcome on it"""
+    reporter = _ProgressReporter(job.pk)
+    try:
+        with job.file.open("rb") as file:
+            records = reporter.count(read_import_file(file, job.file_format))
+            stats = import_ledger_records(
+                records, job.user, clear_existing=job.clear_existing
+            )
+    except ImportFormatError as e:
+        job.status = ImportJob.FAILED
+        job.message = str(e)
+    except Exception as e:
+        logger.exception("Import job %s failed", job.pk)
+        job.status = ImportJob.FAILED
+        job.message = f"Erro durante a importação: {str(e)}"
+    else:
+        job.status = ImportJob.DONE
+        job.stats = stats
+        job.message = import_summary(stats)
+    finally:
+        reporter.stop()
+
+    job.rows_processed = reporter.rows
+    job.finished_at = timezone.now()
+    job.file.delete(save=False)
+    job.save()
+    return job
+
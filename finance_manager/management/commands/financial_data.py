@@ -8,8 +8,9 @@ from datetime import datetime
 
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
 
+from finance_manager.import_readers import ImportFormatError, iter_json_records
+from finance_manager.importer import import_ledger_records
 from finance_manager.models import ExpenseCategory, Expenses, IncomeCategorys, Incomes
 
 User = get_user_model()
@@ -40,6 +41,11 @@ class Command(BaseCommand):
             action="store_true",
             help="Clear existing data before import",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Rows written per INSERT during import (defaults to FINANCE_IMPORT_BATCH_SIZE)",
+        )
 
     def handle(self, *args, **options):
         action = options["action"]
@@ -50,11 +56,11 @@ class Command(BaseCommand):
         if action == "import":
             if not username:
                 raise CommandError("Username is required for import action")
-            self.import_data(file_path, username, clear_data)
+            self.import_data(file_path, username, clear_data, options["batch_size"])
         elif action == "export":
             self.export_data(file_path, username)
 
-    def import_data(self, file_path, username, clear_data):
+    def import_data(self, file_path, username, clear_data, batch_size=None):
         """Import financial data from JSON file"""
         if not os.path.exists(file_path):
             raise CommandError(f"File {file_path} does not exist")
@@ -64,115 +70,40 @@ class Command(BaseCommand):
         except User.DoesNotExist:
             raise CommandError(f"User '{username}' does not exist")
 
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-        except json.JSONDecodeError as e:
-            raise CommandError(f"Invalid JSON file: {e}")
-
         self.stdout.write(f"Importing data for user: {username}")
+        if clear_data:
+            self.stdout.write("Clearing existing data...")
 
-        with transaction.atomic():
-            if clear_data:
-                self.stdout.write("Clearing existing data...")
-                Expenses.objects.filter(user=user).delete()
-                Incomes.objects.filter(user=user).delete()
-                ExpenseCategory.objects.filter(user=user).delete()
-                IncomeCategorys.objects.filter(user=user).delete()
-
-            # Import expense categories
-            expense_categories = {}
-            for cat_data in data.get("expense_categories", []):
-                category, created = ExpenseCategory.objects.get_or_create(
-                    user=user,
-                    name=cat_data["name"],
-                    defaults={
-                        "description": cat_data.get("description", ""),
-                        "color": cat_data.get("color", "#FFFFFF"),
-                    },
-                )
-                expense_categories[cat_data["name"]] = category
-                if created:
-                    self.stdout.write(f"Created expense category: {category.name}")
-
-            # Import income categories
-            income_categories = {}
-            for cat_data in data.get("income_categories", []):
-                category, created = IncomeCategorys.objects.get_or_create(
-                    user=user,
-                    name=cat_data["name"],
-                    defaults={
-                        "description": cat_data.get("description", ""),
-                        "color": cat_data.get("color", "#FFFFFF"),
-                    },
-                )
-                income_categories[cat_data["name"]] = category
-                if created:
-                    self.stdout.write(f"Created income category: {category.name}")
-
-            # Import expenses
-            expenses_created = 0
-            for expense_data in data.get("expenses", []):
-                category = None
-                if expense_data.get("category"):
-                    category = expense_categories.get(expense_data["category"])
-
-                try:
-                    spent_at = datetime.strptime(
-                        expense_data["spent_at"], "%Y-%m-%d"
-                    ).date()
-                except ValueError:
-                    self.stdout.write(
-                        f"Invalid date format for expense: {expense_data.get('spent_at', 'N/A')}"
-                    )
-                    continue
-
-                Expenses.objects.create(
-                    user=user,
-                    category=category,
-                    spent_at=spent_at,
-                    description=expense_data.get("description", ""),
-                    detailed_description=expense_data.get("detailed_description", ""),
-                    amount=int(expense_data.get("amount", 0)),
-                )
-                expenses_created += 1
-
-            # Import incomes
-            incomes_created = 0
-            for income_data in data.get("incomes", []):
-                category = None
-                if income_data.get("category"):
-                    category = income_categories.get(income_data["category"])
-
-                try:
-                    received_at = datetime.strptime(
-                        income_data["received_at"], "%Y-%m-%d"
-                    ).date()
-                except ValueError:
-                    self.stdout.write(
-                        f"Invalid date format for income: {income_data.get('received_at', 'N/A')}"
-                    )
-                    continue
-
-                Incomes.objects.create(
-                    user=user,
-                    category=category,
-                    received_at=received_at,
-                    description=income_data.get("description", ""),
-                    detailed_description=income_data.get("detailed_description", ""),
-                    amount=int(income_data.get("amount", 0)),
+        try:
+            with open(file_path, "rb") as file:
+                # Parsed as a stream, the file is never loaded whole
+                chunks = iter(lambda: file.read(64 * 1024), b"")
+                stats = import_ledger_records(
+                    iter_json_records(chunks),
+                    user,
+                    clear_existing=clear_data,
+                    batch_size=batch_size,
                 )
-                incomes_created += 1
+        except ImportFormatError as e:
+            raise CommandError(f"Invalid JSON file: {e}")
 
         self.stdout.write(
             self.style.SUCCESS(
                 f"Successfully imported:\n"
-                f"- {len(expense_categories)} expense categories\n"
-                f"- {len(income_categories)} income categories\n"
-                f"- {expenses_created} expenses\n"
-                f"- {incomes_created} incomes"
+                f"- {stats['expense_categories']} expense categories\n"
+                f"- {stats['income_categories']} income categories\n"
+                f"- {stats['expenses']} expenses\n"
+                f"- {stats['incomes']} incomes"
             )
         )
+        skipped = stats["expenses_skipped"] + stats["incomes_skipped"]
+        if skipped:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Skipped {stats['expenses_skipped']} expenses and "
+                    f"{stats['incomes_skipped']} incomes with invalid data"
+                )
+            )
 
     def export_data(self, file_path, username=None):
         """Export financial data to JSON file"""
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from finance_manager.jobs import (
+    claim_next_import_job,
+    fail_stale_import_jobs,
+    run_import_job,
+)
+
+
+class Command(BaseCommand):
+    help = "Run the background worker that processes queued file imports"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait before checking an empty queue again",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the queued imports and exit instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Import worker started")
+        try:
+            while True:
+                close_old_connections()
+                stale = fail_stale_import_jobs()
+                if stale:
+                    self.stdout.write(
+                        self.style.WARNING(f"Marked {stale} stale import jobs as failed")
+                    )
+
+                job = claim_next_import_job()
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                self.stdout.write(f"Running import job {job.pk} for {job.user.username}")
+                job = run_import_job(job)
+                style = self.style.SUCCESS if job.status == job.DONE else self.style.ERROR
+                self.stdout.write(
+                    style(
+                        f"Import job {job.pk} {job.status}: "
+                        f"{job.rows_processed} records processed"
+                    )
+                )
+        except KeyboardInterrupt:
+            self.stdout.write("Import worker stopped")
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from finance_manager.rollups import rebuild_ledger_rollups
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly ledger rollups from the raw expenses and incomes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=str,
+            help="Rebuild rollups for a specific user (by username or email)",
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+            if user is None:
+                user = User.objects.filter(email=options["user"]).first()
+            if user is None:
+                raise CommandError(f'User "{options["user"]}" not found')
+
+        rows = rebuild_ledger_rollups(user)
+
+        target = f"user {user.username}" if user else "all users"
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rows} ledger rollups for {target}")
+        )
@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_ledger_rollups(apps, schema_editor):
+    LedgerRollup = apps.get_model("finance_manager", "LedgerRollup")
+    ledgers = [
+        (apps.get_model("finance_manager", "Expenses"), "expense", "spent_at"),
+        (apps.get_model("finance_manager", "Incomes"), "income", "received_at"),
+    ]
+
+    rollups = []
+    for model, kind, date_field in ledgers:
+        grouped = (
+            model.objects.annotate(month=TruncMonth(date_field))
+            .values("user", "month", "category")
+            .annotate(total=Sum("amount"), count=Count("id"))
+            .order_by()
+        )
+        rollups.extend(
+            LedgerRollup(
+                user_id=row["user"],
+                month=row["month"],
+                kind=kind,
+                category_id=row["category"] or 0,
+                total=row["total"],
+                count=row["count"],
+            )
+            for row in grouped
+        )
+
+    LedgerRollup.objects.bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance_manager", "0002_ledgerrollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_ledger_rollups, migrations.RunPython.noop),
+    ]
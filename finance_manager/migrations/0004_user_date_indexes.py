@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 03:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_manager', '0003_populate_ledgerrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expenses',
+            index=models.Index(fields=['user', 'spent_at'], name='finance_man_user_id_66fac0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expenses',
+            index=models.Index(fields=['user', 'category'], name='finance_man_user_id_020323_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomes',
+            index=models.Index(fields=['user', 'received_at'], name='finance_man_user_id_95248a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomes',
+            index=models.Index(fields=['user', 'category'], name='finance_man_user_id_fa4624_idx'),
+        ),
+    ]
@@ -30,6 +30,13 @@ class Expenses(models.Model):
     detailed_description = models.CharField(max_length=600)
     amount = models.IntegerField()
 
+    class Meta:
+        # Queries are almost always scoped to one user and a date range or category
+        indexes = [
+            models.Index(fields=["user", "spent_at"]),
+            models.Index(fields=["user", "category"]),
+        ]
+
 
 class IncomeCategorys(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -55,3 +62,86 @@ class Incomes(models.Model):
     description = models.CharField(max_length=100)
     detailed_description = models.CharField(max_length=600)
     amount = models.IntegerField()
+
+    class Meta:
+        # Queries are almost always scoped to one user and a date range or category
+        indexes = [
+            models.Index(fields=["user", "received_at"]),
+            models.Index(fields=["user", "category"]),
+        ]
+
+
+class LedgerRollup(models.Model):
+    """
+    Per-user, per-month totals of expenses and incomes grouped by category.
+    Maintained incrementally by finance_manager.signals and rebuilt with the
+    rebuild_ledger_rollups management command.
+    """
+
+    EXPENSE = "expense"
+    INCOME = "income"
+    KIND_CHOICES = [
+        (EXPENSE, "Expense"),
+        (INCOME, "Income"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    month = models.DateField()  # First day of the month
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Plain id of an ExpenseCategory or IncomeCategorys row, 0 when uncategorized
+    category_id = models.BigIntegerField(default=0)
+    total = models.BigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.kind} {self.month:%Y-%m} ({self.user.username})"
+
+    class Meta:
+        verbose_name_plural = "Ledger Rollups"
+        unique_together = ["user", "month", "kind", "category_id"]
+
+
+class ImportJob(models.Model):
+    """
+    An uploaded file imported in the background by the import_worker command.
+    The dashboard polls the job until it is done or failed.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    FORMAT_CHOICES = [
+        ("json", "JSON"),
+        ("csv", "CSV"),
+        ("excel", "Excel"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Removed once the job finishes
+    file = models.FileField(upload_to="imports/", blank=True)
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    clear_existing = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    rows_processed = models.IntegerField(default=0)
+    stats = models.JSONField(default=dict, blank=True)
+    # Summary or error shown to the user
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Import {self.pk} {self.status} ({self.user.username})"
+
+    class Meta:
+        # The worker looks up the oldest pending job
+        indexes = [models.Index(fields=["status", "created_at"])]
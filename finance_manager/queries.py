@@ -0,0 +1,105 @@
+from datetime import date, timedelta
+
+from django.db.models import CharField, Count, F, Sum, Value
+
+from finance_manager.rollups import LEDGERS
+
+# Columns of every row in a transaction stream, in SELECT order
+TRANSACTION_FIELDS = (
+    "id",
+    "description",
+    "detailed_description",
+    "amount",
+    "category_id",
+    "category_name",
+    "category_color",
+    "date",
+    "type",
+)
+
+
+def month_range(year: int, month: int | None = None) -> tuple[date, date]:
+    """
+    Return the [start, end) dates of a month, or of the whole year when no
+    month is given. Filtering on a range instead of __year/__month lookups
+    lets the database use the (user, date) indexes.
+    """
+    if month is None:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    start = date(year, month, 1)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+def ledger_values(queryset, kind, date_field):
+    """
+    Shape an expenses or incomes queryset as transaction rows.
+    Both ledgers share the same columns so they can be combined with union().
+    """
+    return queryset.values(
+        "id",
+        "description",
+        "detailed_description",
+        "amount",
+        "category_id",
+        category_name=F("category__name"),
+        category_color=F("category__color"),
+        date=F(date_field),
+        type=Value(kind, output_field=CharField()),
+    )
+
+
+def transaction_stream(user, kinds=None, start=None, end=None, refine=None):
+    """
+    Return the user's expenses and incomes as a single UNION ALL queryset of
+    rows with TRANSACTION_FIELDS, most recent first.
+
+    `kinds` restricts the stream to some ledgers ("expense", "income").
+    `start` and `end` bound the date, `end` being exclusive.
+    `refine(queryset, kind, date_field)` may narrow each ledger before the
+    union, since a combined queryset can no longer be filtered.
+    """
+    querysets = []
+    for model, (kind, date_field) in LEDGERS.items():
+        if kinds is not None and kind not in kinds:
+            continue
+
+        queryset = model.objects.filter(user=user)
+        if start is not None:
+            queryset = queryset.filter(**{f"{date_field}__gte": start})
+        if end is not None:
+            queryset = queryset.filter(**{f"{date_field}__lt": end})
+        if refine is not None:
+            queryset = refine(queryset, kind, date_field)
+        querysets.append(ledger_values(queryset, kind, date_field))
+
+    if not querysets:
+        raise ValueError(f"No ledger matches {kinds}")
+
+    stream = querysets[0]
+    if len(querysets) > 1:
+        stream = stream.union(*querysets[1:], all=True)
+    return stream.order_by("-date", "-id", "-type")
+
+
+def daily_totals(user, start, end):
+    """
+    Yield the per-day totals of the user's expenses and incomes between
+    `start` and `end` (exclusive) as dicts with date, type, total (cents)
+    and count. Rows are grouped by the database, one query per ledger.
+    """
+    for model, (kind, date_field) in LEDGERS.items():
+        rows = (
+            model.objects.filter(
+                user=user, **{f"{date_field}__gte": start, f"{date_field}__lt": end}
+            )
+            .values(date_field)
+            .annotate(total=Sum("amount"), count=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            yield {
+                "date": row[date_field],
+                "type": kind,
+                "total": row["total"],
+                "count": row["count"],
+            }
@@ -0,0 +1,143 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from finance_manager.models import (
+    ExpenseCategory,
+    Expenses,
+    IncomeCategorys,
+    Incomes,
+    LedgerRollup,
+)
+from finance_manager.versions import bump_data_version
+
+# Rollup kind and date field of each ledger model
+LEDGERS = {
+    Expenses: (LedgerRollup.EXPENSE, "spent_at"),
+    Incomes: (LedgerRollup.INCOME, "received_at"),
+}
+
+# Ledger model of the transactions of each category model
+CATEGORY_LEDGERS = {ExpenseCategory: Expenses, IncomeCategorys: Incomes}
+
+_suspended = ContextVar("ledger_rollups_suspended", default=False)
+
+
+@contextmanager
+def rollups_suspended():
+    """
+    Skip incremental rollup maintenance inside the block.
+    Used by bulk operations that rebuild the affected rollups afterwards.
+    """
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def rollups_are_suspended() -> bool:
+    return _suspended.get()
+
+
+def ledger_key(instance) -> dict:
+    """
+    Return the LedgerRollup lookup for an expense or income instance.
+    """
+    kind, date_field = LEDGERS[type(instance)]
+    # Values assigned from user input may still be strings at this point
+    day = instance._meta.get_field(date_field).to_python(getattr(instance, date_field))
+    return {
+        "user_id": instance.user_id,
+        "month": day.replace(day=1),
+        "kind": kind,
+        "category_id": instance.category_id or 0,
+    }
+
+
+def apply_rollup_delta(key: dict, amount: int, count: int):
+    """
+    Add `amount` and `count` to the rollup row identified by `key`.
+    Rows are only created for positive deltas and are removed once empty.
+    """
+    rows = LedgerRollup.objects.filter(**key)
+    with transaction.atomic():
+        updated = rows.update(total=F("total") + amount, count=F("count") + count)
+        if not updated and count > 0:
+            try:
+                with transaction.atomic():
+                    LedgerRollup.objects.create(total=amount, count=count, **key)
+            except IntegrityError:
+                # Created concurrently, fall back to incrementing it
+                rows.update(total=F("total") + amount, count=F("count") + count)
+        rows.filter(count__lte=0).delete()
+
+
+def rebuild_ledger_rollups(user=None) -> int:
+    """
+    Recompute rollups from the raw expenses and incomes.
+    Rebuilds every user's rollups when no user is given.
+    Returns the number of rollup rows written.
+    """
+    with transaction.atomic():
+        existing = LedgerRollup.objects.all()
+        if user is not None:
+            existing = existing.filter(user=user)
+        existing.delete()
+
+        rollups = []
+        for model, (kind, date_field) in LEDGERS.items():
+            queryset = model.objects.all()
+            if user is not None:
+                queryset = queryset.filter(user=user)
+            grouped = (
+                queryset.annotate(month=TruncMonth(date_field))
+                .values("user", "month", "category")
+                .annotate(total=Sum("amount"), count=Count("id"))
+                .order_by()
+            )
+            rollups.extend(
+                LedgerRollup(
+                    user_id=row["user"],
+                    month=row["month"],
+                    kind=kind,
+                    category_id=row["category"] or 0,
+                    total=row["total"],
+                    count=row["count"],
+                )
+                for row in grouped
+            )
+
+        LedgerRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def delete_ledger_rows(queryset) -> int:
+    """
+    Delete the rows of `queryset` with a single DELETE, without loading them
+    or sending post_delete, which would otherwise update the rollups and the
+    data version row by row. Callers fix the rollups and bump the version.
+    Cascades are not followed, delete the dependent rows first.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_ledger_category(category) -> int:
+    """
+    Delete an expense or income category and its transactions with one
+    DELETE each, then drop its rollups and bump the owner's data version once.
+    Returns the number of deleted transactions.
+    """
+    ledger = CATEGORY_LEDGERS[type(category)]
+    kind = LEDGERS[ledger][0]
+    with rollups_suspended(), transaction.atomic():
+        deleted = delete_ledger_rows(ledger.objects.filter(category=category))
+        LedgerRollup.objects.filter(
+            user_id=category.user_id, kind=kind, category_id=category.pk
+        ).delete()
+        category.delete()
+        bump_data_version(category.user_id)
+    return deleted
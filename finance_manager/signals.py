@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from finance_manager.models import ExpenseCategory, Expenses, IncomeCategorys, Incomes
+from finance_manager.rollups import apply_rollup_delta, ledger_key, rollups_are_suspended
+from finance_manager.versions import bump_data_version
+
+
+@receiver(pre_save, sender=Expenses)
+@receiver(pre_save, sender=Incomes)
+def remember_previous_rollup(sender, instance, **kwargs):
+    """Keep the stored values of an edited row so its old rollup can be reverted"""
+    instance._rollup_previous = None
+    if rollups_are_suspended() or instance._state.adding:
+        return
+
+    previous = sender.objects.filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._rollup_previous = (ledger_key(previous), previous.amount)
+
+
+@receiver(post_save, sender=Expenses)
+@receiver(post_save, sender=Incomes)
+def update_rollup_on_save(sender, instance, **kwargs):
+    """Move a created or edited row into its current rollup"""
+    if rollups_are_suspended():
+        return
+
+    previous = getattr(instance, "_rollup_previous", None)
+    with transaction.atomic():
+        if previous:
+            previous_key, previous_amount = previous
+            apply_rollup_delta(previous_key, -int(previous_amount), -1)
+        apply_rollup_delta(ledger_key(instance), int(instance.amount), 1)
+
+
+@receiver(post_delete, sender=Expenses)
+@receiver(post_delete, sender=Incomes)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    """Remove a deleted row from its rollup"""
+    if rollups_are_suspended():
+        return
+
+    apply_rollup_delta(ledger_key(instance), -int(instance.amount), -1)
+
+
+@receiver(post_save, sender=Expenses)
+@receiver(post_save, sender=Incomes)
+@receiver(post_save, sender=ExpenseCategory)
+@receiver(post_save, sender=IncomeCategorys)
+@receiver(post_delete, sender=Expenses)
+@receiver(post_delete, sender=Incomes)
+@receiver(post_delete, sender=ExpenseCategory)
+@receiver(post_delete, sender=IncomeCategorys)
+def invalidate_user_caches(sender, instance, **kwargs):
+    """Give the owner a new data version so cached charts are rebuilt"""
+    # Imports bump the version once when they finish
+    if rollups_are_suspended():
+        return
+
+    bump_data_version(instance.user_id)
@@ -1,3 +1,516 @@
-from django.test import TestCase
+import json
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from finance_manager.import_readers import (
+    ImportFormatError,
+    iter_json_records,
+    read_import_file,
+)
+from finance_manager.importer import import_ledger_records, ledger_import
+from finance_manager.jobs import fail_stale_import_jobs
+from finance_manager.models import (
+    ExpenseCategory,
+    Expenses,
+    ImportJob,
+    IncomeCategorys,
+    Incomes,
+    LedgerRollup,
+)
+from finance_manager.queries import month_range, transaction_stream
+from finance_manager.rollups import delete_ledger_category, rebuild_ledger_rollups
+
+
+def _index_name(model, *fields):
+    return next(
+        index.name for index in model._meta.indexes if index.fields == list(fields)
+    )
+
+
+class TransactionsApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="paging", email="paging@example.com", password="x"
+        )
+        # Expenses and incomes sharing dates, the cursor breaks the ties
+        for day in (1, 1, 1, 2, 2, 3):
+            for model, date_field in (
+                (Expenses, "spent_at"),
+                (Incomes, "received_at"),
+            ):
+                model.objects.create(
+                    user=cls.user,
+                    description="t",
+                    detailed_description="",
+                    amount=100,
+                    **{date_field: date(2025, 3, day)},
+                )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _get(self, **params):
+        return self.client.get(
+            reverse("finance_manager:transactions_api"), params, secure=True
+        )
+
+    def test_pages_have_no_duplicates_or_gaps(self):
+        for limit in (1, 2, 5):
+            with self.subTest(limit=limit):
+                seen = []
+                cursor = None
+                while True:
+                    params = {"limit": limit}
+                    if cursor:
+                        params["cursor"] = cursor
+                    page = self._get(**params).json()
+                    self.assertLessEqual(len(page["transactions"]), limit)
+                    seen += [
+                        (row["date"], row["type"], row["id"])
+                        for row in page["transactions"]
+                    ]
+                    cursor = page["next_cursor"]
+                    if cursor is None:
+                        break
+
+                self.assertEqual(len(seen), 12)
+                self.assertEqual(len(set(seen)), 12)
+                dates = [row_date for row_date, _, _ in seen]
+                self.assertEqual(dates, sorted(dates, reverse=True))
+
+    def test_bad_cursor_is_rejected(self):
+        for cursor in ("garbage", "2025-03-01|x|expense", "2025-13-01|1|expense"):
+            with self.subTest(cursor=cursor):
+                response = self._get(cursor=cursor)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.json()["success"])
+
+
+class ExportImportRoundTripTests(TestCase):
+    """Importing an export with clear_existing must give back the same data"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="roundtrip", email="roundtrip@example.com", password="x"
+        )
+        food = ExpenseCategory.objects.create(
+            user=cls.user, name="Café, pão", description='"quoted"', color="#123456"
+        )
+        salary = IncomeCategorys.objects.create(
+            user=cls.user, name="Salário", description="", color="#abcdef"
+        )
+        for day, category, description in (
+            (1, food, "Padaria ☕"),
+            (1, None, "Linha\nnova, vírgula"),
+            (28, food, 'Aspas "duplas"'),
+        ):
+            Expenses.objects.create(
+                user=cls.user,
+                category=category,
+                spent_at=date(2025, 2, day),
+                description=description,
+                detailed_description=f"Detalhe de {description}",
+                amount=day * 1234,
+            )
+        Incomes.objects.create(
+            user=cls.user,
+            category=salary,
+            received_at=date(2025, 2, 5),
+            description="Pagamento",
+            detailed_description="",
+            amount=500000,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _snapshot(self):
+        categories = [
+            sorted(
+                model.objects.filter(user=self.user).values_list(
+                    "name", "description", "color"
+                )
+            )
+            for model in (ExpenseCategory, IncomeCategorys)
+        ]
+        transactions = [
+            sorted(
+                model.objects.filter(user=self.user).values_list(
+                    "category__name",
+                    date_field,
+                    "description",
+                    "detailed_description",
+                    "amount",
+                ),
+                key=str,
+            )
+            for model, date_field in ((Expenses, "spent_at"), (Incomes, "received_at"))
+        ]
+        return categories, transactions
+
+    def _export(self, url_name):
+        response = self.client.get(reverse(f"finance_manager:{url_name}"), secure=True)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def assertRoundTrip(self, url_name, file_format):
+        before = self._snapshot()
+        exported = ContentFile(self._export(url_name))
+
+        stats = import_ledger_records(
+            read_import_file(exported, file_format), self.user, clear_existing=True
+        )
+
+        self.assertEqual(stats["expenses"], 3)
+        self.assertEqual(stats["incomes"], 1)
+        self.assertEqual(self._snapshot(), before)
+
+    def test_json(self):
+        self.assertRoundTrip("export_financial_data_json", "json")
+
+    def test_csv(self):
+        self.assertRoundTrip("export_financial_data_csv", "csv")
+
+    def test_excel(self):
+        self.assertRoundTrip("export_financial_data_excel", "excel")
+
+
+class LedgerRollupTests(TestCase):
+    """Rollups maintained on each write must match a rebuild from the rows"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="rollups", email="rollups@example.com", password="x"
+        )
+        self.food = ExpenseCategory.objects.create(
+            user=self.user, name="Food", description=""
+        )
+        self.rent = ExpenseCategory.objects.create(
+            user=self.user, name="Rent", description=""
+        )
+
+    def _rollups(self):
+        return sorted(
+            LedgerRollup.objects.filter(user=self.user).values_list(
+                "month", "kind", "category_id", "total", "count"
+            )
+        )
+
+    def assertRollupsMatchRebuild(self):
+        maintained = self._rollups()
+        rebuild_ledger_rollups(self.user)
+        self.assertEqual(maintained, self._rollups())
+
+    def _expense(self, category, day, amount):
+        return Expenses.objects.create(
+            user=self.user,
+            category=category,
+            spent_at=day,
+            description="e",
+            detailed_description="",
+            amount=amount,
+        )
+
+    def test_writes_keep_rollups_in_sync(self):
+        expense = self._expense(self.food, date(2025, 1, 10), 1000)
+        self._expense(self.food, date(2025, 1, 20), 250)
+        Incomes.objects.create(
+            user=self.user,
+            received_at=date(2025, 1, 5),
+            description="i",
+            detailed_description="",
+            amount=5000,
+        )
+        self.assertRollupsMatchRebuild()
+
+        expense.amount = 1500
+        expense.spent_at = date(2025, 2, 1)
+        expense.save()
+        self.assertRollupsMatchRebuild()
+
+        expense.category = self.rent
+        expense.save()
+        self.assertRollupsMatchRebuild()
+
+        expense.delete()
+        self.assertRollupsMatchRebuild()
+
+    def _deleted_rows(self):
+        """Record the senders of post_delete, sent once per row Django loads"""
+        senders = []
+
+        def receiver(sender, **kwargs):
+            if sender is not LedgerRollup:
+                senders.append(sender)
+
+        post_delete.connect(receiver, weak=False)
+        self.addCleanup(post_delete.disconnect, receiver)
+        return senders
+
+    def test_category_delete_doesnt_load_its_transactions(self):
+        for day in range(1, 29):
+            self._expense(self.food, date(2025, 1, day), 100)
+        self._expense(self.rent, date(2025, 1, 1), 900)
+        senders = self._deleted_rows()
+
+        deleted = delete_ledger_category(self.food)
+
+        self.assertEqual(deleted, 28)
+        self.assertEqual(senders, [ExpenseCategory])
+        self.assertFalse(ExpenseCategory.objects.filter(pk=self.food.pk).exists())
+        self.assertEqual(Expenses.objects.filter(user=self.user).count(), 1)
+        self.assertRollupsMatchRebuild()
+
+    def test_clearing_an_import_doesnt_load_the_old_rows(self):
+        for day in range(1, 29):
+            self._expense(self.food, date(2025, 1, day), 100)
+        IncomeCategorys.objects.create(user=self.user, name="Salary", description="")
+        senders = self._deleted_rows()
+
+        import_ledger_records(
+            [("expenses", {"spent_at": "2025-03-01", "amount": 700})],
+            self.user,
+            clear_existing=True,
+        )
+
+        self.assertEqual(senders, [])
+        self.assertFalse(ExpenseCategory.objects.filter(user=self.user).exists())
+        self.assertFalse(IncomeCategorys.objects.filter(user=self.user).exists())
+        amounts = Expenses.objects.filter(user=self.user).values_list("amount")
+        self.assertEqual(list(amounts), [(700,)])
+        self.assertRollupsMatchRebuild()
+
+class TransactionStreamPlanTests(TestCase):
+    """transaction_stream over a month must use the (user, date) indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="plan", email="plan@example.com", password="x"
+        )
+        for day in range(1, 29):
+            Expenses.objects.create(
+                user=cls.user,
+                spent_at=date(2025, 2, day),
+                description="e",
+                detailed_description="",
+                amount=100,
+            )
+            Incomes.objects.create(
+                user=cls.user,
+                received_at=date(2025, 2, day),
+                description="i",
+                detailed_description="",
+                amount=100,
+            )
+
+    def _plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # Tiny test tables are cheaper to scan, make the planner
+                # show the index it would use on real data
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}", params)
+            else:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+    def test_month_range_uses_user_date_indexes(self):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest(f"No plan check for {connection.vendor}")
+
+        start, end = month_range(2025, 2)
+        plan = self._plan(transaction_stream(self.user, start=start, end=end))
+
+        self.assertIn(_index_name(Expenses, "user", "spent_at"), plan)
+        self.assertIn(_index_name(Incomes, "user", "received_at"), plan)
+
+
+def _chunks(text, size):
+    """Split the UTF-8 bytes of `text` in chunks of `size` bytes"""
+    data = text.encode()
+    return [data[start : start + size] for start in range(0, len(data), size)]
+
+
+class JsonRecordsReaderTests(SimpleTestCase):
+    """iter_json_records must read the same records whatever the chunk size"""
+
+    document = {
+        "export_info": {"nested": [{"a": [1, {"b": "]}"}]}, '"{['], "n": 1e3},
+        "expense_categories": [{"name": "Café ☕", "description": 'a "b" \\ c'}],
+        "version": 12345678901234567890,
+        "expenses": [
+            {
+                "category": "Café ☕",
+                "spent_at": "2025-02-01",
+                "description": "línea\nnova é \U0001f600",
+                "amount": -123456789,
+            },
+            {"category": None, "spent_at": "2025-02-02", "amount": 0.5},
+        ],
+        "skipped": "} not the end {",
+        "incomes": [],
+    }
+
+    def _records(self, text, size):
+        return list(iter_json_records(_chunks(text, size)))
+
+    def test_values_split_across_chunks(self):
+        text = json.dumps(self.document, ensure_ascii=False, indent=1)
+        expected = [
+            ("expense_categories", row) for row in self.document["expense_categories"]
+        ] + [("expenses", row) for row in self.document["expenses"]]
+        for size in range(1, 8):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(self._records(text, size), expected)
+
+    def test_escaped_strings(self):
+        text = json.dumps(self.document)  # Non ASCII as \uXXXX escapes
+        for size in (1, 2, 5):
+            with self.subTest(chunk_size=size):
+                records = self._records(text, size)
+                self.assertEqual(records[0][1]["name"], "Café ☕")
+                self.assertEqual(records[0][1]["description"], 'a "b" \\ c')
+                self.assertEqual(
+                    records[1][1]["description"], "línea\nnova é \U0001f600"
+                )
+
+    def test_skipped_keys_with_nested_structures(self):
+        text = json.dumps(
+            {"a": {"x": ["[", {"}": "{"}], "y": '\\"'}, "expenses": [{"k": 1}]}
+        )
+        for size in range(1, 8):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(self._records(text, size), [("expenses", {"k": 1})])
+
+    def test_malformed_input(self):
+        cases = {
+            "not an object": "[]",
+            "empty": "",
+            "section not a list": '{"expenses": {}}',
+            "trailing comma in object": '{"expenses": [],}',
+            "trailing comma in list": '{"expenses": [1,]}',
+            "missing colon": '{"expenses" []}',
+            "extra data": '{"expenses": []} {}',
+            "unterminated string": '{"expenses": [{"a": "b',
+            "unterminated skipped value": '{"x": {"a": [1, 2}',
+            "unterminated object": '{"expenses": []',
+        }
+        for name, text in cases.items():
+            for size in (1, 3, 64):
+                with self.subTest(name, chunk_size=size):
+                    with self.assertRaises(ImportFormatError):
+                        self._records(text, size)
+
+    def test_invalid_utf8(self):
+        with self.assertRaisesMessage(ImportFormatError, "UTF-8"):
+            list(iter_json_records([b'{"expenses": ["\xff"]}']))
+
+
+class LedgerImportCategoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="importer", email="importer@example.com", password="x"
+        )
+        cls.existing = ExpenseCategory.objects.create(
+            user=cls.user, name="Existing", description=""
+        )
+
+    def _expense(self, category):
+        return (
+            "expenses",
+            {"category": category, "spent_at": "2025-02-01", "amount": 100},
+        )
+
+    def test_transactions_before_their_category_section(self):
+        stats = import_ledger_records(
+            [
+                self._expense("Later"),
+                self._expense("Existing"),
+                self._expense("Missing"),
+                ("expense_categories", {"name": "Later", "description": ""}),
+            ],
+            self.user,
+            batch_size=2,
+        )
+
+        self.assertEqual(stats["expenses"], 3)
+        self.assertEqual(
+            sorted(
+                Expenses.objects.filter(user=self.user).values_list(
+                    "category__name", flat=True
+                ),
+                key=str,
+            ),
+            ["Existing", "Later", None],
+        )
+
+    def _held_back(self, importer):
+        return len(importer._deferred["expense"])
+
+    def test_unknown_categories_are_held_back_at_most_batch_size_rows(self):
+        with ledger_import(self.user, batch_size=3) as importer:
+            for _ in range(10):
+                importer.add_records([self._expense("Missing")])
+                self.assertLessEqual(self._held_back(importer), 3)
+            self.assertGreaterEqual(Expenses.objects.filter(user=self.user).count(), 6)
+
+        self.assertEqual(importer.stats["expenses"], 10)
+
+    def test_unknown_categories_after_the_category_section_are_not_held_back(self):
+        with ledger_import(self.user, batch_size=100) as importer:
+            importer.add_records(
+                [("expense_categories", {"name": "Food", "description": ""})]
+                + [self._expense("Missing")] * 5
+            )
+            self.assertEqual(self._held_back(importer), 0)
+
+        self.assertEqual(
+            Expenses.objects.filter(user=self.user, category=None).count(), 5
+        )
+
+
+@override_settings(FINANCE_IMPORT_PENDING_TIMEOUT=60)
+class StaleImportJobTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="jobs", email="jobs@example.com", password="x"
+        )
+        self.job = ImportJob.objects.create(user=self.user, file_format="json")
+        self.job.file.save("stale.json", ContentFile(b"{}"))
+        self.storage, self.file_name = self.job.file.storage, self.job.file.name
+        self.addCleanup(self.storage.delete, self.file_name)
+
+    def _age(self, seconds):
+        ImportJob.objects.filter(pk=self.job.pk).update(
+            created_at=timezone.now() - timedelta(seconds=seconds)
+        )
+
+    def test_recent_pending_job_waits_for_a_worker(self):
+        self._age(30)
+        self.assertEqual(fail_stale_import_jobs(), 0)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ImportJob.PENDING)
+
+    def test_pending_job_without_worker_fails_on_status_poll(self):
+        self._age(120)
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("finance_manager:import_job_status", args=[self.job.pk]),
+            secure=True,
+        )
+
+        self.assertEqual(response.json()["job"]["status"], ImportJob.FAILED)
+        self.assertFalse(self.storage.exists(self.file_name))
@@ -7,6 +7,7 @@ app_name = "finance_manager"
 urlpatterns = [
     path("", views.dashboard, name="dashboard"),
     path("transactions/", views.transactions, name="transactions"),
+    path("transactions/api/", views.transactions_api, name="transactions_api"),
     path("expense/create/", views.create_expense, name="create_expense"),
     path("expense/<int:expense_id>/edit/", views.edit_expense, name="edit_expense"),
     path(
@@ -39,6 +40,9 @@ urlpatterns = [
     ),
     # Data export/import URLs
     path("import/", views.import_financial_data, name="import_data"),
+    path(
+        "import/<int:job_id>/", views.import_job_status, name="import_job_status"
+    ),
     path(
         "export/json/",
         views.export_financial_data_json,
@@ -1,74 +1,13 @@
-from typing import Literal
-
 from finance_manager.models import (
     ExpenseCategory,
     Expenses,
     IncomeCategorys,
     Incomes,
 )
+from finance_manager.rollups import delete_ledger_category
 
 
-def get_user_financial_data(
-    request,
-) -> dict[
-    Literal["expenses", "incomes", "expense_categories", "income_categories"], list
-]:
-    """
-    Retrieve the user's financial data including expenses, incomes, expense categories, and income categories.
-    Returns a dictionary with lists of the respective data.
-    """
-    # Get user's financial data
-    expenses = [
-        [
-            x.id,
-            x.category.name if x.category else "no category",
-            x.amount,
-            x.description,
-            x.detailed_description,
-            x.spent_at,
-        ]
-        for x in Expenses.objects.filter(user=request.user)
-    ]
-    incomes = [
-        [
-            x.id,
-            x.category.name if x.category else "no category",
-            x.amount,
-            x.description,
-            x.detailed_description,
-            x.received_at,
-        ]
-        for x in Incomes.objects.filter(user=request.user)
-    ]
-    expense_categories = [
-        [
-            x.name,
-            x.description,
-            x.color,
-        ]
-        for x in ExpenseCategory.objects.filter(user=request.user)
-    ]
-    income_categories = [
-        [
-            x.name,
-            x.description,
-            x.color,
-        ]
-        for x in IncomeCategorys.objects.filter(user=request.user)
-    ]
-    data: dict[
-        Literal["expenses", "incomes", "expense_categories", "income_categories"], list
-    ]
-    data = {
-        "expenses": expenses,
-        "incomes": incomes,
-        "expense_categories": expense_categories,
-        "income_categories": income_categories,
-    }
-    return data
-
-
-def manipulate_finance_data(request, models) -> bool:
+def manipulate_finance_data(user, models) -> bool:
     """
     Manipulate finance data based on the provided models.
     Each model in the models list should be a dictionary with a "type" key indicating the operation:
@@ -98,12 +37,12 @@ def manipulate_finance_data(request, models) -> bool:
                     if not (model["category"] == "none"):
                         category = ExpenseCategory.objects.get(
                             name=model["category"],
-                            user=request.user,
+                            user=user,
                         )
                     else:
                         category = None
                     Expenses.objects.create(
-                        user=request.user,
+                        user=user,
                         category=category,
                         spent_at=model["spent_at"],
                         description=model["description"],
@@ -115,12 +54,12 @@ def manipulate_finance_data(request, models) -> bool:
                     if not (model["category"] == "none"):
                         category = IncomeCategorys.objects.get(
                             name=model["category"],
-                            user=request.user,
+                            user=user,
                         )
                     else:
                         category = None
                     Incomes.objects.create(
-                        user=request.user,
+                        user=user,
                         category=category,
                         received_at=model["spent_at"],
                         description=model["description"],
@@ -130,7 +69,7 @@ def manipulate_finance_data(request, models) -> bool:
                 # Add a new expense category
                 elif model["type"] == "cat_exp":
                     ExpenseCategory.objects.create(
-                        user=request.user,
+                        user=user,
                         name=model["name"],
                         description=model["description"],
                         color=model["color"],
@@ -138,7 +77,7 @@ def manipulate_finance_data(request, models) -> bool:
                 # Add a new income category
                 elif model["type"] == "cat_inc":
                     IncomeCategorys.objects.create(
-                        user=request.user,
+                        user=user,
                         name=model["name"],
                         description=model["description"],
                         color=model["color"],
@@ -147,12 +86,12 @@ def manipulate_finance_data(request, models) -> bool:
                 elif model["type"] == "edit_exp":
                     try:
                         expense = Expenses.objects.get(
-                            id=model["id"], user=request.user
+                            id=model["id"], user=user
                         )
                         if not (model["category"] == "none"):
                             category = ExpenseCategory.objects.get(
                                 name=model["category"],
-                                user=request.user,
+                                user=user,
                             )
                         else:
                             category = None
@@ -167,11 +106,11 @@ def manipulate_finance_data(request, models) -> bool:
                 # Edit an existing income
                 elif model["type"] == "edit_inc":
                     try:
-                        income = Incomes.objects.get(id=model["id"], user=request.user)
+                        income = Incomes.objects.get(id=model["id"], user=user)
                         if not (model["category"] == "none"):
                             category = IncomeCategorys.objects.get(
                                 name=model["category"],
-                                user=request.user,
+                                user=user,
                             )
                         else:
                             category = None
@@ -187,7 +126,7 @@ def manipulate_finance_data(request, models) -> bool:
                 elif model["type"] == "edit_cat_exp":
                     try:
                         category = ExpenseCategory.objects.get(
-                            name=model["old_name"], user=request.user
+                            name=model["old_name"], user=user
                         )
                         category.name = model["name"]
                         category.description = model["description"]
@@ -199,7 +138,7 @@ def manipulate_finance_data(request, models) -> bool:
                 elif model["type"] == "edit_cat_inc":
                     try:
                         category = IncomeCategorys.objects.get(
-                            name=model["old_name"], user=request.user
+                            name=model["old_name"], user=user
                         )
                         category.name = model["name"]
                         category.description = model["description"]
@@ -211,7 +150,7 @@ def manipulate_finance_data(request, models) -> bool:
                 elif model["type"] == "delete_exp":
                     try:
                         expense = Expenses.objects.get(
-                            id=model["id"], user=request.user
+                            id=model["id"], user=user
                         )
                         expense.delete()
                     except Expenses.DoesNotExist:
@@ -219,7 +158,7 @@ def manipulate_finance_data(request, models) -> bool:
                 # Delete an income
                 elif model["type"] == "delete_inc":
                     try:
-                        income = Incomes.objects.get(id=model["id"], user=request.user)
+                        income = Incomes.objects.get(id=model["id"], user=user)
                         income.delete()
                     except Incomes.DoesNotExist:
                         print(f"Income with id {model['id']} does not exist.")
@@ -227,18 +166,18 @@ def manipulate_finance_data(request, models) -> bool:
                 elif model["type"] == "delete_cat_exp":
                     try:
                         category = ExpenseCategory.objects.get(
-                            name=model["name"], user=request.user
+                            name=model["name"], user=user
                         )
-                        category.delete()
+                        delete_ledger_category(category)
                     except ExpenseCategory.DoesNotExist:
                         print(f"ExpenseCategory with id {model['id']} does not exist.")
                 # Delete an income category
                 elif model["type"] == "delete_cat_inc":
                     try:
                         category = IncomeCategorys.objects.get(
-                            name=model["name"], user=request.user
+                            name=model["name"], user=user
                         )
-                        category.delete()
+                        delete_ledger_category(category)
                     except IncomeCategorys.DoesNotExist:
                         print(f"IncomeCategory with id {model['id']} does not exist.")
             except Exception as e:
@@ -0,0 +1,47 @@
+"""
+Per-user data versions.
+
+A user's version changes on every write to their expenses, incomes or
+categories. Caches of data derived from them (rendered charts...) put the
+version in their keys, so a stale entry is never read again and simply
+ages out of the cache.
+
+Versions live in the FINANCE_CACHE cache, which is shared by every process
+(web workers and the import worker) in the default configuration.
+"""
+
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+FINANCE_CACHE = "finance"
+
+
+def _version_key(user_id):
+    return f"data-version:{user_id}"
+
+
+def data_version(user):
+    """Return the current data version of `user`"""
+    cache = caches[FINANCE_CACHE]
+    key = _version_key(user.pk)
+    version = cache.get(key)
+    if version is None:
+        # Never set or evicted, any new value invalidates older entries
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_data_version(user_id):
+    """
+    Give the user a new data version once the current transaction commits,
+    so nothing can cache the old data under the new version.
+    """
+    transaction.on_commit(
+        lambda: caches[FINANCE_CACHE].set(
+            _version_key(user_id), time.time_ns(), timeout=None
+        )
+    )
@@ -1,22 +1,35 @@
-import csv
 import json
+import tempfile
 from datetime import datetime
-from io import BytesIO
+from decimal import Decimal
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, JsonResponse
+from django.db.models import Q
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from django.views.decorators.http import require_POST
 
-try:
-    from openpyxl import Workbook, load_workbook
-    from openpyxl.styles import Font, PatternFill
-
-    EXCEL_AVAILABLE = True
-except ImportError:
-    EXCEL_AVAILABLE = False
-
-from finance_manager.models import ExpenseCategory, Expenses, IncomeCategorys, Incomes
+from finance_manager.aggregates import get_financial_summary
+from finance_manager.exporters import (
+    EXCEL_AVAILABLE,
+    iter_csv_export,
+    iter_json_export,
+    write_excel_export,
+)
+from finance_manager.import_readers import import_file_format
+from finance_manager.jobs import fail_stale_import_jobs
+from finance_manager.models import (
+    ExpenseCategory,
+    Expenses,
+    ImportJob,
+    IncomeCategorys,
+    Incomes,
+    LedgerRollup,
+)
+from finance_manager.queries import month_range, transaction_stream
+from finance_manager.rollups import delete_ledger_category
 
 # Create your views here.
 
@@ -25,27 +38,19 @@ from finance_manager.models import ExpenseCategory, Expenses, IncomeCategorys, I
 def dashboard(request):
     """Finance manager dashboard view"""
     expenses = Expenses.objects.filter(user=request.user).order_by("-spent_at")[:5]
-    expenses_this_month = Expenses.objects.filter(
-        user=request.user,
-        spent_at__year=datetime.now().year,
-        spent_at__month=datetime.now().month,
-    )
     incomes = Incomes.objects.filter(user=request.user).order_by("-received_at")[:5]
     expense_categories = ExpenseCategory.objects.filter(user=request.user)
     income_categories = IncomeCategorys.objects.filter(user=request.user)
 
-    total_expenses = sum([x.amount for x in Expenses.objects.filter(user=request.user)])
-    total_incomes = sum([x.amount for x in Incomes.objects.filter(user=request.user)])
+    summary = get_financial_summary(request.user)
 
     range_of_days = "Sem gastos neste mês"
-    total_expenses_this_month = 0
-    daily_mean = 0
-    if expenses_this_month:
+    if summary["expenses_this_month_count"]:
         range_of_days = f"Últimos {datetime.now().day} dias"
-        total_expenses_this_month = sum([x.amount for x in expenses_this_month])
-        daily_mean = total_expenses_this_month // datetime.now().day
 
-    total_amount = total_incomes - total_expenses
+    total_expenses_this_month = summary["total_expenses_this_month"]
+    daily_mean = summary["daily_mean"]
+    total_amount = summary["balance"]
 
     return render(
         request,
@@ -61,61 +66,32 @@ def dashboard(request):
             "range_of_days": range_of_days,
             "daily_mean": f"{daily_mean // 100},{daily_mean % 100:02n}",
             "this_month": datetime.now().strftime("%B"),
+            "import_max_upload_size": settings.FINANCE_IMPORT_MAX_UPLOAD_SIZE,
         },
     )
 
 
 @login_required
 def transactions(request):
-    """Transactions list view showing all incomes and expenses"""
-    # Get all user's transactions
-    expenses = Expenses.objects.filter(user=request.user).order_by("-spent_at")
-    incomes = Incomes.objects.filter(user=request.user).order_by("-received_at")
-
-    # Create combined transactions list ordered by date (most recent first)
-    all_transactions = []
-
-    # Add expenses with type indicator
-    for expense in expenses:
-        all_transactions.append(
-            {
-                "type": "expense",
-                "id": expense.id,
-                "description": expense.description,
-                "detailed_description": expense.detailed_description,
-                "amount": expense.amount,
-                "date": expense.spent_at,
-                "category": expense.category,
-                "object": expense,
-            }
-        )
-
-    # Add incomes with type indicator
-    for income in incomes:
-        all_transactions.append(
-            {
-                "type": "income",
-                "id": income.id,
-                "description": income.description,
-                "detailed_description": income.detailed_description,
-                "amount": income.amount,
-                "date": income.received_at,
-                "category": income.category,
-                "object": income,
-            }
-        )
-
-    # Sort all transactions by date (most recent first)
-    all_transactions.sort(key=lambda x: x["date"], reverse=True)
-
+    """Transactions page, the list itself is loaded page by page from transactions_api"""
     # Get categories for editing
     expense_categories = ExpenseCategory.objects.filter(user=request.user)
     income_categories = IncomeCategorys.objects.filter(user=request.user)
 
     # Calculate totals
-    total_expenses = sum([x.amount for x in expenses])
-    total_incomes = sum([x.amount for x in incomes])
-    balance = total_incomes - total_expenses
+    summary = get_financial_summary(request.user)
+    total_expenses = summary["total_expenses"]
+    total_incomes = summary["total_incomes"]
+    balance = summary["balance"]
+
+    # Months with transactions, used by the date filter
+    transaction_months = [
+        month.strftime("%Y-%m")
+        for month in LedgerRollup.objects.filter(user=request.user)
+        .order_by("-month")
+        .values_list("month", flat=True)
+        .distinct()
+    ]
 
     # Format amounts for display
     def format_amount(amount):
@@ -125,9 +101,9 @@ def transactions(request):
         request,
         "finance_manager/transactions.html",
         {
-            "expenses": expenses,
-            "incomes": incomes,
-            "all_transactions": all_transactions,
+            "expenses_count": summary["expenses_count"],
+            "incomes_count": summary["incomes_count"],
+            "transaction_months": transaction_months,
             "expense_categories": expense_categories,
             "income_categories": income_categories,
             "total_expenses": format_amount(total_expenses),
@@ -138,6 +114,163 @@ def transactions(request):
     )
 
 
+TRANSACTIONS_PAGE_SIZE = 50
+TRANSACTIONS_MAX_PAGE_SIZE = 200
+
+
+@login_required
+def transactions_api(request):
+    """
+    Return one page of the user's transactions as JSON, most recent first.
+    Pages are chained with an opaque (date, id, type) cursor.
+    """
+    try:
+        filters = _parse_transaction_filters(request.GET)
+        cursor = _parse_transaction_cursor(request.GET.get("cursor"))
+        limit = max(
+            1,
+            min(
+                int(request.GET.get("limit", TRANSACTIONS_PAGE_SIZE)),
+                TRANSACTIONS_MAX_PAGE_SIZE,
+            ),
+        )
+    except (ValueError, ArithmeticError):
+        return JsonResponse(
+            {"success": False, "message": "Parâmetros de filtro inválidos."},
+            status=400,
+        )
+
+    kinds = [filters["type"]] if filters["type"] else None
+    stream = transaction_stream(
+        request.user,
+        kinds=kinds,
+        start=filters["period_start"],
+        end=filters["period_end"],
+        refine=lambda queryset, kind, date_field: _filter_transactions(
+            queryset, kind, date_field, filters, cursor
+        ),
+    )
+    rows = list(stream[: limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = f"{last['date'].isoformat()}|{last['id']}|{last['type']}"
+
+    return JsonResponse(
+        {
+            "success": True,
+            "transactions": [
+                {
+                    "type": row["type"],
+                    "id": row["id"],
+                    "description": row["description"],
+                    "detailed_description": row["detailed_description"],
+                    "amount": row["amount"],
+                    "date": row["date"].isoformat(),
+                    "category": {
+                        "id": row["category_id"],
+                        "name": row["category_name"],
+                        "color": row["category_color"],
+                    }
+                    if row["category_id"]
+                    else None,
+                }
+                for row in rows
+            ],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+def _parse_transaction_filters(params):
+    """Read the transactions filters from the query string, raising ValueError on bad input"""
+
+    def to_date(value):
+        return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+    def to_cents(value):
+        return int(round(Decimal(value) * 100)) if value else None
+
+    def to_category(value):
+        if not value or value == "no-category":
+            return value or None
+        return int(value)
+
+    transaction_type = params.get("type", "")
+    if transaction_type not in ("", "expense", "income"):
+        raise ValueError(f"Unknown transaction type {transaction_type}")
+
+    start_date = to_date(params.get("start_date"))
+    end_date = to_date(params.get("end_date"))
+    year = int(params["year"]) if params.get("year") else None
+    month = int(params["month"]) if params.get("month") else None
+
+    period_start, period_end = month_range(year, month) if year else (None, None)
+
+    return {
+        "type": transaction_type,
+        "start_date": start_date,
+        "end_date": end_date,
+        "period_start": period_start,
+        "period_end": period_end,
+        "expense_category": to_category(params.get("expense_category")),
+        "income_category": to_category(params.get("income_category")),
+        "min_amount": to_cents(params.get("min_amount")),
+        "max_amount": to_cents(params.get("max_amount")),
+        "search": params.get("q", "").strip(),
+    }
+
+
+def _parse_transaction_cursor(cursor):
+    """Decode a `date|id|type` cursor, raising ValueError on bad input"""
+    if not cursor:
+        return None
+    date_text, transaction_id, transaction_type = cursor.split("|")
+    return (
+        datetime.strptime(date_text, "%Y-%m-%d").date(),
+        int(transaction_id),
+        transaction_type,
+    )
+
+
+def _filter_transactions(queryset, kind, date_field, filters, cursor):
+    """Apply the remaining filters and the keyset cursor to an expenses or incomes queryset"""
+    if filters["start_date"]:
+        queryset = queryset.filter(**{f"{date_field}__gte": filters["start_date"]})
+    if filters["end_date"]:
+        queryset = queryset.filter(**{f"{date_field}__lte": filters["end_date"]})
+
+    category = filters[f"{kind}_category"]
+    if category == "no-category":
+        queryset = queryset.filter(category__isnull=True)
+    elif category:
+        queryset = queryset.filter(category_id=category)
+
+    if filters["min_amount"] is not None:
+        queryset = queryset.filter(amount__gte=filters["min_amount"])
+    if filters["max_amount"] is not None:
+        queryset = queryset.filter(amount__lte=filters["max_amount"])
+    if filters["search"]:
+        queryset = queryset.filter(
+            Q(description__icontains=filters["search"])
+            | Q(detailed_description__icontains=filters["search"])
+        )
+
+    # Keyset pagination on (date, id, type), all descending
+    if cursor:
+        cursor_date, cursor_id, cursor_type = cursor
+        after_cursor = Q(**{f"{date_field}__lt": cursor_date}) | Q(
+            **{date_field: cursor_date, "id__lt": cursor_id}
+        )
+        if kind < cursor_type:
+            after_cursor |= Q(**{date_field: cursor_date, "id": cursor_id})
+        queryset = queryset.filter(after_cursor)
+
+    return queryset
+
+
 @login_required
 @require_POST
 def create_expense(request):
@@ -265,13 +398,10 @@ def delete_category(request, category_id):
     try:
         category = get_object_or_404(ExpenseCategory, id=category_id, user=request.user)
 
-        # Count related expenses before deletion
-        related_expenses_count = Expenses.objects.filter(category=category).count()
-
         category_name = category.name
 
-        # Delete the category (this will cascade delete related expenses due to ForeignKey)
-        category.delete()
+        # Delete the category and its expenses, returns how many expenses went with it
+        related_expenses_count = delete_ledger_category(category)
 
         message = f"Categoria '{category_name}' excluída com sucesso!"
         if related_expenses_count > 0:
@@ -340,13 +470,10 @@ def delete_income_category(request, category_id):
     try:
         category = get_object_or_404(IncomeCategorys, id=category_id, user=request.user)
 
-        # Count related incomes before deletion
-        related_incomes_count = Incomes.objects.filter(category=category).count()
-
         category_name = category.name
 
-        # Delete the category (this will cascade delete related incomes due to ForeignKey)
-        category.delete()
+        # Delete the category and its incomes, returns how many incomes went with it
+        related_incomes_count = delete_ledger_category(category)
 
         message = f"Categoria de renda '{category_name}' excluída com sucesso!"
         if related_incomes_count > 0:
@@ -613,69 +740,11 @@ def delete_income(request, income_id):
 @login_required
 def export_financial_data_json(request):
     """Export user's financial data as JSON file"""
-
     user = request.user
 
-    # Prepare data structure
-    data = {
-        "exported_at": datetime.now().isoformat(),
-        "username": user.username,
-        "expense_categories": [],
-        "income_categories": [],
-        "expenses": [],
-        "incomes": [],
-    }
-
-    # Export expense categories
-    for category in ExpenseCategory.objects.filter(user=user):
-        data["expense_categories"].append(
-            {
-                "name": category.name,
-                "description": category.description,
-                "color": category.color,
-            }
-        )
-
-    # Export income categories
-    for category in IncomeCategorys.objects.filter(user=user):
-        data["income_categories"].append(
-            {
-                "name": category.name,
-                "description": category.description,
-                "color": category.color,
-            }
-        )
-
-    # Export expenses
-    for expense in Expenses.objects.filter(user=user).order_by("-spent_at"):
-        data["expenses"].append(
-            {
-                "category": expense.category.name if expense.category else None,
-                "spent_at": expense.spent_at.strftime("%Y-%m-%d"),
-                "description": expense.description,
-                "detailed_description": expense.detailed_description,
-                "amount": expense.amount,
-                "created_at": expense.created_at.isoformat(),
-            }
-        )
-
-    # Export incomes
-    for income in Incomes.objects.filter(user=user).order_by("-received_at"):
-        data["incomes"].append(
-            {
-                "category": income.category.name if income.category else None,
-                "received_at": income.received_at.strftime("%Y-%m-%d"),
-                "description": income.description,
-                "detailed_description": income.detailed_description,
-                "amount": income.amount,
-                "created_at": income.created_at.isoformat(),
-            }
-        )
-
-    # Create HTTP response with JSON data
-    response = HttpResponse(
-        json.dumps(data, indent=2, ensure_ascii=False),
-        content_type="application/json",
+    # Streamed, rows are written as they are read from the database
+    response = StreamingHttpResponse(
+        iter_json_export(user), content_type="application/json"
     )
 
     # Set download headers
@@ -690,84 +759,11 @@ def export_financial_data_csv(request):
     """Export user's financial data as CSV file"""
     user = request.user
 
-    # Create HTTP response with CSV content
-    response = HttpResponse(content_type="text/csv")
+    # Streamed, rows are written as they are read from the database
+    response = StreamingHttpResponse(iter_csv_export(user), content_type="text/csv")
     filename = f"fd_{user.username}_{datetime.now().strftime('%Y_%m_%d')}.csv"
     response["Content-Disposition"] = f'attachment; filename="{filename}"'
 
-    writer = csv.writer(response)
-
-    # Write header information
-    writer.writerow(["Exported At", "Username"])
-    writer.writerow([datetime.now().isoformat(), user.username])
-    writer.writerow([])  # Empty row for separation
-
-    # Write expense categories
-    writer.writerow(["EXPENSE CATEGORIES"])
-    writer.writerow(["Name", "Description", "Color"])
-    for category in ExpenseCategory.objects.filter(user=user):
-        writer.writerow([category.name, category.description, category.color])
-
-    writer.writerow([])  # Empty row for separation
-
-    # Write income categories
-    writer.writerow(["INCOME CATEGORIES"])
-    writer.writerow(["Name", "Description", "Color"])
-    for category in IncomeCategorys.objects.filter(user=user):
-        writer.writerow([category.name, category.description, category.color])
-
-    writer.writerow([])  # Empty row for separation
-
-    # Write expenses
-    writer.writerow(["EXPENSES"])
-    writer.writerow(
-        [
-            "Category",
-            "Date",
-            "Description",
-            "Detailed Description",
-            "Amount (cents)",
-            "Created At",
-        ]
-    )
-    for expense in Expenses.objects.filter(user=user).order_by("-spent_at"):
-        writer.writerow(
-            [
-                expense.category.name if expense.category else "",
-                expense.spent_at.strftime("%Y-%m-%d"),
-                expense.description,
-                expense.detailed_description,
-                expense.amount,
-                expense.created_at.isoformat(),
-            ]
-        )
-
-    writer.writerow([])  # Empty row for separation
-
-    # Write incomes
-    writer.writerow(["INCOMES"])
-    writer.writerow(
-        [
-            "Category",
-            "Date",
-            "Description",
-            "Detailed Description",
-            "Amount (cents)",
-            "Created At",
-        ]
-    )
-    for income in Incomes.objects.filter(user=user).order_by("-received_at"):
-        writer.writerow(
-            [
-                income.category.name if income.category else "",
-                income.received_at.strftime("%Y-%m-%d"),
-                income.description,
-                income.detailed_description,
-                income.amount,
-                income.created_at.isoformat(),
-            ]
-        )
-
     return response
 
 
@@ -784,134 +780,14 @@ def export_financial_data_excel(request):
 
     user = request.user
 
-    # Create workbook and worksheets
-    wb = Workbook()
-
-    # Remove default worksheet
-    wb.remove(wb.active)
-
-    # Create worksheets
-    info_ws = wb.create_sheet("Info")
-    exp_cat_ws = wb.create_sheet("Expense Categories")
-    inc_cat_ws = wb.create_sheet("Income Categories")
-    expenses_ws = wb.create_sheet("Expenses")
-    incomes_ws = wb.create_sheet("Incomes")
-
-    # Style definitions
-    header_font = Font(bold=True)
-    header_fill = PatternFill(
-        start_color="CCCCCC", end_color="CCCCCC", fill_type="solid"
-    )
-
-    # Info worksheet
-    info_ws["A1"] = "Export Information"
-    info_ws["A1"].font = header_font
-    info_ws["A1"].fill = header_fill
-    info_ws["A2"] = "Exported At:"
-    info_ws["B2"] = datetime.now().isoformat()
-    info_ws["A3"] = "Username:"
-    info_ws["B3"] = user.username
-
-    # Expense Categories worksheet
-    exp_cat_headers = ["Name", "Description", "Color"]
-    for col, header in enumerate(exp_cat_headers, 1):
-        cell = exp_cat_ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-
-    for row, category in enumerate(ExpenseCategory.objects.filter(user=user), 2):
-        exp_cat_ws.cell(row=row, column=1, value=category.name)
-        exp_cat_ws.cell(row=row, column=2, value=category.description)
-        exp_cat_ws.cell(row=row, column=3, value=category.color)
-
-    # Income Categories worksheet
-    inc_cat_headers = ["Name", "Description", "Color"]
-    for col, header in enumerate(inc_cat_headers, 1):
-        cell = inc_cat_ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-
-    for row, category in enumerate(IncomeCategorys.objects.filter(user=user), 2):
-        inc_cat_ws.cell(row=row, column=1, value=category.name)
-        inc_cat_ws.cell(row=row, column=2, value=category.description)
-        inc_cat_ws.cell(row=row, column=3, value=category.color)
-
-    # Expenses worksheet
-    exp_headers = [
-        "Category",
-        "Date",
-        "Description",
-        "Detailed Description",
-        "Amount (cents)",
-        "Created At",
-    ]
-    for col, header in enumerate(exp_headers, 1):
-        cell = expenses_ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-
-    for row, expense in enumerate(
-        Expenses.objects.filter(user=user).order_by("-spent_at"), 2
-    ):
-        expenses_ws.cell(
-            row=row, column=1, value=expense.category.name if expense.category else ""
-        )
-        expenses_ws.cell(row=row, column=2, value=expense.spent_at.strftime("%Y-%m-%d"))
-        expenses_ws.cell(row=row, column=3, value=expense.description)
-        expenses_ws.cell(row=row, column=4, value=expense.detailed_description)
-        expenses_ws.cell(row=row, column=5, value=expense.amount)
-        expenses_ws.cell(row=row, column=6, value=expense.created_at.isoformat())
-
-    # Incomes worksheet
-    inc_headers = [
-        "Category",
-        "Date",
-        "Description",
-        "Detailed Description",
-        "Amount (cents)",
-        "Created At",
-    ]
-    for col, header in enumerate(inc_headers, 1):
-        cell = incomes_ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-
-    for row, income in enumerate(
-        Incomes.objects.filter(user=user).order_by("-received_at"), 2
-    ):
-        incomes_ws.cell(
-            row=row, column=1, value=income.category.name if income.category else ""
-        )
-        incomes_ws.cell(
-            row=row, column=2, value=income.received_at.strftime("%Y-%m-%d")
-        )
-        incomes_ws.cell(row=row, column=3, value=income.description)
-        incomes_ws.cell(row=row, column=4, value=income.detailed_description)
-        incomes_ws.cell(row=row, column=5, value=income.amount)
-        incomes_ws.cell(row=row, column=6, value=income.created_at.isoformat())
-
-    # Auto-adjust column widths
-    for ws in [info_ws, exp_cat_ws, inc_cat_ws, expenses_ws, incomes_ws]:
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-    # Save to BytesIO
-    output = BytesIO()
-    wb.save(output)
+    # Written to a temporary file, FileResponse streams it and closes it
+    output = tempfile.TemporaryFile()
+    write_excel_export(user, output)
     output.seek(0)
 
     # Create HTTP response
-    response = HttpResponse(
-        output.getvalue(),
+    response = FileResponse(
+        output,
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
     filename = f"fd_{user.username}_{datetime.now().strftime('%Y_%m_%d')}.xlsx"
@@ -923,7 +799,10 @@ def export_financial_data_excel(request):
 @login_required
 @require_POST
 def import_financial_data(request):
-    """Unified import function that handles JSON, CSV, and Excel files"""
+    """
+    Queue an uploaded JSON, CSV or Excel file for import. The file is
+    imported by the import_worker command, the client polls import_job_status.
+    """
     try:
         # Check if file was uploaded
         if "file" not in request.FILES:
@@ -932,450 +811,71 @@ def import_financial_data(request):
             )
 
         uploaded_file = request.FILES["file"]
-        filename = uploaded_file.name.lower()
 
-        # Check file size (limit to 10MB)
-        if uploaded_file.size > 10 * 1024 * 1024:
+        # Check file size, files are parsed as a stream so the limit can be generous
+        max_size = settings.FINANCE_IMPORT_MAX_UPLOAD_SIZE
+        if uploaded_file.size > max_size:
             return JsonResponse(
                 {
                     "success": False,
-                    "message": "Arquivo muito grande. Limite máximo: 10MB.",
+                    "message": f"Arquivo muito grande. Limite máximo: {max_size // (1024 * 1024)}MB.",
                 }
             )
 
-        # Route to appropriate handler based on file extension
-        if filename.endswith(".json"):
-            return _import_json_data(uploaded_file, request)
-        elif filename.endswith(".csv"):
-            return _import_csv_data(uploaded_file, request)
-        elif filename.endswith((".xlsx", ".xls")):
-            return _import_excel_data(uploaded_file, request)
-        else:
+        file_format = import_file_format(uploaded_file.name)
+        if file_format is None:
             return JsonResponse(
                 {
                     "success": False,
                     "message": "Formato de arquivo não suportado. Use JSON, CSV ou Excel (.xlsx, .xls).",
                 }
             )
-
-    except Exception as e:
-        return JsonResponse(
-            {"success": False, "message": f"Erro durante a importação: {str(e)}"}
-        )
-
-
-def _import_json_data(uploaded_file, request):
-    """Handle JSON file import"""
-    try:
-        for i in range(20):
-            print("_")
-        file_content = uploaded_file.read().decode("utf-8")
-        data = json.loads(file_content)
-    except json.JSONDecodeError as e:
-        return JsonResponse(
-            {"success": False, "message": f"Arquivo JSON inválido. Erro: {str(e)}"}
-        )
-    except UnicodeDecodeError:
-        return JsonResponse(
-            {
-                "success": False,
-                "message": "Codificação do arquivo inválida. Use UTF-8.",
-            }
-        )
-
-    # Validate that data is a dictionary
-    if not isinstance(data, dict):
-        return JsonResponse(
-            {
-                "success": False,
-                "message": "Formato JSON inválido. O arquivo deve conter um objeto JSON.",
-            }
-        )
-
-    # Create default structure if fields are missing
-    required_fields = [
-        "expense_categories",
-        "income_categories",
-        "expenses",
-        "incomes",
-    ]
-
-    # Initialize missing fields with empty lists
-    for field in required_fields:
-        if field not in data:
-            data[field] = []
-
-    # Validate that required fields are lists
-    for field in required_fields:
-        if not isinstance(data[field], list):
+        if file_format == "excel" and not EXCEL_AVAILABLE:
             return JsonResponse(
                 {
                     "success": False,
-                    "message": f"Campo '{field}' deve ser uma lista no arquivo JSON.",
+                    "message": "Importação Excel não disponível. Instale openpyxl: pip install openpyxl",
                 }
             )
 
-    user = request.user
-    clear_data = request.POST.get("clear_existing", "false").lower() == "true"
-
-    return _process_import_data(data, user, clear_data)
-
-
-def _import_csv_data(uploaded_file, request):
-    """Handle CSV file import"""
-    try:
-        file_content = uploaded_file.read().decode("utf-8")
-        csv_reader = csv.reader(file_content.splitlines())
-        rows = list(csv_reader)
-    except UnicodeDecodeError:
-        return JsonResponse(
-            {
-                "success": False,
-                "message": "Codificação do arquivo inválida. Use UTF-8.",
-            }
-        )
-
-    if len(rows) < 5:
-        return JsonResponse(
-            {"success": False, "message": "Arquivo CSV muito pequeno ou inválido."}
+        job = ImportJob.objects.create(
+            user=request.user,
+            file=uploaded_file,
+            file_format=file_format,
+            clear_existing=request.POST.get("clear_existing", "false").lower()
+            == "true",
         )
 
-    user = request.user
-    clear_data = request.POST.get("clear_existing", "false").lower() == "true"
-
-    # Parse CSV structure
-    data = {
-        "expense_categories": [],
-        "income_categories": [],
-        "expenses": [],
-        "incomes": [],
-    }
-
-    current_section = None
-    headers = []
-
-    for row in rows:
-        if not row or not any(row):  # Skip empty rows
-            continue
-
-        # Check for section headers
-        if len(row) >= 1:
-            if row[0] == "EXPENSE CATEGORIES":
-                current_section = "expense_categories"
-                continue
-            elif row[0] == "INCOME CATEGORIES":
-                current_section = "income_categories"
-                continue
-            elif row[0] == "EXPENSES":
-                current_section = "expenses"
-                continue
-            elif row[0] == "INCOMES":
-                current_section = "incomes"
-                continue
-
-            # Check for headers row
-            if current_section and row[0] in ["Name", "Category"]:
-                headers = row
-                continue
-
-        # Process data rows
-        if current_section and headers and len(row) >= len(headers):
-            row_data = dict(zip(headers, row))
-
-            if current_section == "expense_categories":
-                data["expense_categories"].append(
-                    {
-                        "name": row_data.get("Name", ""),
-                        "description": row_data.get("Description", ""),
-                        "color": row_data.get("Color", "#FFFFFF"),
-                    }
-                )
-            elif current_section == "income_categories":
-                data["income_categories"].append(
-                    {
-                        "name": row_data.get("Name", ""),
-                        "description": row_data.get("Description", ""),
-                        "color": row_data.get("Color", "#FFFFFF"),
-                    }
-                )
-            elif current_section == "expenses":
-                data["expenses"].append(
-                    {
-                        "category": row_data.get("Category", ""),
-                        "spent_at": row_data.get("Date", ""),
-                        "description": row_data.get("Description", ""),
-                        "detailed_description": row_data.get(
-                            "Detailed Description", ""
-                        ),
-                        "amount": int(row_data.get("Amount (cents)", "0"))
-                        if row_data.get("Amount (cents)", "").isdigit()
-                        else 0,
-                    }
-                )
-            elif current_section == "incomes":
-                data["incomes"].append(
-                    {
-                        "category": row_data.get("Category", ""),
-                        "received_at": row_data.get("Date", ""),
-                        "description": row_data.get("Description", ""),
-                        "detailed_description": row_data.get(
-                            "Detailed Description", ""
-                        ),
-                        "amount": int(row_data.get("Amount (cents)", "0"))
-                        if row_data.get("Amount (cents)", "").isdigit()
-                        else 0,
-                    }
-                )
-
-    return _process_import_data(data, user, clear_data)
-
-
-def _import_excel_data(uploaded_file, request):
-    """Handle Excel file import"""
-    if not EXCEL_AVAILABLE:
         return JsonResponse(
             {
-                "success": False,
-                "message": "Importação Excel não disponível. Instale openpyxl: pip install openpyxl",
+                "success": True,
+                "message": "Arquivo recebido. A importação está em andamento.",
+                "job": _import_job_data(job),
             }
         )
 
-    try:
-        wb = load_workbook(uploaded_file, read_only=True)
-    except Exception:
+    except Exception as e:
         return JsonResponse(
-            {"success": False, "message": "Arquivo Excel inválido ou corrompido."}
+            {"success": False, "message": f"Erro durante a importação: {str(e)}"}
         )
 
-    user = request.user
-    clear_data = request.POST.get("clear_existing", "false").lower() == "true"
-
-    # Parse Excel structure
-    data = {
-        "expense_categories": [],
-        "income_categories": [],
-        "expenses": [],
-        "incomes": [],
-    }
-
-    # Process each worksheet
-    for sheet_name in wb.sheetnames:
-        ws = wb[sheet_name]
-
-        if sheet_name == "Expense Categories":
-            # Skip header row
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                if row and row[0]:  # Check if first column has data
-                    data["expense_categories"].append(
-                        {
-                            "name": str(row[0]) if row[0] else "",
-                            "description": str(row[1]) if row[1] else "",
-                            "color": str(row[2]) if row[2] else "#FFFFFF",
-                        }
-                    )
-
-        elif sheet_name == "Income Categories":
-            # Skip header row
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                if row and row[0]:  # Check if first column has data
-                    data["income_categories"].append(
-                        {
-                            "name": str(row[0]) if row[0] else "",
-                            "description": str(row[1]) if row[1] else "",
-                            "color": str(row[2]) if row[2] else "#FFFFFF",
-                        }
-                    )
-
-        elif sheet_name == "Expenses":
-            # Skip header row
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                if row and row[1]:  # Check if date column has data
-                    try:
-                        # Handle date formatting
-                        date_value = row[1]
-                        if hasattr(date_value, "strftime"):
-                            date_str = date_value.strftime("%Y-%m-%d")
-                        else:
-                            date_str = str(date_value)
-
-                        data["expenses"].append(
-                            {
-                                "category": str(row[0]) if row[0] else "",
-                                "spent_at": date_str,
-                                "description": str(row[2]) if row[2] else "",
-                                "detailed_description": str(row[3]) if row[3] else "",
-                                "amount": int(row[4])
-                                if row[4] and str(row[4]).replace(".", "").isdigit()
-                                else 0,
-                            }
-                        )
-                    except (ValueError, IndexError):
-                        continue
-
-        elif sheet_name == "Incomes":
-            # Skip header row
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                if row and row[1]:  # Check if date column has data
-                    try:
-                        # Handle date formatting
-                        date_value = row[1]
-                        if hasattr(date_value, "strftime"):
-                            date_str = date_value.strftime("%Y-%m-%d")
-                        else:
-                            date_str = str(date_value)
-
-                        data["incomes"].append(
-                            {
-                                "category": str(row[0]) if row[0] else "",
-                                "received_at": date_str,
-                                "description": str(row[2]) if row[2] else "",
-                                "detailed_description": str(row[3]) if row[3] else "",
-                                "amount": int(row[4])
-                                if row[4] and str(row[4]).replace(".", "").isdigit()
-                                else 0,
-                            }
-                        )
-                    except (ValueError, IndexError):
-                        continue
-
-    return _process_import_data(data, user, clear_data)
-
-
-def _process_import_data(data, user, clear_data):
-    """Shared logic for processing import data from any format"""
-    from django.db import transaction
-
-    with transaction.atomic():
-        if clear_data:
-            # Clear existing data
-            Expenses.objects.filter(user=user).delete()
-            Incomes.objects.filter(user=user).delete()
-            ExpenseCategory.objects.filter(user=user).delete()
-            IncomeCategorys.objects.filter(user=user).delete()
-
-        # Import expense categories
-        expense_categories = {}
-        categories_created = 0
-        for cat_data in data.get("expense_categories", []):
-            if not cat_data.get("name"):
-                continue
-
-            category, created = ExpenseCategory.objects.get_or_create(
-                user=user,
-                name=cat_data["name"],
-                defaults={
-                    "description": cat_data.get("description", ""),
-                    "color": cat_data.get("color", "#FFFFFF"),
-                },
-            )
-            expense_categories[cat_data["name"]] = category
-            if created:
-                categories_created += 1
-
-        # Import income categories
-        income_categories = {}
-        income_categories_created = 0
-        for cat_data in data.get("income_categories", []):
-            if not cat_data.get("name"):
-                continue
-
-            category, created = IncomeCategorys.objects.get_or_create(
-                user=user,
-                name=cat_data["name"],
-                defaults={
-                    "description": cat_data.get("description", ""),
-                    "color": cat_data.get("color", "#FFFFFF"),
-                },
-            )
-            income_categories[cat_data["name"]] = category
-            if created:
-                income_categories_created += 1
-
-        # Import expenses
-        expenses_created = 0
-        expenses_skipped = 0
-        for expense_data in data.get("expenses", []):
-            try:
-                category = None
-                if expense_data.get("category"):
-                    category = expense_categories.get(expense_data["category"])
-
-                spent_at = datetime.strptime(
-                    expense_data["spent_at"], "%Y-%m-%d"
-                ).date()
-
-                Expenses.objects.create(
-                    user=user,
-                    category=category,
-                    spent_at=spent_at,
-                    description=expense_data.get("description", ""),
-                    detailed_description=expense_data.get("detailed_description", ""),
-                    amount=int(expense_data.get("amount", 0)),
-                )
-                expenses_created += 1
-            except (ValueError, KeyError, TypeError):
-                expenses_skipped += 1
-                continue
-
-        # Import incomes
-        incomes_created = 0
-        incomes_skipped = 0
-        for income_data in data.get("incomes", []):
-            try:
-                category = None
-                if income_data.get("category"):
-                    category = income_categories.get(income_data["category"])
-
-                received_at = datetime.strptime(
-                    income_data["received_at"], "%Y-%m-%d"
-                ).date()
-
-                Incomes.objects.create(
-                    user=user,
-                    category=category,
-                    received_at=received_at,
-                    description=income_data.get("description", ""),
-                    detailed_description=income_data.get("detailed_description", ""),
-                    amount=int(income_data.get("amount", 0)),
-                )
-                incomes_created += 1
-            except (ValueError, KeyError, TypeError):
-                incomes_skipped += 1
-                continue
-
-    # Prepare success message
-    total_created = (
-        categories_created
-        + income_categories_created
-        + expenses_created
-        + incomes_created
-    )
-    total_skipped = expenses_skipped + incomes_skipped
-
-    message_parts = [
-        "Importação concluída com sucesso!",
-        f"✅ {categories_created} categorias de gastos",
-        f"✅ {income_categories_created} categorias de receitas",
-        f"✅ {expenses_created} gastos",
-        f"✅ {incomes_created} receitas",
-    ]
-
-    if total_skipped > 0:
-        message_parts.append(
-            f"⚠️ {total_skipped} registros ignorados por dados inválidos"
-        )
 
-    return JsonResponse(
-        {
-            "success": True,
-            "message": "\n".join(message_parts),
-            "stats": {
-                "expense_categories": categories_created,
-                "income_categories": income_categories_created,
-                "expenses": expenses_created,
-                "incomes": incomes_created,
-                "total_created": total_created,
-                "total_skipped": total_skipped,
-            },
-        }
-    )
+@login_required
+def import_job_status(request, job_id):
+    """Return the progress of one of the user's import jobs"""
+    job = get_object_or_404(ImportJob, id=job_id, user=request.user)
+    # Without a running worker nothing else would end the job
+    if job.status == ImportJob.PENDING and fail_stale_import_jobs():
+        job.refresh_from_db()
+    return JsonResponse({"success": True, "job": _import_job_data(job)})
+
+
+def _import_job_data(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "rows_processed": job.rows_processed,
+        "stats": job.stats,
+        "message": job.message,
+        "status_url": reverse("finance_manager:import_job_status", args=[job.id]),
+    }
@@ -1,26 +1,27 @@
 import calendar
-from collections import defaultdict
+from datetime import timedelta
 
-import pandas as pd
 from django.utils import timezone
 
-from finance_statistics.utils import get_finance_dataframes
+from finance_manager.queries import daily_totals, month_range, transaction_stream
 
 
 class TransactionCalendarGenerator:
     def __init__(self, user):
         self.user = user
-        self.dataframes = get_finance_dataframes(user)
 
     def generate_calendar_data(self, year=None, month=None):
-        """Generate calendar data for transactions"""
+        """
+        Generate calendar data for transactions. Only the day totals are
+        loaded, the transactions of a day come from generate_day_data().
+        """
         if not year:
             year = timezone.now().year
         if not month:
             month = timezone.now().month
 
         # Prepare transaction data
-        calendar_data = self._prepare_transaction_data(year, month)
+        calendar_data = self._prepare_day_totals(year, month)
 
         # Generate calendar structure
         cal = calendar.monthcalendar(year, month)
@@ -70,108 +71,63 @@ class TransactionCalendarGenerator:
             "statistics": self._get_month_statistics(calendar_data),
         }
 
-    def _prepare_transaction_data(self, year, month):
-        """Prepare transaction data grouped by day"""
-        calendar_data = defaultdict(
-            lambda: {
-                "total_amount": 0,
-                "transaction_count": 0,
-                "expenses": 0,
-                "incomes": 0,
-                "balance": 0,
+    def _prepare_day_totals(self, year, month):
+        """Prepare the totals of each day of the month, summed in cents by the DB"""
+        month_start, month_end = month_range(year, month)
+
+        days = {}
+        for row in daily_totals(self.user, month_start, month_end):
+            day = days.setdefault(row["date"], {"expense": 0, "income": 0, "count": 0})
+            day[row["type"]] += row["total"]
+            day["count"] += row["count"]
+
+        calendar_data = {}
+        for date, day in sorted(days.items()):
+            calendar_data[date.isoformat()] = {
+                # Convert to reais
+                "total_amount": (day["expense"] + day["income"]) / 100,
+                "transaction_count": day["count"],
+                "expenses": day["expense"] / 100,
+                "incomes": day["income"] / 100,
+                "balance": (day["income"] - day["expense"]) / 100,
                 "transactions": [],
             }
-        )
 
-        # Process expenses
-        if not self.dataframes["expenses"].empty:
-            expenses_df = self.dataframes["expenses"].copy()
-            expenses_df["spent_at"] = pd.to_datetime(expenses_df["spent_at"])
-
-            # Filter by year and month
-            month_expenses = expenses_df[
-                (expenses_df["spent_at"].dt.year == year)
-                & (expenses_df["spent_at"].dt.month == month)
-            ]
-
-            # Get categories for expenses
-            categories_df = self.dataframes["expense_categories"]
-
-            for _, expense in month_expenses.iterrows():
-                day_key = expense["spent_at"].strftime("%Y-%m-%d")
-                amount = expense["amount"] / 100  # Convert to reais
-
-                # Get category name
-                category_name = "Sem Categoria"
-                if not categories_df.empty and pd.notna(expense["category_id"]):
-                    category_row = categories_df[
-                        categories_df["id"] == expense["category_id"]
-                    ]
-                    if not category_row.empty:
-                        category_name = category_row.iloc[0]["name"]
-
-                calendar_data[day_key]["expenses"] += amount
-                calendar_data[day_key]["total_amount"] += amount
-                calendar_data[day_key]["transaction_count"] += 1
-                calendar_data[day_key]["transactions"].append(
-                    {
-                        "type": "expense",
-                        "amount": amount,
-                        "description": expense.get("description", "Sem descrição"),
-                        "category": category_name,
-                        "time": expense["spent_at"].strftime("%H:%M"),
-                        "id": expense["id"],
-                    }
-                )
-
-        # Process incomes
-        if not self.dataframes["incomes"].empty:
-            incomes_df = self.dataframes["incomes"].copy()
-            incomes_df["received_at"] = pd.to_datetime(incomes_df["received_at"])
-
-            # Filter by year and month
-            month_incomes = incomes_df[
-                (incomes_df["received_at"].dt.year == year)
-                & (incomes_df["received_at"].dt.month == month)
-            ]
-
-            # Get categories for incomes
-            income_categories_df = self.dataframes["income_categories"]
-
-            for _, income in month_incomes.iterrows():
-                day_key = income["received_at"].strftime("%Y-%m-%d")
-                amount = income["amount"] / 100  # Convert to reais
-
-                # Get category name
-                category_name = "Sem Categoria"
-                if not income_categories_df.empty and pd.notna(income["category_id"]):
-                    category_row = income_categories_df[
-                        income_categories_df["id"] == income["category_id"]
-                    ]
-                    if not category_row.empty:
-                        category_name = category_row.iloc[0]["name"]
-
-                calendar_data[day_key]["incomes"] += amount
-                calendar_data[day_key]["total_amount"] += amount
-                calendar_data[day_key]["transaction_count"] += 1
-                calendar_data[day_key]["transactions"].append(
-                    {
-                        "type": "income",
-                        "amount": amount,
-                        "description": income.get("description", "Sem descrição"),
-                        "category": category_name,
-                        "time": income["received_at"].strftime("%H:%M"),
-                        "id": income["id"],
-                    }
-                )
-
-        # Calculate balance for each day
-        for day_data in calendar_data.values():
-            day_data["balance"] = day_data["incomes"] - day_data["expenses"]
-            # Sort transactions by time
-            day_data["transactions"].sort(key=lambda x: x["time"])
-
-        return dict(calendar_data)
+        return calendar_data
+
+    def generate_day_data(self, date):
+        """Get the transactions and totals of a single day"""
+        transactions = transaction_stream(
+            self.user, start=date, end=date + timedelta(days=1)
+        ).order_by("type", "id")
+
+        totals = {"expense": 0, "income": 0}
+        day_transactions = []
+        for transaction in transactions:
+            totals[transaction["type"]] += transaction["amount"]
+            day_transactions.append(
+                {
+                    "type": transaction["type"],
+                    "amount": transaction["amount"] / 100,  # Convert to reais
+                    "description": transaction["description"] or "Sem descrição",
+                    "category": transaction["category_name"] or "Sem Categoria",
+                    # Dates carry no time of day
+                    "time": "00:00",
+                    "id": transaction["id"],
+                }
+            )
+
+        return {
+            "date": date.isoformat(),
+            "day": date.day,
+            "transactions": day_transactions,
+            "statistics": {
+                "total_transactions": len(day_transactions),
+                "total_expenses": totals["expense"] / 100,
+                "total_incomes": totals["income"] / 100,
+                "balance": (totals["income"] - totals["expense"]) / 100,
+            },
+        }
 
     def _get_month_statistics(self, calendar_data):
         """Get month-level statistics"""
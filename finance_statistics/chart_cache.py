@@ -0,0 +1,25 @@
+from django.core.cache import caches
+
+from finance_manager.versions import FINANCE_CACHE
+
+
+def get_or_render_chart(user, chart_type, render, *, version):
+    """
+    Return the chart `chart_type` of `user` from the cache, calling
+    `render()` to build it when the user's data changed since it was cached.
+    Charts without data (None) are cached too.
+
+    `version` is the user's data_version(), read before any of the chart's
+    data is loaded. A write committing while the chart is drawn then leaves
+    it under the old version instead of caching old data under the new one.
+    """
+    cache = caches[FINANCE_CACHE]
+    key = f"chart:{user.pk}:{chart_type}:{version}"
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached["graph"]
+
+    graph = render()
+    cache.set(key, {"graph": graph})
+    return graph
@@ -0,0 +1,638 @@
+"""
+Drawing of the statistics charts as PNG images.
+
+Each drawer takes the series computed by FinanceGraphGenerator. matplotlib
+and seaborn are only loaded with this module, by the render pool processes or
+when a chart is drawn inline.
+"""
+
+import base64
+import datetime
+import io
+
+import matplotlib
+
+matplotlib.use("Agg")  # Use non-interactive backend
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+
+class ChartDrawer:
+    def __init__(self):
+        plt.style.use("seaborn-v0_8")
+        sns.set_palette("husl")
+
+    def _fig_to_base64(self, fig):
+        """Convert matplotlib figure to base64 string"""
+        buffer = io.BytesIO()
+        fig.savefig(
+            buffer,
+            format="png",
+            bbox_inches="tight",
+            dpi=150,
+            facecolor="white",
+            edgecolor="none",
+        )
+        buffer.seek(0)
+        image_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        buffer.close()
+        plt.close(fig)
+        return image_base64
+
+    def _draw_category_chart(self, series, title, legend_title):
+        """Draw the stacked bars of _category_series with a detailed legend"""
+        fig, (ax, ax_legend) = plt.subplots(
+            1, 2, figsize=(18, 10), gridspec_kw={"width_ratios": [3, 1]}
+        )
+
+        months = series["months"]
+
+        # Create stacked bars
+        bottom = np.zeros(len(months))
+        for category in series["categories"]:
+            values = np.array(category["values"])
+            ax.bar(
+                months,
+                values,
+                bottom=bottom,
+                label=category["name"],
+                color=category["color"],
+                alpha=0.8,
+                edgecolor="white",
+                linewidth=0.5,
+            )
+            bottom += values
+
+        # Formatting
+        ax.set_title(title, fontsize=18, fontweight="bold", pad=30)
+        ax.set_xlabel("Mês/Ano", fontsize=14, fontweight="bold")
+        ax.set_ylabel("Valor (R$)", fontsize=14, fontweight="bold")
+
+        # Rotate x-axis labels
+        plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+
+        # Add grid
+        ax.grid(True, alpha=0.3, axis="y", linestyle="-", linewidth=0.5)
+
+        # Add total values on top of each bar
+        for i, total in enumerate(series["totals"]):
+            if total > 0:
+                ax.text(
+                    i,
+                    total + total * 0.02,
+                    f"R$ {total:.0f}",
+                    ha="center",
+                    va="bottom",
+                    fontweight="bold",
+                    fontsize=10,
+                )
+
+        # Create detailed legend
+        ax_legend.axis("off")
+        ax_legend.text(
+            0.05,
+            0.95,
+            legend_title,
+            fontsize=14,
+            fontweight="bold",
+            transform=ax_legend.transAxes,
+        )
+
+        y_pos = 0.85
+
+        # Add category breakdown
+        for category in series["ranking"]:
+            # Color indicator
+            ax_legend.add_patch(
+                plt.Rectangle(
+                    (0.05, y_pos - 0.015),
+                    0.03,
+                    0.025,
+                    facecolor=category["color"],
+                    transform=ax_legend.transAxes,
+                )
+            )
+
+            # Category name and stats
+            ax_legend.text(
+                0.12,
+                y_pos,
+                f"{category['name']}",
+                fontsize=11,
+                fontweight="bold",
+                transform=ax_legend.transAxes,
+            )
+            ax_legend.text(
+                0.12,
+                y_pos - 0.025,
+                f"Total: R$ {category['total']:.2f} ({category['percentage']:.1f}%)",
+                fontsize=10,
+                color="gray",
+                transform=ax_legend.transAxes,
+            )
+            ax_legend.text(
+                0.12,
+                y_pos - 0.045,
+                f"Média mensal: R$ {category['monthly_average']:.2f}",
+                fontsize=9,
+                color="darkgray",
+                transform=ax_legend.transAxes,
+            )
+
+            y_pos -= 0.10
+
+        # Add summary statistics
+        y_pos -= 0.02
+        ax_legend.text(
+            0.05,
+            y_pos,
+            "📊 RESUMO GERAL",
+            fontsize=12,
+            fontweight="bold",
+            transform=ax_legend.transAxes,
+        )
+        y_pos -= 0.06
+
+        summary = series["summary"]
+        summary_stats = [
+            f"Total geral: R$ {summary['total']:.2f}",
+            f"Categorias ativas: {summary['active_categories']}",
+            f"Período: {summary['months']} meses",
+            f"Média mensal: R$ {summary['monthly_average']:.2f}",
+            f"Maior categoria: {summary['top_category']}",
+            f"({summary['top_percentage']:.1f}% do total)",
+        ]
+
+        for stat in summary_stats:
+            ax_legend.text(
+                0.05,
+                y_pos,
+                stat,
+                fontsize=10,
+                color="black" if not stat.startswith("(") else "gray",
+                transform=ax_legend.transAxes,
+            )
+            y_pos -= 0.04
+
+        plt.tight_layout()
+        return self._fig_to_base64(fig)
+
+    def _draw_expenses_by_category(self, series):
+        return self._draw_category_chart(
+            series,
+            "Gastos por Categoria ao Longo do Tempo",
+            "Análise de Gastos por Categoria",
+        )
+
+    def _draw_monthly_expenses_trend(self, series):
+        """Draw the monthly expenses line with its statistics"""
+        fig, (ax, ax_legend) = plt.subplots(
+            1, 2, figsize=(16, 8), gridspec_kw={"width_ratios": [3, 1]}
+        )
+
+        x_labels = series["months"]
+        y_values = np.array(series["values"])
+
+        ax.plot(
+            x_labels,
+            y_values,
+            marker="o",
+            linewidth=3,
+            markersize=8,
+            color="#e74c3c",
+            label="Gastos Mensais",
+        )
+        ax.fill_between(x_labels, y_values, alpha=0.3, color="#e74c3c")
+
+        ax.set_title(
+            "Tendência Mensal de Gastos", fontsize=16, fontweight="bold", pad=20
+        )
+        ax.set_xlabel("Mês/Ano", fontsize=12)
+        ax.set_ylabel("Valor (R$)", fontsize=12)
+        ax.grid(True, alpha=0.3)
+
+        # Rotate x-axis labels for better readability
+        plt.xticks(rotation=45)
+
+        # Create legend
+        ax_legend.axis("off")
+        ax_legend.text(
+            0.05,
+            0.95,
+            "Estatísticas Mensais",
+            fontsize=14,
+            fontweight="bold",
+            transform=ax_legend.transAxes,
+        )
+
+        summary = series["summary"]
+        legend_info = [
+            f"Período analisado: {summary['months']} meses",
+            f"Média mensal: R$ {summary['average']:.2f}",
+            f"Maior gasto: R$ {summary['max']['value']:.2f}",
+            f"({summary['max']['month']})",
+            f"Menor gasto: R$ {summary['min']['value']:.2f}",
+            f"({summary['min']['month']})",
+            f"Tendência: {summary['trend']}",
+            f"Total acumulado: R$ {summary['total']:.2f}",
+        ]
+
+        y_pos = 0.85
+        for info in legend_info:
+            color = "black" if not info.startswith("(") else "gray"
+            fontweight = "bold" if not info.startswith("(") else "normal"
+            ax_legend.text(
+                0.05,
+                y_pos,
+                info,
+                fontsize=10,
+                color=color,
+                fontweight=fontweight,
+                transform=ax_legend.transAxes,
+            )
+            y_pos -= 0.08
+
+        plt.tight_layout()
+        return self._fig_to_base64(fig)
+
+    def _draw_income_vs_expenses(self, series):
+        """Draw the grouped income and expense bars with the balance line"""
+        # Create figure with legend space
+        fig, (ax, ax_legend) = plt.subplots(
+            1, 2, figsize=(18, 10), gridspec_kw={"width_ratios": [3, 1]}
+        )
+
+        # Prepare data for grouped bar chart
+        months = series["months"]
+        incomes = np.array(series["incomes"])
+        expenses = np.array(series["expenses"])
+        balance = np.array(series["balance"])
+        x_pos = range(len(months))
+        width = 0.35
+
+        # Create bars
+        income_bars = ax.bar(
+            [x - width / 2 for x in x_pos],
+            incomes,
+            width,
+            label="Receitas",
+            color="#10b981",
+            alpha=0.8,
+            edgecolor="white",
+            linewidth=0.5,
+        )
+        expense_bars = ax.bar(
+            [x + width / 2 for x in x_pos],
+            expenses,
+            width,
+            label="Gastos",
+            color="#ef4444",
+            alpha=0.8,
+            edgecolor="white",
+            linewidth=0.5,
+        )
+
+        # Calculate max value for proper spacing
+        max_value = max(incomes.max(), expenses.max())
+
+        # Add value labels on bars
+        for bars, values in [(income_bars, incomes), (expense_bars, expenses)]:
+            for bar, value in zip(bars, values):
+                if value > 0:
+                    ax.text(
+                        bar.get_x() + bar.get_width() / 2.0,
+                        value + max_value * 0.02,
+                        f"R$ {value:.0f}",
+                        ha="center",
+                        va="bottom",
+                        fontsize=9,
+                        fontweight="bold",
+                    )
+
+        # Add monthly balance line
+        ax.plot(
+            x_pos,
+            balance,
+            color="#6366f1",
+            marker="o",
+            linewidth=3,
+            markersize=8,
+            label="Saldo Mensal",
+            alpha=0.9,
+            markerfacecolor="white",
+            markeredgecolor="#6366f1",
+            markeredgewidth=2,
+        )
+
+        # Add zero line for reference
+        ax.axhline(y=0, color="black", linestyle="--", alpha=0.5, linewidth=1)
+
+        # Set Y-axis limits with padding
+        y_max = max_value * 1.25
+        y_min = min(balance.min(), 0) * 1.1
+        ax.set_ylim(y_min, y_max)
+
+        # Formatting
+        ax.set_title(
+            "Receitas vs Gastos por Mês", fontsize=18, fontweight="bold", pad=30
+        )
+        ax.set_xlabel("Mês/Ano", fontsize=14, fontweight="bold")
+        ax.set_ylabel("Valor (R$)", fontsize=14, fontweight="bold")
+        ax.set_xticks(x_pos)
+        ax.set_xticklabels(months, rotation=45, ha="right", fontsize=11)
+
+        ax.legend(
+            loc="upper left", frameon=True, fancybox=True, shadow=True, fontsize=12
+        )
+        ax.grid(True, alpha=0.3, axis="y", linestyle="-", linewidth=0.5)
+
+        # Create detailed legend
+        ax_legend.axis("off")
+        ax_legend.text(
+            0.05,
+            0.95,
+            "Resumo Financeiro",
+            fontsize=14,
+            fontweight="bold",
+            transform=ax_legend.transAxes,
+        )
+
+        summary = series["summary"]
+        negative_months = summary["negative_months"]
+        legend_info = [
+            ("💰 RECEITAS", "#10b981"),
+            (f"Total: R$ {summary['total_income']:.2f}", "black"),
+            (f"Média mensal: R$ {summary['average_income']:.2f}", "gray"),
+            ("", ""),
+            ("💸 GASTOS", "#ef4444"),
+            (f"Total: R$ {summary['total_expense']:.2f}", "black"),
+            (f"Média mensal: R$ {summary['average_expense']:.2f}", "gray"),
+            ("", ""),
+            ("📊 SALDO", "#6366f1"),
+            (f"Saldo total: R$ {summary['balance']:.2f}", "black"),
+            (f"Saldo médio: R$ {summary['average_balance']:.2f}", "gray"),
+            ("", ""),
+            ("📈 ANÁLISE", "black"),
+            (f"Meses positivos: {summary['positive_months']}", "green"),
+            (
+                f"Meses negativos: {negative_months}",
+                "red" if negative_months > 0 else "gray",
+            ),
+            ("", ""),
+            (f"Melhor mês: {summary['best']['month']}", "green"),
+            (f"R$ {summary['best']['balance']:.2f}", "gray"),
+            (f"Pior mês: {summary['worst']['month']}", "red"),
+            (f"R$ {summary['worst']['balance']:.2f}", "gray"),
+        ]
+
+        y_pos = 0.85
+        for info, color in legend_info:
+            if info == "":
+                y_pos -= 0.02
+                continue
+            fontweight = (
+                "bold" if info.startswith(("💰", "💸", "📊", "📈")) else "normal"
+            )
+            fontsize = 11 if fontweight == "bold" else 10
+            ax_legend.text(
+                0.05,
+                y_pos,
+                info,
+                fontsize=fontsize,
+                color=color,
+                fontweight=fontweight,
+                transform=ax_legend.transAxes,
+            )
+            y_pos -= 0.05
+
+        plt.tight_layout()
+        return self._fig_to_base64(fig)
+
+    def _draw_income_by_category(self, series):
+        return self._draw_category_chart(
+            series,
+            "Receitas por Categoria ao Longo do Tempo",
+            "Análise de Receitas por Categoria",
+        )
+
+    def _draw_daily_spending_pattern(self, series):
+        """Draw the daily spending line with its statistics"""
+        fig, (ax, ax_legend) = plt.subplots(
+            1, 2, figsize=(18, 8), gridspec_kw={"width_ratios": [3, 1]}
+        )
+
+        dates = pd.to_datetime(series["dates"])
+        values = np.array(series["values"])
+
+        ax.plot(
+            dates,
+            values,
+            marker="o",
+            linewidth=2,
+            markersize=6,
+            alpha=0.8,
+            color="#e74c3c",
+            label="Gastos Diários",
+        )
+        ax.fill_between(dates, values, alpha=0.3, color="#e74c3c")
+
+        ax.set_title("Padrão de Gastos Diários", fontsize=16, fontweight="bold", pad=20)
+        ax.set_xlabel("Data", fontsize=12)
+        ax.set_ylabel("Valor (R$)", fontsize=12)
+        ax.grid(True, alpha=0.3)
+
+        ax.xaxis.set_major_formatter(mdates.DateFormatter("%d/%m"))
+
+        # Adjust date locator based on data range
+        date_range = (dates.max() - dates.min()).days
+        if date_range <= 30:
+            ax.xaxis.set_major_locator(mdates.DayLocator(interval=2))
+        elif date_range <= 90:
+            ax.xaxis.set_major_locator(mdates.WeekdayLocator())
+        else:
+            ax.xaxis.set_major_locator(mdates.MonthLocator())
+
+        plt.xticks(rotation=45)
+
+        # Create legend with statistics
+        ax_legend.axis("off")
+        ax_legend.text(
+            0.05,
+            0.95,
+            "Estatísticas Diárias",
+            fontsize=14,
+            fontweight="bold",
+            transform=ax_legend.transAxes,
+        )
+
+        summary = series["summary"]
+        max_day = datetime.date.fromisoformat(summary["max"]["date"])
+        min_day = datetime.date.fromisoformat(summary["min"]["date"])
+        highest = summary["highest_weekday"]
+        lowest = summary["lowest_weekday"]
+
+        legend_info = [
+            f"Período: {summary['days']} dias",
+            f"Total gasto: R$ {summary['total']:.2f}",
+            f"Média diária: R$ {summary['average']:.2f}",
+            "",
+            f"Maior gasto: R$ {summary['max']['value']:.2f}",
+            f"({max_day.strftime('%d/%m/%Y')})",
+            f"Menor gasto: R$ {summary['min']['value']:.2f}",
+            f"({min_day.strftime('%d/%m/%Y')})",
+            "",
+            "📅 Análise por dia da semana:",
+            f"Dia com mais gastos: {highest['weekday']}",
+            f"R$ {highest['average']:.2f} (média)",
+            f"Dia com menos gastos: {lowest['weekday']}",
+            f"R$ {lowest['average']:.2f} (média)",
+        ]
+
+        y_pos = 0.85
+        for info in legend_info:
+            if info == "":
+                y_pos -= 0.03
+                continue
+            color = "black" if not info.startswith("(") else "gray"
+            fontweight = "bold" if info.startswith("📅") else "normal"
+            fontsize = 11 if fontweight == "bold" else 10
+            ax_legend.text(
+                0.05,
+                y_pos,
+                info,
+                fontsize=fontsize,
+                color=color,
+                fontweight=fontweight,
+                transform=ax_legend.transAxes,
+            )
+            y_pos -= 0.06
+
+        plt.tight_layout()
+        return self._fig_to_base64(fig)
+
+    def _draw_financial_heatmap(self, series):
+        """Draw the weekly activity heatmap with its analysis"""
+        heatmap_data = pd.DataFrame(
+            series["values"],
+            index=pd.MultiIndex.from_tuples(
+                [(row["week"], row["weekday"]) for row in series["rows"]],
+                names=["week", "weekday"],
+            ),
+            columns=pd.Index(series["columns"], name="type"),
+        )
+
+        fig, (ax, ax_legend) = plt.subplots(
+            1, 2, figsize=(16, 10), gridspec_kw={"width_ratios": [3, 1]}
+        )
+
+        # Create heatmap
+        sns.heatmap(
+            heatmap_data,
+            annot=True,
+            fmt=".0f",
+            cmap="RdYlBu_r",
+            ax=ax,
+            cbar_kws={"label": "Valor (R$)"},
+            linewidths=0.5,
+        )
+
+        ax.set_title(
+            "Mapa de Calor - Atividade Financeira por Semana",
+            fontsize=16,
+            fontweight="bold",
+            pad=20,
+        )
+        ax.set_xlabel("Tipo de Transação", fontsize=12)
+        ax.set_ylabel("Semana do Ano", fontsize=12)
+
+        # Create legend with analysis
+        ax_legend.axis("off")
+        ax_legend.text(
+            0.05,
+            0.95,
+            "Análise do Mapa de Calor",
+            fontsize=14,
+            fontweight="bold",
+            transform=ax_legend.transAxes,
+        )
+
+        def peak_label(peak):
+            if peak is None:
+                return "Sem dados"
+            return f"Pico: Semana {peak['week']} ({peak['weekday']})"
+
+        summary = series["summary"]
+        expenses = summary["expenses"]
+        incomes = summary["incomes"]
+        legend_info = [
+            f"📊 Semanas analisadas: {summary['weeks']}",
+            "",
+            "💸 GASTOS SEMANAIS:",
+            f"Total: R$ {expenses['total']:.2f}",
+            f"Média: R$ {expenses['average']:.2f}",
+            peak_label(expenses["peak"]),
+            "",
+            "💰 RECEITAS SEMANAIS:",
+            f"Total: R$ {incomes['total']:.2f}",
+            f"Média: R$ {incomes['average']:.2f}",
+            peak_label(incomes["peak"]),
+            "",
+            "🎯 INTERPRETAÇÃO:",
+            "• Cores mais quentes = maior atividade",
+            "• Cores mais frias = menor atividade",
+            "• Branco = sem movimentação",
+            "",
+            "📈 PADRÕES:",
+            "• Identifique semanas com alta atividade",
+            "• Compare receitas vs gastos por período",
+            "• Visualize tendências temporais",
+        ]
+
+        y_pos = 0.85
+        for info in legend_info:
+            if info == "":
+                y_pos -= 0.025
+                continue
+            color = "black"
+            fontweight = "normal"
+            fontsize = 10
+
+            if info.startswith(("📊", "💸", "💰", "🎯", "📈")):
+                fontweight = "bold"
+                fontsize = 11
+            elif info.startswith("•"):
+                color = "gray"
+                fontsize = 9
+
+            ax_legend.text(
+                0.05,
+                y_pos,
+                info,
+                fontsize=fontsize,
+                color=color,
+                fontweight=fontweight,
+                transform=ax_legend.transAxes,
+            )
+            y_pos -= 0.04
+
+        plt.tight_layout()
+        return self._fig_to_base64(fig)
+
+
+# Method drawing the PNG of each chart type from its series
+DRAWERS = {
+    "expense-category": "_draw_expenses_by_category",
+    "monthly-expenses": "_draw_monthly_expenses_trend",
+    "income-expenses": "_draw_income_vs_expenses",
+    "income-category": "_draw_income_by_category",
+    "daily-spending": "_draw_daily_spending_pattern",
+    "financial-heatmap": "_draw_financial_heatmap",
+}
+
+
+def draw_chart(chart_type, series):
+    """Draw the PNG of a chart from its series, base64 encoded"""
+    return getattr(ChartDrawer(), DRAWERS[chart_type])(series)
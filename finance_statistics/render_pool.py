@@ -0,0 +1,120 @@
+"""
+Process pool drawing the statistics charts.
+
+Drawing a chart with matplotlib takes seconds of CPU. Inside the sync gunicorn
+workers, a few users opening the statistics would hold every worker. Charts
+are drawn instead by a small pool of processes, each loading matplotlib and
+seaborn once, and the web worker only waits for the PNG.
+
+Each web worker has its own pool, started on its first PNG chart, so workers
+that never draw one hold no render process. FINANCE_RENDER_PROCESSES sets the
+processes of each pool, up to WEB_CONCURRENCY × FINANCE_RENDER_PROCESSES in
+total, 0 draws in the web worker itself, one chart at a time since pyplot
+isn't thread safe and the gthread workers serve requests in threads. At most FINANCE_RENDER_QUEUE_SIZE
+charts per web worker wait or run at once, further charts fail right away
+with RenderPoolBusy instead of piling up until the gunicorn timeout.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# Serializes the charts drawn in the web worker, pyplot's state is global
+_inline_lock = threading.Lock()
+_pool = None
+_slots = None
+
+
+class RenderPoolBusy(RuntimeError):
+    """Too many charts are waiting to be drawn, the message is shown to the user"""
+
+
+class RenderTimeout(RuntimeError):
+    """A chart took longer than FINANCE_RENDER_TIMEOUT to draw"""
+
+
+def _start_render_process():
+    """Load Django and the plotting libraries once per render process"""
+    import django
+
+    django.setup()
+
+    from finance_statistics import chart_drawing  # noqa: F401
+
+
+def _draw_chart(chart_type, series):
+    """Draw a chart in a render process, the web worker never imports chart_drawing"""
+    from finance_statistics.chart_drawing import draw_chart
+
+    return draw_chart(chart_type, series)
+
+
+def _get_pool():
+    global _pool, _slots
+    with _lock:
+        if _pool is None:
+            # spawn gives clean processes, without the forked web worker's
+            # threads and database connections
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.FINANCE_RENDER_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_start_render_process,
+            )
+            _slots = threading.BoundedSemaphore(settings.FINANCE_RENDER_QUEUE_SIZE)
+        return _pool, _slots
+
+
+def _discard_pool(pool):
+    """Drop a broken pool, the next chart starts a new one"""
+    global _pool, _slots
+    with _lock:
+        if _pool is pool:
+            _pool = None
+            _slots = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_chart(chart_type, series):
+    """Draw a chart from its series and return the PNG, base64 encoded"""
+    if settings.FINANCE_RENDER_PROCESSES <= 0:
+        from finance_statistics.chart_drawing import draw_chart
+
+        with _inline_lock:
+            return draw_chart(chart_type, series)
+
+    pool, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise RenderPoolBusy(
+            "Muitos gráficos sendo gerados no momento. Tente novamente em instantes."
+        )
+
+    try:
+        future = pool.submit(_draw_chart, chart_type, series)
+    except (BrokenProcessPool, RuntimeError):
+        slots.release()
+        _discard_pool(pool)
+        raise
+    # The slot is only freed once the chart is done, even after a timeout,
+    # so charts stuck in the pool keep counting against the queue size
+    future.add_done_callback(lambda _: slots.release())
+
+    try:
+        return future.result(timeout=settings.FINANCE_RENDER_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        logger.warning(
+            "Chart %s took over %ss to draw", chart_type, settings.FINANCE_RENDER_TIMEOUT
+        )
+        raise RenderTimeout("O gráfico demorou demais para ser gerado.")
+    except BrokenProcessPool:
+        logger.exception("Render pool broke while drawing chart %s", chart_type)
+        _discard_pool(pool)
+        raise
@@ -1,3 +1,341 @@
-from django.test import TestCase
+import base64
+import json
+import threading
+import time
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from finance_manager.models import ExpenseCategory, Expenses, Incomes
+from finance_manager.versions import FINANCE_CACHE, data_version
+from finance_statistics import render_pool
+from finance_statistics.chart_cache import get_or_render_chart
+from finance_statistics.graph_generator import FinanceGraphGenerator
+from finance_statistics.utils import get_finance_dataframes, get_monthly_rollups
+
+LOCAL_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    FINANCE_CACHE: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "finance-tests",
+    },
+}
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ChartCacheTests(TestCase):
+    def setUp(self):
+        caches[FINANCE_CACHE].clear()
+        self.user = get_user_model().objects.create_user(
+            username="charts", email="charts@example.com", password="x"
+        )
+
+    def _add_expense(self):
+        # The version is bumped once the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            Expenses.objects.create(
+                user=self.user,
+                spent_at=date(2025, 2, 1),
+                description="e",
+                detailed_description="",
+                amount=100,
+            )
+
+    def _chart(self, render):
+        return get_or_render_chart(
+            self.user, "expense-category", render, version=data_version(self.user)
+        )
+
+    def test_hit_until_the_next_write(self):
+        render = mock.Mock(side_effect=["first", "second"])
+
+        self.assertEqual(self._chart(render), "first")
+        self.assertEqual(self._chart(render), "first")
+        self.assertEqual(render.call_count, 1)
+
+        self._add_expense()
+
+        self.assertEqual(self._chart(render), "second")
+        self.assertEqual(render.call_count, 2)
+
+    def test_write_during_a_batch_keeps_its_charts_under_the_old_version(self):
+        old_version = data_version(self.user)
+
+        def draw_and_write(generator, data_only=False):
+            # Commits while the batch is being drawn
+            self._add_expense()
+            return {"labels": []}
+
+        self.client.force_login(self.user)
+        with mock.patch.object(
+            FinanceGraphGenerator,
+            "generate_expenses_by_category",
+            autospec=True,
+            side_effect=draw_and_write,
+        ):
+            response = self.client.get(
+                reverse("finance_statistics:ajax_graphs"),
+                {"charts": "expense-category,income-category", "format": "data"},
+                secure=True,
+            )
+            lines = [json.loads(line) for line in response.streaming_content]
+
+        self.assertTrue(all(line["success"] for line in lines))
+        new_version = data_version(self.user)
+        self.assertNotEqual(new_version, old_version)
+        cache = caches[FINANCE_CACHE]
+        for chart_type in ("expense-category", "income-category"):
+            key = f"chart:{self.user.pk}:{chart_type}:data:"
+            self.assertIsNotNone(cache.get(key + str(old_version)))
+            self.assertIsNone(cache.get(key + str(new_version)))
+
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class GraphBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="batch", email="batch@example.com", password="x"
+        )
+        Expenses.objects.create(
+            user=cls.user,
+            spent_at=date(2025, 2, 1),
+            description="e",
+            detailed_description="",
+            amount=100,
+        )
+
+    def setUp(self):
+        caches[FINANCE_CACHE].clear()
+        self.client.force_login(self.user)
+
+    def _graphs(self, **params):
+        return self.client.get(
+            reverse("finance_statistics:ajax_graphs"), params, secure=True
+        )
+
+    def test_one_line_per_chart_in_order(self):
+        response = self._graphs(
+            charts="income-category,expense-category,monthly-expenses", format="data"
+        )
+        lines = [json.loads(line) for line in response.streaming_content]
+
+        self.assertEqual(
+            [line["type"] for line in lines],
+            ["income-category", "expense-category", "monthly-expenses"],
+        )
+        # No incomes, so no income chart
+        self.assertEqual([line["has_data"] for line in lines], [False, True, True])
+        self.assertIn("data", lines[1])
+
+    def test_loads_the_data_once(self):
+        module = "finance_statistics.graph_generator"
+        with (
+            mock.patch(
+                f"{module}.get_monthly_rollups", wraps=get_monthly_rollups
+            ) as load_rollups,
+            mock.patch(
+                f"{module}.get_finance_dataframes", wraps=get_finance_dataframes
+            ) as load_transactions,
+        ):
+            response = self._graphs(format="data")
+            lines = list(response.streaming_content)
+
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(load_rollups.call_count, 1)
+        self.assertEqual(load_transactions.call_count, 1)
+
+    def test_failing_chart_doesnt_stop_the_others(self):
+        with mock.patch.object(
+            FinanceGraphGenerator,
+            "generate_expenses_by_category",
+            side_effect=RuntimeError("boom"),
+        ):
+            response = self._graphs(
+                charts="expense-category,monthly-expenses", format="data"
+            )
+            lines = [json.loads(line) for line in response.streaming_content]
+
+        self.assertEqual(
+            lines[0], {"type": "expense-category", "success": False, "error": "boom"}
+        )
+        self.assertTrue(lines[1]["success"])
+
+    def test_unknown_chart(self):
+        response = self._graphs(charts="expense-category,pie")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()["success"])
+
+class CalendarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="calendar", email="calendar@example.com", password="x"
+        )
+        other = get_user_model().objects.create_user(
+            username="other", email="other@example.com", password="x"
+        )
+        food = ExpenseCategory.objects.create(
+            user=cls.user, name="Food", description=""
+        )
+        for user, day, amount in (
+            (cls.user, date(2025, 1, 31), 999),  # Outside the month
+            (cls.user, date(2025, 2, 1), 10),
+            (cls.user, date(2025, 2, 1), 20),
+            (cls.user, date(2025, 2, 28), 12345),
+            (cls.user, date(2025, 3, 1), 999),  # Outside the month
+            (other, date(2025, 2, 1), 999),
+        ):
+            Expenses.objects.create(
+                user=user,
+                category=food if user == cls.user else None,
+                spent_at=day,
+                description="e",
+                detailed_description="",
+                amount=amount,
+            )
+        Incomes.objects.create(
+            user=cls.user,
+            received_at=date(2025, 2, 1),
+            description="i",
+            detailed_description="",
+            amount=100000,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _days(self, calendar_data):
+        return {
+            day["date"]: day
+            for week in calendar_data["calendar"]
+            for day in week
+            if not day["is_empty"]
+        }
+
+    def test_month_totals(self):
+        response = self.client.get(
+            reverse("finance_statistics:calendar"),
+            {"year": 2025, "month": 2},
+            secure=True,
+        )
+        calendar_data = response.context["calendar_data"]
+        days = self._days(calendar_data)
+
+        self.assertEqual(len(days), 28)
+        self.assertEqual(days["2025-02-01"]["expenses"], 0.3)
+        self.assertEqual(days["2025-02-01"]["incomes"], 1000)
+        self.assertEqual(days["2025-02-01"]["balance"], 999.7)
+        self.assertEqual(days["2025-02-01"]["transaction_count"], 3)
+        self.assertEqual(days["2025-02-28"]["expenses"], 123.45)
+        self.assertEqual(days["2025-02-15"]["transaction_count"], 0)
+        statistics = calendar_data["statistics"]
+        self.assertEqual(statistics["total_expenses"], 123.75)
+        self.assertEqual(statistics["total_incomes"], 1000)
+        self.assertEqual(statistics["total_transactions"], 4)
+        self.assertEqual(statistics["days_with_activity"], 2)
+
+    def _day(self, value):
+        return self.client.get(
+            reverse("finance_statistics:day_transactions_ajax"),
+            {"date": value} if value is not None else {},
+            secure=True,
+        )
+
+    def test_day_transactions(self):
+        data = self._day("2025-02-01").json()
+
+        self.assertEqual(data["date"], "2025-02-01")
+        self.assertEqual(
+            [(row["type"], row["amount"]) for row in data["transactions"]],
+            [("expense", 0.1), ("expense", 0.2), ("income", 1000)],
+        )
+        self.assertEqual(data["transactions"][0]["category"], "Food")
+        self.assertEqual(data["statistics"]["total_expenses"], 0.3)
+        self.assertEqual(data["statistics"]["balance"], 999.7)
+
+    def test_day_without_transactions(self):
+        data = self._day("2025-02-15").json()
+
+        self.assertEqual(data["transactions"], [])
+        self.assertEqual(data["statistics"]["total_transactions"], 0)
+
+    def test_bad_day(self):
+        for value, status in ((None, 400), ("2025/02/01", 400), ("2025-02-30", 404)):
+            with self.subTest(value):
+                self.assertEqual(self._day(value).status_code, status)
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class RenderPoolTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(
+            username="render", email="render@example.com", password="x"
+        )
+        food = ExpenseCategory.objects.create(user=user, name="Food", description="")
+        for month in (1, 2, 3):
+            Expenses.objects.create(
+                user=user,
+                category=food,
+                spent_at=date(2025, month, 10),
+                description="e",
+                detailed_description="",
+                amount=1000 * month,
+            )
+        cls.series = FinanceGraphGenerator(user).generate_expenses_by_category(
+            data_only=True
+        )
+
+    def assertIsPng(self, graph):
+        self.assertTrue(base64.b64decode(graph).startswith(PNG_SIGNATURE))
+
+    @override_settings(FINANCE_RENDER_PROCESSES=0)
+    def test_inline_drawing(self):
+        self.assertIsPng(render_pool.render_chart("expense-category", self.series))
+
+    @override_settings(FINANCE_RENDER_PROCESSES=0)
+    def test_inline_drawing_is_one_chart_at_a_time(self):
+        from finance_statistics import chart_drawing
+
+        drawing = []
+        overlaps = []
+
+        def draw_chart(chart_type, series):
+            drawing.append(chart_type)
+            overlaps.append(len(drawing))
+            time.sleep(0.02)
+            drawing.remove(chart_type)
+            return ""
+
+        with mock.patch.object(chart_drawing, "draw_chart", draw_chart):
+            threads = [
+                threading.Thread(
+                    target=render_pool.render_chart, args=("expense-category", {})
+                )
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(overlaps, [1, 1, 1, 1])
+
+    @override_settings(FINANCE_RENDER_PROCESSES=1, FINANCE_RENDER_TIMEOUT=60)
+    def test_pool_drawing(self):
+        try:
+            graph = render_pool.render_chart("expense-category", self.series)
+        finally:
+            pool, _ = render_pool._get_pool()
+            render_pool._discard_pool(pool)
+
+        self.assertIsPng(graph)
@@ -13,6 +13,7 @@ urlpatterns = [
         name="day_transactions_ajax",
     ),
     # AJAX graph endpoints
+    path("ajax/graphs/", views.ajax_graphs, name="ajax_graphs"),
     path(
         "ajax/expense-category-graph/",
         views.ajax_expense_category_graph,
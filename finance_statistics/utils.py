@@ -1,42 +1,87 @@
-import os
-import sys
+"""
+Data loading for the statistics charts.
 
-import django
+pandas is only imported with this module, which the views load on the first
+chart request, so workers serving other pages never load it.
+"""
+
+import numpy as np
 import pandas as pd
 
-# Setup Django environment
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Adm.settings")
-django.setup()
+from finance_manager.models import (
+    ExpenseCategory,
+    Expenses,
+    IncomeCategorys,
+    Incomes,
+    LedgerRollup,
+)
+
+
+def get_transactions_frame(model, user, date_field, columns=("amount",)):
+    """
+    Load the user's rows of a ledger as a DataFrame of typed columns: the
+    `date_field` as datetime64, `amount` as int64 and `category_id` as a
+    categorical (NaN when uncategorized). Only the date and `columns` are
+    fetched, as tuples instead of one dict per row.
+    """
+    fields = [date_field, *columns]
+    rows = model.objects.filter(user_id=user.pk).values_list(*fields)
+    values = list(zip(*rows)) or [()] * len(fields)
 
-from finance_manager.models import ExpenseCategory, Expenses, IncomeCategorys, Incomes
+    data = {}
+    for field, column in zip(fields, values):
+        if field == date_field:
+            data[field] = np.array(column, dtype="datetime64[D]").astype(
+                "datetime64[ns]"
+            )
+        elif field == "amount":
+            data[field] = np.fromiter(column, dtype=np.int64, count=len(column))
+        elif field == "category_id":
+            data[field] = pd.Categorical(column)
+        else:
+            data[field] = np.array(column, dtype=object)
+    return pd.DataFrame(data, columns=fields)
 
 
-def get_finance_dataframes(user):
+def get_finance_dataframes(user, columns=("amount",)):
     """
-    Get all financial data as pandas DataFrames
+    Get the user's expenses and incomes as DataFrames with their date column
+    and `columns`, see get_transactions_frame
     """
-    try:
-        expenses_values = Expenses.objects.filter(user__email=user).values()
-        incomes_values = Incomes.objects.filter(user__email=user).values()
-        expense_category_values = ExpenseCategory.objects.filter(
-            user__email=user
-        ).values()
-        income_categorys_values = IncomeCategorys.objects.filter(
-            user__email=user
-        ).values()
-
-        df_expenses = pd.DataFrame(expenses_values)
-        df_incomes = pd.DataFrame(incomes_values)
-        df_expense_categories = pd.DataFrame(expense_category_values)
-        df_income_categories = pd.DataFrame(income_categorys_values)
-
-        return {
-            "expenses": df_expenses,
-            "incomes": df_incomes,
-            "expense_categories": df_expense_categories,
-            "income_categories": df_income_categories,
-        }
-    except Exception as e:
-        print(f"Error accessing database: {e}")
-        return None
+    return {
+        "expenses": get_transactions_frame(Expenses, user, "spent_at", columns),
+        "incomes": get_transactions_frame(Incomes, user, "received_at", columns),
+    }
+
+
+def get_monthly_rollups(user):
+    """
+    Get the user's monthly ledger rollups as a pandas DataFrame,
+    with the category name and color of each row
+    """
+    rollups = pd.DataFrame(
+        LedgerRollup.objects.filter(user=user).values(
+            "month", "kind", "category_id", "total", "count"
+        ),
+        columns=["month", "kind", "category_id", "total", "count"],
+    )
+
+    categories = {}
+    for kind, model in [
+        (LedgerRollup.EXPENSE, ExpenseCategory),
+        (LedgerRollup.INCOME, IncomeCategorys),
+    ]:
+        for category_id, name, color in model.objects.filter(user=user).values_list(
+            "id", "name", "color"
+        ):
+            categories[(kind, category_id)] = (name, color)
+
+    keys = list(zip(rollups["kind"], rollups["category_id"]))
+    rollups["name"] = [
+        categories.get(key, ("Sem categoria", "#9ca3af"))[0] for key in keys
+    ]
+    rollups["color"] = [
+        categories.get(key, ("Sem categoria", "#9ca3af"))[1] for key in keys
+    ]
+    rollups["month_year"] = pd.to_datetime(rollups["month"]).dt.to_period("M")
+    return rollups
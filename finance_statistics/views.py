@@ -1,10 +1,17 @@
+import datetime
+import json
+
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.utils import timezone
 
+from finance_manager.aggregates import get_financial_summary
+from finance_manager.models import ExpenseCategory, IncomeCategorys
+from finance_manager.versions import data_version
+
 from .calendar_generator import TransactionCalendarGenerator
-from .utils import get_finance_dataframes
+from .chart_cache import get_or_render_chart
 
 
 @login_required
@@ -12,14 +19,18 @@ def dashboard_view(request):
     """Finance statistics dashboard view"""
 
     # Get basic counts for the stats cards
-    dataframes = get_finance_dataframes(request.user)
+    summary = get_financial_summary(request.user)
 
     context = {
         "has_data": True,
-        "total_expenses": len(dataframes.get("expenses", [])),
-        "total_incomes": len(dataframes.get("incomes", [])),
-        "expense_categories_count": len(dataframes.get("expense_categories", [])),
-        "income_categories_count": len(dataframes.get("income_categories", [])),
+        "total_expenses": summary["expenses_count"],
+        "total_incomes": summary["incomes_count"],
+        "expense_categories_count": ExpenseCategory.objects.filter(
+            user=request.user
+        ).count(),
+        "income_categories_count": IncomeCategorys.objects.filter(
+            user=request.user
+        ).count(),
     }
 
     return render(request, "finance_statistics/dashboard.html", context)
@@ -75,36 +86,14 @@ def day_transactions_ajax(request):
     except (ValueError, TypeError):
         return JsonResponse({"error": "Invalid date format"}, status=400)
 
-    # Generate calendar data for the month
-    calendar_generator = TransactionCalendarGenerator(request.user)
-    calendar_data = calendar_generator.generate_calendar_data(year, month)
-
-    # Find the specific day
-    day_data = None
-    for week in calendar_data["calendar"]:
-        for day_info in week:
-            if day_info.get("date") == date:
-                day_data = day_info
-                break
-        if day_data:
-            break
-
-    if not day_data:
+    try:
+        day_date = datetime.date(year, month, day)
+    except ValueError:
         return JsonResponse({"error": "Day not found"}, status=404)
 
-    return JsonResponse(
-        {
-            "date": date,
-            "day": day_data["day"],
-            "transactions": day_data["transactions"],
-            "statistics": {
-                "total_transactions": day_data["transaction_count"],
-                "total_expenses": day_data["expenses"],
-                "total_incomes": day_data["incomes"],
-                "balance": day_data["balance"],
-            },
-        }
-    )
+    # Only the requested day is queried, through the (user, date) indexes
+    calendar_generator = TransactionCalendarGenerator(request.user)
+    return JsonResponse(calendar_generator.generate_day_data(day_date))
 
 
 @login_required
@@ -140,8 +129,14 @@ def ajax_expense_category_graph(request):
         user = request.user
         from .graph_generator import FinanceGraphGenerator
 
+        version = data_version(user)
         generator = FinanceGraphGenerator(user)
-        graph_data = generator.generate_expenses_by_category()
+        graph_data = get_or_render_chart(
+            user,
+            "expense-category",
+            generator.generate_expenses_by_category,
+            version=version,
+        )
 
         return JsonResponse(
             {
@@ -161,8 +156,14 @@ def ajax_monthly_expenses_graph(request):
         user = request.user
         from .graph_generator import FinanceGraphGenerator
 
+        version = data_version(user)
         generator = FinanceGraphGenerator(user)
-        graph_data = generator.generate_monthly_expenses_trend()
+        graph_data = get_or_render_chart(
+            user,
+            "monthly-expenses",
+            generator.generate_monthly_expenses_trend,
+            version=version,
+        )
 
         return JsonResponse(
             {
@@ -182,8 +183,14 @@ def ajax_income_expenses_graph(request):
         user = request.user
         from .graph_generator import FinanceGraphGenerator
 
+        version = data_version(user)
         generator = FinanceGraphGenerator(user)
-        graph_data = generator.generate_income_vs_expenses()
+        graph_data = get_or_render_chart(
+            user,
+            "income-expenses",
+            generator.generate_income_vs_expenses,
+            version=version,
+        )
 
         return JsonResponse(
             {
@@ -203,8 +210,14 @@ def ajax_income_category_graph(request):
         user = request.user
         from .graph_generator import FinanceGraphGenerator
 
+        version = data_version(user)
         generator = FinanceGraphGenerator(user)
-        graph_data = generator.generate_income_by_category()
+        graph_data = get_or_render_chart(
+            user,
+            "income-category",
+            generator.generate_income_by_category,
+            version=version,
+        )
 
         return JsonResponse(
             {
@@ -224,8 +237,14 @@ def ajax_daily_spending_graph(request):
         user = request.user
         from .graph_generator import FinanceGraphGenerator
 
+        version = data_version(user)
         generator = FinanceGraphGenerator(user)
-        graph_data = generator.generate_daily_spending_pattern()
+        graph_data = get_or_render_chart(
+            user,
+            "daily-spending",
+            generator.generate_daily_spending_pattern,
+            version=version,
+        )
 
         return JsonResponse(
             {
@@ -245,8 +264,14 @@ def ajax_financial_heatmap_graph(request):
         user = request.user
         from .graph_generator import FinanceGraphGenerator
 
+        version = data_version(user)
         generator = FinanceGraphGenerator(user)
-        graph_data = generator.generate_financial_heatmap()
+        graph_data = get_or_render_chart(
+            user,
+            "financial-heatmap",
+            generator.generate_financial_heatmap,
+            version=version,
+        )
 
         return JsonResponse(
             {
@@ -257,3 +282,48 @@ def ajax_financial_heatmap_graph(request):
         )
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)})
+
+
+@login_required
+def ajax_graphs(request):
+    """
+    Generate several dashboard graphs from a single data load via AJAX.
+    `charts` is a comma separated list of chart types, all by default. With
+    `format=data` each graph comes as its data series, drawn by the browser,
+    instead of a PNG. The response has one JSON object per line, sent as soon
+    as each graph is ready.
+    """
+    from .graph_generator import CHARTS, iter_graphs
+
+    charts = request.GET.get("charts")
+    chart_types = charts.split(",") if charts else list(CHARTS)
+    unknown = [chart_type for chart_type in chart_types if chart_type not in CHARTS]
+    if unknown:
+        return JsonResponse(
+            {"success": False, "error": f"Unknown chart: {', '.join(unknown)}"},
+            status=400,
+        )
+
+    data_only = request.GET.get("format") == "data"
+    user = request.user
+    # Read once, before the first chart loads the data shared by all of them
+    version = data_version(user)
+
+    def render(chart_type, draw):
+        # One failing chart must not stop the others
+        try:
+            cache_key = f"{chart_type}:data" if data_only else chart_type
+            graph_data = get_or_render_chart(user, cache_key, draw, version=version)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return {
+            "success": True,
+            "data" if data_only else "graph": graph_data,
+            "has_data": graph_data is not None,
+        }
+
+    def lines():
+        for chart_type, result in iter_graphs(user, chart_types, render, data_only):
+            yield json.dumps({"type": chart_type, **result}) + "\n"
+
+    return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
@@ -2,7 +2,10 @@ import os
 
 bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
 workers = int(os.environ.get("WEB_CONCURRENCY", 2))
-worker_class = "sync"
+# Threads only wait on the chart render pool (finance_statistics.render_pool),
+# so a few users opening the statistics don't hold every worker
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 100
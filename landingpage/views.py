@@ -2,7 +2,7 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
 
-from finance_manager.models import Expenses, Incomes
+from finance_manager.aggregates import get_financial_summary
 
 # Create your views here.
 
@@ -10,9 +10,7 @@ from finance_manager.models import Expenses, Incomes
 @login_required
 def index(request):
     """Home page view"""
-    total_expenses = sum([x.amount for x in Expenses.objects.filter(user=request.user)])
-    total_incomes = sum([x.amount for x in Incomes.objects.filter(user=request.user)])
-    total_amount = total_incomes - total_expenses
+    total_amount = get_financial_summary(request.user)["balance"]
 
     context = {
         "total_amount": f"{total_amount // 100},{total_amount % 100:02n}",
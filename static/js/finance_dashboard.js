@@ -993,12 +993,14 @@ function handleFileSelect(event) {
     return;
   }
 
-  // Validate file size (10MB limit)
-  if (file.size > 10 * 1024 * 1024) {
+  // Validate file size against the server limit
+  const maxSize = Number(event.target.dataset.maxSize) || 10 * 1024 * 1024;
+  if (file.size > maxSize) {
+    const maxSizeMB = Math.floor(maxSize / (1024 * 1024));
     if (typeof toastError !== "undefined") {
-      toastError("Arquivo muito grande. Limite máximo: 10MB");
+      toastError(`Arquivo muito grande. Limite máximo: ${maxSizeMB}MB`);
     } else {
-      alert("Arquivo muito grande. Limite máximo: 10MB");
+      alert(`Arquivo muito grande. Limite máximo: ${maxSizeMB}MB`);
     }
     event.target.value = "";
     return;
@@ -1507,7 +1509,7 @@ async function submitImport() {
   const importUrl = window.importDataUrl;
 
   // Show progress
-  document.getElementById("import-progress").classList.remove("hidden");
+  setImportProgress("Enviando arquivo...");
   document.getElementById("import-btn").disabled = true;
 
   try {
@@ -1526,39 +1528,88 @@ async function submitImport() {
 
     const result = await response.json();
 
-    // Hide progress
-    document.getElementById("import-progress").classList.add("hidden");
-
     if (result.success) {
-      if (typeof toastSuccess !== "undefined") {
-        toastSuccess(result.message);
-      } else {
-        alert(result.message);
-      }
-      
-      // Close modal and reload page
-      closeImportModal();
-      setTimeout(() => {
-        window.location.reload();
-      }, 1000);
+      // The file is imported in the background, follow the job until it ends
+      setImportProgress("Importando dados...");
+      pollImportJob(result.job.status_url);
     } else {
-      if (typeof toastError !== "undefined") {
-        toastError(result.message);
-      } else {
-        alert("Erro: " + result.message);
+      finishImport(false, result.message);
+    }
+  } catch (error) {
+    console.error("Error:", error);
+    finishImport(false, "Erro ao conectar com o servidor");
+  }
+}
+
+function setImportProgress(text) {
+  document.getElementById("import-progress-text").textContent = text;
+  document.getElementById("import-progress").classList.remove("hidden");
+}
+
+// Failed status requests in a row before the import modal gives up
+const IMPORT_POLL_MAX_ERRORS = 10;
+
+async function pollImportJob(statusUrl, errors = 0) {
+  try {
+    const response = await fetch(statusUrl);
+    const result = await response.json();
+
+    if (!result.success) {
+      finishImport(false, result.message);
+      return;
+    }
+
+    const job = result.job;
+    if (job.status === "done") {
+      finishImport(true, job.message);
+    } else if (job.status === "failed") {
+      finishImport(false, job.message);
+    } else {
+      if (job.status === "running" && job.rows_processed > 0) {
+        setImportProgress(
+          `Importando dados... ${job.rows_processed} registros processados`
+        );
+      } else if (job.status === "pending") {
+        setImportProgress("Aguardando na fila de importação...");
       }
-      document.getElementById("import-btn").disabled = false;
+      setTimeout(() => pollImportJob(statusUrl), 1000);
     }
   } catch (error) {
     console.error("Error:", error);
-    document.getElementById("import-progress").classList.add("hidden");
-    document.getElementById("import-btn").disabled = false;
-    
+    if (errors + 1 >= IMPORT_POLL_MAX_ERRORS) {
+      finishImport(
+        false,
+        "Não foi possível acompanhar a importação. Atualize a página mais tarde para ver os dados importados."
+      );
+      return;
+    }
+    // The import keeps running on the server, try again shortly
+    setTimeout(() => pollImportJob(statusUrl, errors + 1), 3000);
+  }
+}
+
+function finishImport(success, message) {
+  document.getElementById("import-progress").classList.add("hidden");
+
+  if (success) {
+    if (typeof toastSuccess !== "undefined") {
+      toastSuccess(message);
+    } else {
+      alert(message);
+    }
+
+    // Close modal and reload page
+    closeImportModal();
+    setTimeout(() => {
+      window.location.reload();
+    }, 1000);
+  } else {
     if (typeof toastError !== "undefined") {
-      toastError("Erro ao conectar com o servidor");
+      toastError(message);
     } else {
-      alert("Erro ao conectar com o servidor");
+      alert("Erro: " + message);
     }
+    document.getElementById("import-btn").disabled = false;
   }
 }
 
@@ -90,6 +90,7 @@ function addMessage(message, sender) {
     
     // Store message
     chatMessages.push({ message, sender, timestamp: new Date() });
+    return bubbleDiv;
 }
 
 function showTypingIndicator() {
@@ -119,59 +120,136 @@ function hideTypingIndicator() {
     }
 }
 
-async function generateResponse(userMessage) {
+// Answers are streamed over a WebSocket by agentAi.consumers.ChatConsumer.
+// While the socket can't be opened they are requested from /ai/get_response/
+let chatSocketReady = null;
+let chatSocketFailed = false;
+// Answers being streamed, in the order the messages were sent
+const pendingAnswers = [];
 
-    data = {'user_message': userMessage}
-    try {
-      const response = await fetch(`/ai/get_response/`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'X-CSRFToken': getCSRFToken()
-        },
-        body: JSON.stringify(data)
-      });
-      const result = await response.json();
-      if (result.success){
-        // Update conversation ID if provided
-        if (result.conversation_id) {
-          currentConversationId = result.conversation_id;
-        }
-        
-        // Update last activity
-        updateLastActivity();
-        
-        if (typeof toastSuccess !== 'undefined') {
-          toastSuccess(result.message)
-        } else {
-          console.log(result.message)
+function chatSocketUrl() {
+    if (window.aiChatSocketUrl) {
+        return window.aiChatSocketUrl;
+    }
+    const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    return `${scheme}://${window.location.host}/ws/ai/chat/`;
+}
+
+function openChatSocket() {
+    if (chatSocketReady) {
+        return chatSocketReady;
+    }
+    chatSocketReady = new Promise(resolve => {
+        let socket;
+        try {
+            socket = new WebSocket(chatSocketUrl());
+        } catch (exception) {
+            chatSocketFailed = true;
+            chatSocketReady = null;
+            resolve(null);
+            return;
         }
-        addMessage(result.ai_response, 'ai')
-        hideTypingIndicator()
-      }
-      else {
-        if (typeof toastError !== 'undefined') {
-          toastError(result.message)
+        let opened = false;
+        socket.onopen = () => {
+            opened = true;
+            resolve(socket);
+        };
+        socket.onmessage = event => handleChatEvent(JSON.parse(event.data));
+        socket.onclose = () => {
+            // A socket that never opened isn't served here, use POST from now on
+            if (!opened) {
+                chatSocketFailed = true;
+            }
+            chatSocketReady = null;
+            resolve(null);
+            while (pendingAnswers.length) {
+                pendingAnswers.shift().fail('Conexão com o chat perdida. Tente novamente.');
+            }
+        };
+    });
+    return chatSocketReady;
+}
+
+function handleChatEvent(event) {
+    const answer = pendingAnswers[0];
+    if (!answer) {
+        return;
+    }
+    if (event.type === 'chunk') {
+        answer.append(event.text);
+        return;
+    }
+    pendingAnswers.shift();
+    if (event.success) {
+        answer.finish(event);
+    } else {
+        answer.fail(event.message);
+    }
+}
+
+// Shows an answer in a chat as it arrives. `chat` has the chat's container id,
+// addMessage(html) returning the message bubble and hideTypingIndicator()
+function chatAnswer(chat) {
+    let bubble = null;
+    let text = '';
+    const container = document.getElementById(chat.container);
+    const show = html => {
+        if (bubble) {
+            bubble.innerHTML = html;
         } else {
-          console.log(result.message)
+            chat.hideTypingIndicator();
+            bubble = chat.addMessage(html);
         }
-        hideTypingIndicator()
-      }
-  
-  }
-    catch (exception) {
-      if (typeof toastError !== 'undefined') {
-        toastError('Error ${exception}')
-      } else {
-        console.log(exception)
-      }
-      console.log(exception)
-      hideTypingIndicator()
+        container.scrollTop = container.scrollHeight;
+    };
+    return {
+        append(chunk) {
+            text += chunk;
+            show(text);
+        },
+        finish(result) {
+            // Update conversation ID if provided
+            if (result.conversation_id) {
+                currentConversationId = result.conversation_id;
+            }
+
+            // Update last activity
+            updateLastActivity();
+
+            showChatToast(result.message, true);
+            (result.notices || []).forEach(notice => {
+                showChatToast(notice.message, notice.level === 'success');
+            });
+            show(result.ai_response);
+            chat.hideTypingIndicator();
+        },
+        fail(message) {
+            showChatToast(message, false);
+            chat.hideTypingIndicator();
+        },
+    };
+}
+
+function showChatToast(message, success) {
+    const toast = success ? (typeof toastSuccess !== 'undefined' ? toastSuccess : null)
+                          : (typeof toastError !== 'undefined' ? toastError : null);
+    if (toast) {
+        toast(message);
+    } else {
+        console.log(message);
     }
 }
 
-async function generateFloatingResponse(userMessage) {
-    data = {'user_message': userMessage}
+async function requestResponse(userMessage, chat) {
+    const answer = chatAnswer(chat);
+    const socket = chatSocketFailed ? null : await openChatSocket();
+    if (socket) {
+        pendingAnswers.push(answer);
+        socket.send(JSON.stringify({'user_message': userMessage}));
+        return;
+    }
+
+    const data = {'user_message': userMessage};
     try {
       const response = await fetch(`/ai/get_response/`, {
         method: 'POST',
@@ -183,43 +261,34 @@ async function generateFloatingResponse(userMessage) {
       });
       const result = await response.json();
       if (result.success){
-        // Update conversation ID if provided
-        if (result.conversation_id) {
-          currentConversationId = result.conversation_id;
-        }
-        
-        // Update last activity
-        updateLastActivity();
-        
-        if (typeof toastSuccess !== 'undefined') {
-          toastSuccess(result.message)
-        } else {
-          console.log(result.message)
-        }
-        addFloatingMessage(result.ai_response, 'ai', true)
-        hideFloatingTypingIndicator()
+        answer.finish(result);
       }
       else {
-        if (typeof toastError !== 'undefined') {
-          toastError(result.message)
-        } else {
-          console.log(result.message)
-        }
-        hideFloatingTypingIndicator()
+        answer.fail(result.message);
       }
-  
-  }
+    }
     catch (exception) {
-      if (typeof toastError !== 'undefined') {
-        toastError('Error ${exception}')
-      } else {
-        console.log(exception)
-      }
-      console.log(exception)
-      hideFloatingTypingIndicator()
+      console.log(exception);
+      answer.fail(`Error ${exception}`);
     }
 }
 
+function generateResponse(userMessage) {
+    return requestResponse(userMessage, {
+        container: 'chat-messages',
+        addMessage: html => addMessage(html, 'ai'),
+        hideTypingIndicator: hideTypingIndicator,
+    });
+}
+
+function generateFloatingResponse(userMessage) {
+    return requestResponse(userMessage, {
+        container: 'floating-chat-messages',
+        addMessage: html => addFloatingMessage(html, 'ai', true),
+        hideTypingIndicator: hideFloatingTypingIndicator,
+    });
+}
+
 // Floating Chat Widget Functionality
 let floatingChatLoaded = false;
 
@@ -355,6 +424,7 @@ function addFloatingMessage(message, sender, shouldScroll = true) {
     if (shouldScroll) {
         chatContainer.scrollTop = chatContainer.scrollHeight;
     }
+    return bubbleDiv;
 }
 
 function showFloatingTypingIndicator() {
@@ -1,41 +1,242 @@
 document.addEventListener('DOMContentLoaded', function() {
-    // Function to load a single graph
-    async function loadGraph(config) {
+    // Charts are drawn in the browser from the data series sent by the server
+    const charts = {};
+
+    const weekdays = {
+        Monday: 'Segunda-feira',
+        Tuesday: 'Terça-feira',
+        Wednesday: 'Quarta-feira',
+        Thursday: 'Quinta-feira',
+        Friday: 'Sexta-feira',
+        Saturday: 'Sábado',
+        Sunday: 'Domingo'
+    };
+
+    function money(value) {
+        return `R$ ${value.toLocaleString('pt-BR', { minimumFractionDigits: 2, maximumFractionDigits: 2 })}`;
+    }
+
+    function escapeHtml(text) {
+        const element = document.createElement('span');
+        element.textContent = text;
+        return element.innerHTML;
+    }
+
+    function shortDate(isoDate) {
+        const [year, month, day] = isoDate.split('-');
+        return `${day}/${month}/${year}`;
+    }
+
+    const moneyTicks = { ticks: { callback: value => money(value) } };
+    const moneyTooltip = {
+        callbacks: { label: context => `${context.dataset.label}: ${money(context.parsed.y)}` }
+    };
+
+    // Each builder turns a series into a Chart.js config (or plain HTML)
+    // and the summary lines shown below it
+    function categoryChart(series) {
+        const summary = series.summary;
+        return {
+            chart: {
+                type: 'bar',
+                data: {
+                    labels: series.months,
+                    datasets: series.categories.map(category => ({
+                        label: category.name,
+                        data: category.values,
+                        backgroundColor: category.color
+                    }))
+                },
+                options: {
+                    scales: { x: { stacked: true }, y: { stacked: true, ...moneyTicks } },
+                    plugins: { tooltip: moneyTooltip }
+                }
+            },
+            summary: [
+                `Total geral: ${money(summary.total)}`,
+                `Categorias ativas: ${summary.active_categories}`,
+                `Período: ${summary.months} meses`,
+                `Média mensal: ${money(summary.monthly_average)}`,
+                `Maior categoria: ${escapeHtml(summary.top_category)} (${summary.top_percentage.toFixed(1)}% do total)`
+            ]
+        };
+    }
+
+    function monthlyTrendChart(series) {
+        const summary = series.summary;
+        return {
+            chart: {
+                type: 'line',
+                data: {
+                    labels: series.months,
+                    datasets: [{
+                        label: 'Gastos Mensais',
+                        data: series.values,
+                        borderColor: '#e74c3c',
+                        backgroundColor: 'rgba(231, 76, 60, 0.3)',
+                        fill: true
+                    }]
+                },
+                options: { scales: { y: moneyTicks }, plugins: { tooltip: moneyTooltip } }
+            },
+            summary: [
+                `Período analisado: ${summary.months} meses`,
+                `Média mensal: ${money(summary.average)}`,
+                `Maior gasto: ${money(summary.max.value)} (${summary.max.month})`,
+                `Menor gasto: ${money(summary.min.value)} (${summary.min.month})`,
+                `Tendência: ${summary.trend}`,
+                `Total acumulado: ${money(summary.total)}`
+            ]
+        };
+    }
+
+    function incomeExpensesChart(series) {
+        const summary = series.summary;
+        return {
+            chart: {
+                type: 'bar',
+                data: {
+                    labels: series.months,
+                    datasets: [
+                        { label: 'Receitas', data: series.incomes, backgroundColor: '#10b981' },
+                        { label: 'Gastos', data: series.expenses, backgroundColor: '#ef4444' },
+                        {
+                            type: 'line',
+                            label: 'Saldo Mensal',
+                            data: series.balance,
+                            borderColor: '#6366f1',
+                            backgroundColor: '#ffffff'
+                        }
+                    ]
+                },
+                options: { scales: { y: moneyTicks }, plugins: { tooltip: moneyTooltip } }
+            },
+            summary: [
+                `Receitas: ${money(summary.total_income)} (média ${money(summary.average_income)})`,
+                `Gastos: ${money(summary.total_expense)} (média ${money(summary.average_expense)})`,
+                `Saldo total: ${money(summary.balance)} (médio ${money(summary.average_balance)})`,
+                `Meses positivos: ${summary.positive_months} · Meses negativos: ${summary.negative_months}`,
+                `Melhor mês: ${summary.best.month} (${money(summary.best.balance)})`,
+                `Pior mês: ${summary.worst.month} (${money(summary.worst.balance)})`
+            ]
+        };
+    }
+
+    function dailySpendingChart(series) {
+        const summary = series.summary;
+        const highest = summary.highest_weekday;
+        const lowest = summary.lowest_weekday;
+        return {
+            chart: {
+                type: 'line',
+                data: {
+                    labels: series.dates.map(shortDate),
+                    datasets: [{
+                        label: 'Gastos Diários',
+                        data: series.values,
+                        borderColor: '#e74c3c',
+                        backgroundColor: 'rgba(231, 76, 60, 0.3)',
+                        fill: true,
+                        pointRadius: 2
+                    }]
+                },
+                options: { scales: { y: moneyTicks }, plugins: { tooltip: moneyTooltip } }
+            },
+            summary: [
+                `Período: ${summary.days} dias`,
+                `Total gasto: ${money(summary.total)}`,
+                `Média diária: ${money(summary.average)}`,
+                `Maior gasto: ${money(summary.max.value)} (${shortDate(summary.max.date)})`,
+                `Menor gasto: ${money(summary.min.value)} (${shortDate(summary.min.date)})`,
+                `Dia com mais gastos: ${weekdays[highest.weekday] || highest.weekday} (${money(highest.average)} em média)`,
+                `Dia com menos gastos: ${weekdays[lowest.weekday] || lowest.weekday} (${money(lowest.average)} em média)`
+            ]
+        };
+    }
+
+    function heatmapChart(series) {
+        // Chart.js has no heatmap, cells are colored from blue (low) to red (high)
+        const max = Math.max(1, ...series.values.flat());
+        const cell = value => {
+            const hue = 240 - Math.round((value / max) * 240);
+            const color = value > 0 ? `hsl(${hue}, 70%, 60%)` : 'transparent';
+            return `<td class="px-2 py-1 text-right" style="background: ${color}">${value.toFixed(0)}</td>`;
+        };
+        const rows = series.rows.map((row, i) => `
+            <tr>
+                <th class="px-2 py-1 text-left font-normal">Semana ${row.week} · ${weekdays[row.weekday] || row.weekday}</th>
+                ${series.values[i].map(cell).join('')}
+            </tr>
+        `).join('');
+
+        const peak = stats => stats.peak
+            ? `pico na semana ${stats.peak.week} (${weekdays[stats.peak.weekday] || stats.peak.weekday})`
+            : 'sem dados';
+        const summary = series.summary;
+        return {
+            html: `
+                <div class="overflow-auto max-h-[320px]">
+                    <table class="table table-xs w-full">
+                        <thead><tr><th></th>${series.columns.map(column => `<th class="text-right">${column}</th>`).join('')}</tr></thead>
+                        <tbody>${rows}</tbody>
+                    </table>
+                </div>
+            `,
+            summary: [
+                `Semanas analisadas: ${summary.weeks}`,
+                `Gastos: ${money(summary.expenses.total)}, média ${money(summary.expenses.average)}, ${peak(summary.expenses)}`,
+                `Receitas: ${money(summary.incomes.total)}, média ${money(summary.incomes.average)}, ${peak(summary.incomes)}`
+            ]
+        };
+    }
+
+    const chartBuilders = {
+        'expense-category': categoryChart,
+        'monthly-expenses': monthlyTrendChart,
+        'income-expenses': incomeExpensesChart,
+        'income-category': categoryChart,
+        'daily-spending': dailySpendingChart,
+        'financial-heatmap': heatmapChart
+    };
+
+    // Function to show the result of one graph in its container
+    function showGraph(config, data) {
         const container = document.getElementById(config.id);
         if (!container) return;
 
-        try {
-            const response = await fetch(config.url, {
-                method: 'GET',
-                headers: {
-                    'X-CSRFToken': '{{ csrf_token }}',
-                    'Content-Type': 'application/json',
-                }
-            });
+        if (charts[config.id]) {
+            charts[config.id].destroy();
+            delete charts[config.id];
+        }
 
-            const data = await response.json();
+        if (data && data.success && data.has_data && data.data) {
+            const built = chartBuilders[config.type](data.data);
+            const summary = built.summary.map(line => `<li>${line}</li>`).join('');
+            container.innerHTML = `
+                ${built.chart ? '<div class="relative h-[320px]"><canvas class="chart-image"></canvas></div>' : built.html}
+                <ul class="text-sm text-base-content/70 mt-4 space-y-1">${summary}</ul>
+            `;
 
-            if (data.success && data.has_data && data.graph) {
-                // Show the graph with click functionality
-                container.innerHTML = `
-                    <img src="data:image/png;base64,${data.graph}" 
-                         alt="Gráfico ${config.type}" 
-                         class="w-full h-auto max-h-[380px] object-contain chart-image"
-                         onclick="openZoomModal(this.src, this.alt)">
-                `;
-            } else {
-                // Show no data message
-                container.innerHTML = `
-                    <div class="no-data-placeholder" onclick="refreshGraph('${config.id}')">
-                        <i data-lucide="image" class="w-16 h-16 mx-auto mb-4 opacity-30"></i>
-                        <p>Gráfico não disponível</p>
-                        <p class="text-sm">Dados insuficientes para gerar o gráfico</p>
-                        <p class="text-xs mt-2 opacity-60">Clique para tentar novamente</p>
-                    </div>
-                `;
+            if (built.chart && typeof Chart !== 'undefined') {
+                const canvas = container.querySelector('canvas');
+                built.chart.options.maintainAspectRatio = false;
+                charts[config.id] = new Chart(canvas, built.chart);
+                // Zoom shows a snapshot of the drawn chart
+                canvas.addEventListener('click', () => {
+                    openZoomModal(canvas.toDataURL('image/png'), `Gráfico ${config.type}`);
+                });
             }
-        } catch (error) {
-            console.error(`Error loading graph ${config.type}:`, error);
+        } else if (data && data.success) {
+            // Show no data message
+            container.innerHTML = `
+                <div class="no-data-placeholder" onclick="refreshGraph('${config.id}')">
+                    <i data-lucide="image" class="w-16 h-16 mx-auto mb-4 opacity-30"></i>
+                    <p>Gráfico não disponível</p>
+                    <p class="text-sm">Dados insuficientes para gerar o gráfico</p>
+                    <p class="text-xs mt-2 opacity-60">Clique para tentar novamente</p>
+                </div>
+            `;
+        } else {
             container.innerHTML = `
                 <div class="error-placeholder" onclick="refreshGraph('${config.id}')">
                     <i data-lucide="alert-circle" class="w-16 h-16 mx-auto mb-4"></i>
@@ -57,6 +258,52 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Function to load several graphs with a single request. The server
+    // sends one JSON line of chart data per graph as soon as it is ready.
+    async function loadGraphs(configs) {
+        const pending = new Map(configs.map(config => [config.type, config]));
+        const url = `${graphsUrl}?format=data&charts=${configs.map(config => config.type).join(',')}`;
+
+        try {
+            const response = await fetch(url, {
+                method: 'GET',
+                headers: { 'Accept': 'application/x-ndjson' }
+            });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            const showLine = (line) => {
+                if (!line.trim()) return;
+                const data = JSON.parse(line);
+                const config = pending.get(data.type);
+                if (config) {
+                    pending.delete(data.type);
+                    showGraph(config, data);
+                }
+            };
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.forEach(showLine);
+            }
+            showLine(buffer + decoder.decode());
+        } catch (error) {
+            console.error('Error loading graphs:', error);
+        }
+
+        // Graphs the server didn't send back failed
+        pending.forEach(config => showGraph(config, null));
+    }
+
     // Function to refresh a specific graph
     window.refreshGraph = function(containerId) {
         const config = graphConfigs.find(g => g.id === containerId);
@@ -70,7 +317,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     </div>
                 `;
             }
-            setTimeout(() => loadGraph(config), 300);
+            setTimeout(() => loadGraphs([config]), 300);
         }
     };
 
@@ -110,16 +357,12 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
-    // Load graphs with staggered timing to prevent server overload
-    graphConfigs.forEach((config, index) => {
-        setTimeout(() => {
-            loadGraph(config);
-        }, index * 500); // 500ms delay between each graph load
-    });
+    // Load all graphs at once, the server reads the data a single time
+    loadGraphs(graphConfigs);
 
     // Add refresh functionality for all graphs
     window.refreshAllGraphs = function() {
-        graphConfigs.forEach((config, index) => {
+        graphConfigs.forEach(config => {
             const container = document.getElementById(config.id);
             if (container) {
                 container.innerHTML = `
@@ -129,10 +372,8 @@ document.addEventListener('DOMContentLoaded', function() {
                     </div>
                 `;
             }
-            
-            setTimeout(() => {
-                loadGraph(config);
-            }, index * 300);
         });
+
+        loadGraphs(graphConfigs);
     };
 });
\ No newline at end of file
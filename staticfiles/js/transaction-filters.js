@@ -5,12 +5,6 @@ document.addEventListener('DOMContentLoaded', function() {
     setupFilterEventListeners();
 });
 
-let originalTransactions = {
-    all: [],
-    expenses: [],
-    incomes: []
-};
-
 let currentFilters = {
     month: '',
     year: '',
@@ -23,252 +17,234 @@ let currentFilters = {
     amountRange: {
         min: '',
         max: ''
-    }
+    },
+    search: ''
+};
+
+// Each tab is a feed of pages fetched from the transactions API as it scrolls into view
+const transactionFeeds = {
+    all: { type: '', render: renderTransactionCard },
+    expenses: { type: 'expense', render: transaction => renderTransactionRow(transaction, 'expense') },
+    incomes: { type: 'income', render: transaction => renderTransactionRow(transaction, 'income') }
 };
 
+let feedObserver = null;
+
 function initializeFilters() {
-    // Store original transaction data
-    storeOriginalTransactions();
-    
-    // Populate filter dropdowns
-    populateYearFilter();
-    populateMonthFilter();
-    populateCategoryFilters();
-    
     // Setup date range picker
     setupDateRangePicker();
     
     // Apply URL parameters if any
     applyURLFilters();
+    
+    // Start loading transactions
+    setupTransactionFeeds();
 }
 
-function storeOriginalTransactions() {
-    // Store all transactions data from the DOM
-    const allTransactionCards = document.querySelectorAll('#all-tab .transaction-card');
-    const expenseRows = document.querySelectorAll('#expenses-tab tbody tr');
-    const incomeRows = document.querySelectorAll('#incomes-tab tbody tr');
-    
-    // Extract data from DOM elements
-    originalTransactions.all = Array.from(allTransactionCards).map(card => extractCardData(card));
-    originalTransactions.expenses = Array.from(expenseRows).map(row => extractRowData(row, 'expense'));
-    originalTransactions.incomes = Array.from(incomeRows).map(row => extractRowData(row, 'income'));
+function setupTransactionFeeds() {
+    Object.entries(transactionFeeds).forEach(([name, feed]) => {
+        feed.container = document.querySelector(`[data-feed="${name}"]:not(.transaction-feed-sentinel)`);
+        feed.sentinel = document.querySelector(`.transaction-feed-sentinel[data-feed="${name}"]`);
+        resetFeed(feed);
+    });
+    
+    feedObserver = new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                loadNextPage(entry.target.dataset.feed);
+            }
+        });
+    }, { rootMargin: '400px 0px' });
+    
+    Object.values(transactionFeeds).forEach(feed => {
+        if (feed.sentinel) feedObserver.observe(feed.sentinel);
+    });
 }
 
-function extractCardData(card) {
-    const isIncome = card.classList.contains('income-border');
-    const description = card.querySelector('h3').textContent.trim();
-    const detailedDescription = card.querySelector('p').textContent.trim();
-    const categorySpan = card.querySelector('.category-indicator + span');
-    const category = categorySpan ? categorySpan.textContent.trim() : 'Sem categoria';
-    const dateText = card.querySelector('.text-xs:last-child').textContent.trim();
-    const amountText = card.querySelector('.amount-income, .amount-expense').textContent.trim();
-    
-    // Extract category ID from the edit button onclick attribute
-    let categoryId = null;
-    const editButton = card.querySelector('button[onclick*="Modal"]');
-    if (editButton) {
-        const onclickAttr = editButton.getAttribute('onclick');
-        const match = onclickAttr.match(/,\s*(\d+|null)\s*\)/);
-        if (match && match[1] !== 'null') {
-            categoryId = match[1];
-        }
-    }
+function resetFeed(feed) {
+    feed.cursor = null;
+    feed.done = false;
+    feed.loading = false;
+    // Responses for an older set of filters are dropped
+    feed.generation = (feed.generation || 0) + 1;
+    if (feed.container) feed.container.innerHTML = '';
+    if (feed.sentinel) feed.sentinel.classList.remove('hidden');
+}
+
+function resetTransactionFeeds() {
+    if (!feedObserver) return;
     
-    return {
-        element: card,
-        type: isIncome ? 'income' : 'expense',
-        description,
-        detailedDescription,
-        category,
-        categoryId,
-        date: parseDate(dateText),
-        amount: parseAmount(amountText),
-        originalElement: card.cloneNode(true)
-    };
+    Object.values(transactionFeeds).forEach(feed => {
+        resetFeed(feed);
+        // Observing again reports the sentinel's current visibility
+        feedObserver.unobserve(feed.sentinel);
+        feedObserver.observe(feed.sentinel);
+    });
 }
 
-function extractRowData(row, type) {
-    const cells = row.querySelectorAll('td');
-    if (cells.length < 4) return null;
-    
-    const description = cells[0].querySelector('.font-semibold').textContent.trim();
-    const detailedDescription = cells[0].querySelector('.text-sm')?.textContent.trim() || '';
-    const categorySpan = cells[1].querySelector('.category-indicator + span');
-    const category = categorySpan ? categorySpan.textContent.trim() : 'Sem categoria';
-    const dateText = cells[2].textContent.trim();
-    const amountText = cells[3].textContent.trim();
-    
-    // Extract category ID from the edit button onclick attribute
-    let categoryId = null;
-    const editButton = row.querySelector('button[onclick*="Modal"]');
-    if (editButton) {
-        const onclickAttr = editButton.getAttribute('onclick');
-        const match = onclickAttr.match(/,\s*(\d+|null)\s*\)/);
-        if (match && match[1] !== 'null') {
-            categoryId = match[1];
+async function loadNextPage(name) {
+    const feed = transactionFeeds[name];
+    if (!feed || feed.loading || feed.done) return;
+    
+    feed.loading = true;
+    const generation = feed.generation;
+    
+    const params = buildFilterParams();
+    if (feed.type) params.set('type', feed.type);
+    if (feed.cursor) params.set('cursor', feed.cursor);
+    
+    try {
+        const response = await fetch(`${window.transactionsApiUrl}?${params.toString()}`);
+        const data = await response.json();
+        if (generation !== feed.generation) return;
+        if (!data.success) throw new Error(data.message);
+        
+        feed.container.insertAdjacentHTML('beforeend', data.transactions.map(feed.render).join(''));
+        feed.cursor = data.next_cursor;
+        feed.done = !data.next_cursor;
+        
+        if (feed.done && !feed.container.children.length) {
+            showNoResultsMessage(feed.container, name);
+        }
+        
+        // Re-initialize Lucide icons
+        if (typeof lucide !== 'undefined') {
+            lucide.createIcons();
+        }
+    } catch (error) {
+        console.error('Error loading transactions:', error);
+        if (generation === feed.generation) feed.done = true;
+    } finally {
+        if (generation === feed.generation) {
+            feed.loading = false;
+            feed.sentinel.classList.toggle('hidden', feed.done);
+            if (!feed.done) {
+                // Keep loading while the sentinel is still on screen
+                feedObserver.unobserve(feed.sentinel);
+                feedObserver.observe(feed.sentinel);
+            }
         }
     }
+}
+
+function buildFilterParams() {
+    const params = new URLSearchParams();
     
-    return {
-        element: row,
-        type,
-        description,
-        detailedDescription,
-        category,
-        categoryId,
-        date: parseDate(dateText),
-        amount: parseAmount(amountText),
-        originalElement: row.cloneNode(true)
-    };
+    if (currentFilters.month) params.set('month', currentFilters.month);
+    if (currentFilters.year) params.set('year', currentFilters.year);
+    if (currentFilters.expenseCategory) params.set('expense_category', currentFilters.expenseCategory);
+    if (currentFilters.incomeCategory) params.set('income_category', currentFilters.incomeCategory);
+    if (currentFilters.dateRange.start) params.set('start_date', currentFilters.dateRange.start);
+    if (currentFilters.dateRange.end) params.set('end_date', currentFilters.dateRange.end);
+    if (currentFilters.amountRange.min !== '') params.set('min_amount', currentFilters.amountRange.min);
+    if (currentFilters.amountRange.max !== '') params.set('max_amount', currentFilters.amountRange.max);
+    if (currentFilters.search) params.set('q', currentFilters.search);
+    
+    return params;
 }
 
-function parseDate(dateText) {
-    // Parse date from DD/MM/YYYY format
-    const parts = dateText.split('/');
-    if (parts.length === 3) {
-        return new Date(parts[2], parts[1] - 1, parts[0]);
-    }
-    return new Date();
+function escapeHtml(value) {
+    const div = document.createElement('div');
+    div.textContent = value ?? '';
+    return div.innerHTML.replace(/"/g, '&quot;').replace(/'/g, '&#39;');
 }
 
-function parseAmount(amountText) {
-    // Extract numeric value from amount text (e.g., "R$ 150,00" -> 150.00)
-    const cleaned = amountText.replace(/[^\d,.-]/g, '').replace(',', '.');
-    return parseFloat(cleaned) || 0;
+function formatCents(amount) {
+    return `${Math.floor(amount / 100)},${String(amount % 100).padStart(2, '0')}`;
 }
 
-function populateYearFilter() {
-    const yearSelect = document.getElementById('year-filter');
-    if (!yearSelect) return;
-    
-    // Get all unique years from transactions
-    const years = new Set();
-    const allDates = [
-        ...originalTransactions.all.map(t => t.date),
-        ...originalTransactions.expenses.map(t => t.date),
-        ...originalTransactions.incomes.map(t => t.date)
-    ];
-    
-    allDates.forEach(date => {
-        if (date) years.add(date.getFullYear());
-    });
-    
-    // Sort years in descending order
-    const sortedYears = Array.from(years).sort((a, b) => b - a);
-    
-    // Clear existing options except the first one
-    yearSelect.innerHTML = '<option value="">Todos os anos</option>';
-    
-    sortedYears.forEach(year => {
-        const option = document.createElement('option');
-        option.value = year;
-        option.textContent = year;
-        yearSelect.appendChild(option);
-    });
+function formatDate(isoDate) {
+    // YYYY-MM-DD -> DD/MM/YYYY
+    const [year, month, day] = isoDate.split('-');
+    return `${day}/${month}/${year}`;
 }
 
-function populateMonthFilter() {
-    const monthSelect = document.getElementById('month-filter');
-    if (!monthSelect) return;
-    
-    const months = [
-        { value: '', text: 'Todos os meses' },
-        { value: '1', text: 'Janeiro' },
-        { value: '2', text: 'Fevereiro' },
-        { value: '3', text: 'Março' },
-        { value: '4', text: 'Abril' },
-        { value: '5', text: 'Maio' },
-        { value: '6', text: 'Junho' },
-        { value: '7', text: 'Julho' },
-        { value: '8', text: 'Agosto' },
-        { value: '9', text: 'Setembro' },
-        { value: '10', text: 'Outubro' },
-        { value: '11', text: 'Novembro' },
-        { value: '12', text: 'Dezembro' }
+function editModalCall(transaction) {
+    const openModal = transaction.type === 'income' ? 'openEditIncomeModal' : 'openEditExpenseModal';
+    const args = [
+        transaction.id,
+        transaction.description,
+        transaction.detailed_description || '',
+        transaction.date,
+        transaction.amount,
+        transaction.category ? transaction.category.id : null
     ];
-    
-    monthSelect.innerHTML = '';
-    months.forEach(month => {
-        const option = document.createElement('option');
-        option.value = month.value;
-        option.textContent = month.text;
-        monthSelect.appendChild(option);
-    });
+    return escapeHtml(`${openModal}(${args.map(arg => JSON.stringify(arg)).join(', ')})`);
 }
 
-function populateCategoryFilters() {
-    populateExpenseCategoryFilter();
-    populateIncomeCategoryFilter();
+function renderCategory(category, textClass) {
+    if (!category) {
+        return `<span class="${textClass}">Sem categoria</span>`;
+    }
+    return `
+        <span class="category-indicator" style="background-color: ${escapeHtml(category.color)}"></span>
+        <span class="${textClass}">${escapeHtml(category.name)}</span>
+    `;
 }
 
-function populateExpenseCategoryFilter() {
-    const categorySelect = document.getElementById('expense-category-filter');
-    if (!categorySelect) return;
-    
-    // Get unique expense categories with their IDs and names
-    const categories = new Map();
-    originalTransactions.expenses.forEach(transaction => {
-        if (transaction.category && transaction.category !== 'Sem categoria' && transaction.categoryId) {
-            categories.set(transaction.categoryId, transaction.category);
-        }
-    });
-    
-    // Keep existing options from template and add any missing ones
-    const existingOptions = Array.from(categorySelect.options);
-    const existingValues = new Set(existingOptions.map(opt => opt.value));
-    
-    // Add any categories found in transactions that aren't in the template
-    categories.forEach((name, id) => {
-        if (!existingValues.has(id)) {
-            const option = document.createElement('option');
-            option.value = id;
-            option.textContent = name;
-            categorySelect.appendChild(option);
-        }
-    });
-    
-    // Add "Sem categoria" option if not present
-    if (!existingValues.has('no-category')) {
-        const noCategoryOption = document.createElement('option');
-        noCategoryOption.value = 'no-category';
-        noCategoryOption.textContent = 'Sem categoria';
-        categorySelect.appendChild(noCategoryOption);
-    }
+function renderTransactionCard(transaction) {
+    const isIncome = transaction.type === 'income';
+    return `
+        <div class="transaction-card ${isIncome ? 'income' : 'expense'}-border bg-base-100 border border-base-300 rounded-lg p-4 flex items-center justify-between">
+            <div class="flex items-center space-x-4">
+                <div class="w-12 h-12 bg-${isIncome ? 'success' : 'error'}/10 rounded-full flex items-center justify-center">
+                    <i data-lucide="trending-${isIncome ? 'up' : 'down'}" class="w-6 h-6 text-${isIncome ? 'success' : 'error'}"></i>
+                </div>
+                <div>
+                    <h3 class="font-semibold text-base-content">${escapeHtml(transaction.description)}</h3>
+                    <p class="text-sm text-base-content/70">${escapeHtml(transaction.detailed_description || 'Sem descrição detalhada')}</p>
+                    <div class="flex items-center mt-1">
+                        ${renderCategory(transaction.category, 'text-xs text-base-content/60')}
+                        <span class="mx-2 text-base-content/40">•</span>
+                        <span class="text-xs text-base-content/60">${formatDate(transaction.date)}</span>
+                    </div>
+                </div>
+            </div>
+            <div class="flex items-center space-x-2">
+                <span class="text-lg font-bold amount-${transaction.type}">${isIncome ? '+' : '-'} R$ ${formatCents(transaction.amount)}</span>
+                <button class="btn btn-ghost btn-sm" onclick="${editModalCall(transaction)}">
+                    <i data-lucide="pencil" class="w-4 h-4"></i>
+                </button>
+            </div>
+        </div>
+    `;
 }
 
-function populateIncomeCategoryFilter() {
-    const categorySelect = document.getElementById('income-category-filter');
-    if (!categorySelect) return;
-    
-    // Get unique income categories with their IDs and names
-    const categories = new Map();
-    originalTransactions.incomes.forEach(transaction => {
-        if (transaction.category && transaction.category !== 'Sem categoria' && transaction.categoryId) {
-            categories.set(transaction.categoryId, transaction.category);
-        }
-    });
-    
-    // Keep existing options from template and add any missing ones
-    const existingOptions = Array.from(categorySelect.options);
-    const existingValues = new Set(existingOptions.map(opt => opt.value));
-    
-    // Add any categories found in transactions that aren't in the template
-    categories.forEach((name, id) => {
-        if (!existingValues.has(id)) {
-            const option = document.createElement('option');
-            option.value = id;
-            option.textContent = name;
-            categorySelect.appendChild(option);
-        }
-    });
-    
-    // Add "Sem categoria" option if not present
-    if (!existingValues.has('no-category')) {
-        const noCategoryOption = document.createElement('option');
-        noCategoryOption.value = 'no-category';
-        noCategoryOption.textContent = 'Sem categoria';
-        categorySelect.appendChild(noCategoryOption);
-    }
+function renderTransactionRow(transaction, type) {
+    const isIncome = type === 'income';
+    // deleteIncome/deleteExpense read the id from the edit modal and ask for confirmation
+    const deleteCall = isIncome
+        ? `document.getElementById('edit_income_id').value = ${transaction.id}; deleteIncome();`
+        : `document.getElementById('edit_expense_id').value = ${transaction.id}; deleteExpense();`;
+    return `
+        <tr>
+            <td>
+                <div>
+                    <div class="font-semibold">${escapeHtml(transaction.description)}</div>
+                    ${transaction.detailed_description ? `<div class="text-sm text-base-content/70">${escapeHtml(transaction.detailed_description)}</div>` : ''}
+                </div>
+            </td>
+            <td>
+                <div class="flex items-center">
+                    ${renderCategory(transaction.category, transaction.category ? '' : 'text-base-content/50')}
+                </div>
+            </td>
+            <td>${formatDate(transaction.date)}</td>
+            <td>
+                <span class="font-bold text-${isIncome ? 'success' : 'error'}">R$ ${formatCents(transaction.amount)}</span>
+            </td>
+            <td>
+                <div class="flex space-x-2">
+                    <button class="btn btn-ghost btn-xs" onclick="${editModalCall(transaction)}" title="Editar">
+                        <i data-lucide="pencil" class="w-3 h-3"></i>
+                    </button>
+                    <button class="btn btn-ghost btn-xs text-error" onclick="${escapeHtml(deleteCall)}" title="Excluir">
+                        <i data-lucide="trash-2" class="w-3 h-3"></i>
+                    </button>
+                </div>
+            </td>
+        </tr>
+    `;
 }
 
 function setupDateRangePicker() {
@@ -355,19 +331,14 @@ function applyFilters() {
     // Update current filters
     updateCurrentFilters();
     
-    // Filter each transaction type
-    filterAllTransactions();
-    filterExpenses();
-    filterIncomes();
+    // Reload every tab from the first page
+    resetTransactionFeeds();
     
     // Update URL with current filters
     updateURL();
     
     // Update filter summary
     updateFilterSummary();
-    
-    // Update statistics
-    updateFilteredStatistics();
 }
 
 function updateCurrentFilters() {
@@ -379,6 +350,7 @@ function updateCurrentFilters() {
     const endDateFilter = document.getElementById('end-date-filter');
     const minAmountFilter = document.getElementById('min-amount-filter');
     const maxAmountFilter = document.getElementById('max-amount-filter');
+    const searchFilter = document.getElementById('search-filter');
     
     currentFilters.month = monthFilter ? monthFilter.value : '';
     currentFilters.year = yearFilter ? yearFilter.value : '';
@@ -388,119 +360,7 @@ function updateCurrentFilters() {
     currentFilters.dateRange.end = endDateFilter ? endDateFilter.value : '';
     currentFilters.amountRange.min = minAmountFilter ? parseFloat(minAmountFilter.value) || '' : '';
     currentFilters.amountRange.max = maxAmountFilter ? parseFloat(maxAmountFilter.value) || '' : '';
-}
-
-function filterAllTransactions() {
-    const container = document.querySelector('#all-tab .space-y-4');
-    if (!container) return;
-    
-    // Clear current content
-    container.innerHTML = '';
-    
-    // Filter and display transactions
-    const filteredTransactions = originalTransactions.all.filter(transaction => {
-        return matchesFilters(transaction);
-    });
-    
-    if (filteredTransactions.length === 0) {
-        showNoResultsMessage(container, 'all');
-    } else {
-        filteredTransactions.forEach(transaction => {
-            container.appendChild(transaction.originalElement.cloneNode(true));
-        });
-    }
-}
-
-function filterExpenses() {
-    const tbody = document.querySelector('#expenses-tab tbody');
-    if (!tbody) return;
-    
-    // Clear current content
-    tbody.innerHTML = '';
-    
-    // Filter and display expenses
-    const filteredExpenses = originalTransactions.expenses.filter(transaction => {
-        return matchesFilters(transaction);
-    });
-    
-    if (filteredExpenses.length === 0) {
-        showNoResultsMessage(tbody, 'expenses');
-    } else {
-        filteredExpenses.forEach(transaction => {
-            tbody.appendChild(transaction.originalElement.cloneNode(true));
-        });
-    }
-}
-
-function filterIncomes() {
-    const tbody = document.querySelector('#incomes-tab tbody');
-    if (!tbody) return;
-    
-    // Clear current content
-    tbody.innerHTML = '';
-    
-    // Filter and display incomes
-    const filteredIncomes = originalTransactions.incomes.filter(transaction => {
-        return matchesFilters(transaction);
-    });
-    
-    if (filteredIncomes.length === 0) {
-        showNoResultsMessage(tbody, 'incomes');
-    } else {
-        filteredIncomes.forEach(transaction => {
-            tbody.appendChild(transaction.originalElement.cloneNode(true));
-        });
-    }
-}
-
-function matchesFilters(transaction) {
-    // Month filter
-    if (currentFilters.month && transaction.date.getMonth() + 1 !== parseInt(currentFilters.month)) {
-        return false;
-    }
-    
-    // Year filter
-    if (currentFilters.year && transaction.date.getFullYear() !== parseInt(currentFilters.year)) {
-        return false;
-    }
-    
-    // Category filter - improved logic
-    const categoryFilter = transaction.type === 'expense' ? currentFilters.expenseCategory : currentFilters.incomeCategory;
-    if (categoryFilter) {
-        if (categoryFilter === 'no-category') {
-            // Show transactions without category or with "Sem categoria"
-            if (transaction.categoryId || (transaction.category && transaction.category !== 'Sem categoria')) {
-                return false;
-            }
-        } else {
-            // Match by category ID
-            if (transaction.categoryId !== categoryFilter) {
-                return false;
-            }
-        }
-    }
-    
-    // Date range filter
-    if (currentFilters.dateRange.start) {
-        const startDate = new Date(currentFilters.dateRange.start);
-        if (transaction.date < startDate) return false;
-    }
-    
-    if (currentFilters.dateRange.end) {
-        const endDate = new Date(currentFilters.dateRange.end);
-        if (transaction.date > endDate) return false;
-    }
-    
-    // Amount range filter
-    if (currentFilters.amountRange.min !== '' && transaction.amount < currentFilters.amountRange.min) {
-        return false;
-    }
-    
-    if (currentFilters.amountRange.max !== '' && transaction.amount > currentFilters.amountRange.max) {
-        return false;
-    }
-    
-    return true;
+    currentFilters.search = searchFilter ? searchFilter.value.trim() : '';
 }
 
 function showNoResultsMessage(container, type) {
@@ -563,7 +423,8 @@ function clearAllFilters() {
         'start-date-filter',
         'end-date-filter',
         'min-amount-filter',
-        'max-amount-filter'
+        'max-amount-filter',
+        'search-filter'
     ];
     
     filterInputs.forEach(id => {
@@ -580,7 +441,8 @@ function clearAllFilters() {
         expenseCategory: '',
         incomeCategory: '',
         dateRange: { start: '', end: '' },
-        amountRange: { min: '', max: '' }
+        amountRange: { min: '', max: '' },
+        search: ''
     };
     
     // Reapply filters (which will show all transactions)
@@ -637,6 +499,10 @@ function updateFilterSummary() {
         activeFilters.push(rangeText);
     }
     
+    if (currentFilters.search) {
+        activeFilters.push(`Busca: ${escapeHtml(currentFilters.search)}`);
+    }
+    
     if (activeFilters.length === 0) {
         summaryContainer.classList.add('hidden');
     } else {
@@ -663,35 +529,8 @@ function updateFilterSummary() {
     }
 }
 
-function updateFilteredStatistics() {
-    // This function can be extended to update statistics based on filtered results
-    // For now, we'll just update the visible counts in tabs
-    
-    const allTab = document.getElementById('all-button');
-    const expensesTab = document.getElementById('expenses-button');
-    const incomesTab = document.getElementById('incomes-button');
-    
-    const allCount = document.querySelectorAll('#all-tab .transaction-card').length;
-    const expensesCount = document.querySelectorAll('#expenses-tab tbody tr').length;
-    const incomesCount = document.querySelectorAll('#incomes-tab tbody tr').length;
-    
-    // Update tab texts with counts
-    if (allTab) allTab.textContent = `Todas (${allCount})`;
-    if (expensesTab) expensesTab.textContent = `Gastos (${expensesCount})`;
-    if (incomesTab) incomesTab.textContent = `Receitas (${incomesCount})`;
-}
-
 function updateURL() {
-    const params = new URLSearchParams();
-    
-    if (currentFilters.month) params.set('month', currentFilters.month);
-    if (currentFilters.year) params.set('year', currentFilters.year);
-    if (currentFilters.expenseCategory) params.set('expense_category', currentFilters.expenseCategory);
-    if (currentFilters.incomeCategory) params.set('income_category', currentFilters.incomeCategory);
-    if (currentFilters.dateRange.start) params.set('start_date', currentFilters.dateRange.start);
-    if (currentFilters.dateRange.end) params.set('end_date', currentFilters.dateRange.end);
-    if (currentFilters.amountRange.min !== '') params.set('min_amount', currentFilters.amountRange.min);
-    if (currentFilters.amountRange.max !== '') params.set('max_amount', currentFilters.amountRange.max);
+    const params = buildFilterParams();
     
     const newURL = params.toString() ? `${window.location.pathname}?${params.toString()}` : window.location.pathname;
     window.history.replaceState({}, '', newURL);
@@ -709,7 +548,8 @@ function applyURLFilters() {
         { param: 'start_date', input: 'start-date-filter' },
         { param: 'end_date', input: 'end-date-filter' },
         { param: 'min_amount', input: 'min-amount-filter' },
-        { param: 'max_amount', input: 'max-amount-filter' }
+        { param: 'max_amount', input: 'max-amount-filter' },
+        { param: 'q', input: 'search-filter' }
     ];
     
     filterMappings.forEach(mapping => {